@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# api/device_routes.py - 设备列表与状态API路由
+from fastapi import APIRouter, HTTPException
+import logging
+from typing import Optional
+
+from device_registry import Device, DeviceNotFound
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/devices", tags=["Devices"])
+
+# 设备注册表(在main.py中注入)
+registry = None
+
+def init_registry(device_registry):
+    """初始化设备注册表引用"""
+    global registry
+    registry = device_registry
+
+def get_device(device_id: Optional[str] = None) -> Device:
+    """
+    按ID获取设备, 未指定时为默认设备
+
+    各路由模块的 /api/devices/{device_id}/... 路由与原有路由共用处理函数,
+    原有路由不带设备ID(也可用查询参数 ?device_id= 指定)
+    """
+    if registry is None:
+        raise HTTPException(status_code=500, detail="设备注册表未初始化")
+    try:
+        return registry.get(device_id)
+    except DeviceNotFound:
+        raise HTTPException(status_code=404, detail=f"设备不存在: {device_id}")
+
+@router.get("")
+async def list_devices():
+    """获取设备列表"""
+    if registry is None:
+        raise HTTPException(status_code=500, detail="设备注册表未初始化")
+    return {
+        "success": True,
+        "data": registry.list_devices()
+    }
+
+@router.get("/{device_id}")
+async def get_device_status(device_id: str):
+    """获取单个设备状态"""
+    device = get_device(device_id)
+    return {
+        "success": True,
+        "data": device.get_status()
+    }
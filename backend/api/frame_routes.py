@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# api/frame_routes.py - 通用帧流API路由: 任意帧类型的实时SSE推送, 服务端过滤
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import logging
+import asyncio
+from typing import Optional
+
+from api.device_routes import get_device
+from register_watch import WATCH_EVENT_TOPIC
+from event_stream import (
+    SSE_MAX_BATCH, SSE_FLUSH_MS, FRAME_INFO_KEYS,
+    FrameFilter, format_sse, batched_subscription_events
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["Frames"])
+
+# 按设备ID访问: /api/devices/{device_id}/frames/...
+device_router = APIRouter(prefix="/api/devices/{device_id}", tags=["Frames"])
+
+def parse_frame_types(types: Optional[str]) -> frozenset:
+    """解析帧类型列表, 如 "0x00,0x01,5", 为空时为全部可推送的帧类型"""
+    if not types:
+        return frozenset(FRAME_INFO_KEYS)
+    try:
+        result = frozenset(int(item.strip(), 0) for item in types.split(",") if item.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"帧类型格式错误: {types}")
+
+    unknown = result - set(FRAME_INFO_KEYS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的帧类型: {', '.join(f'0x{t:02X}' for t in sorted(unknown))}"
+        )
+    return result
+
+@router.get("/frames/stream")
+@device_router.get("/frames/stream")
+async def frame_stream(
+    device_id: Optional[str] = None,
+    types: Optional[str] = Query(None, description="帧类型列表, 如 0x00,0x01,0x05,0x07, 为空时为全部"),
+    frame_count_min: Optional[int] = Query(None, ge=0, le=255, description="frame_count 下限(只作用于LoRa帧)"),
+    frame_count_max: Optional[int] = Query(None, ge=0, le=255, description="frame_count 上限(只作用于LoRa帧)"),
+    sample_every: int = Query(1, ge=1, le=10000, description="每种帧类型每N帧推送1帧"),
+    payload_bytes: Optional[int] = Query(None, ge=0, le=65535, description="数据部分最多推送的字节数, 0为不推送, 为空时全部"),
+    max_batch: int = Query(SSE_MAX_BATCH, ge=1, le=1000, description="每条SSE事件最多合并的帧数, 1为不合并"),
+    flush_ms: int = Query(SSE_FLUSH_MS, ge=0, le=1000, description="流量大时两次推送的最小间隔(毫秒)")
+):
+    """
+    SSE流式推送任意类型的接收帧(信号发送帧0x00 / 信号接收帧0x01 / FPGA响应0x05 / LoRa 0x07)
+
+    过滤在服务端、JSON编码之前执行: 帧类型按订阅主题过滤(其他类型不进入该连接的队列),
+    frame_count 范围与抽样在编码前丢弃, 只关注一种帧的客户端不承担其他帧的编码开销.
+    事件为 {"type": "frame", "data": {"message_type": ..., 信息字段..., "data_len": N, "data_hex": "..."}},
+    合并推送时为 frame_batch
+    """
+    device = get_device(device_id)
+    frame_types = parse_frame_types(types)
+    frame_filter = FrameFilter(frame_count_min, frame_count_max, sample_every, payload_bytes)
+
+    async def event_generator():
+        """生成SSE事件"""
+        subscription = device.bus.subscribe(topics=frame_types, name=f"sse-frames-{device.device_id}")
+
+        yield format_sse({
+            'type': 'connected',
+            'message': 'SSE连接成功',
+            'types': sorted(frame_types)
+        })
+        logger.info(f"帧流客户端已连接, 帧类型: {', '.join(f'0x{t:02X}' for t in sorted(frame_types))}")
+
+        try:
+            async for chunk in batched_subscription_events(
+                subscription,
+                frame_filter,
+                max_batch=max_batch,
+                flush_interval=flush_ms / 1000,
+                # 监视事件由监控线程发布, 订阅了监视事件时总是跨线程唤醒
+                threadsafe=not device.transport.async_delivery or WATCH_EVENT_TOPIC in frame_types
+            ):
+                yield chunk
+
+        except asyncio.CancelledError:
+            logger.info(f"帧流客户端断开连接 (推送 {frame_filter.accepted} 帧, 过滤 {frame_filter.filtered} 帧)")
+            raise
+        except Exception as e:
+            logger.error(f"帧流错误: {e}")
+            raise
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -1,34 +1,36 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 import logging
 import asyncio
 import json
+from typing import Optional
 
-from config import CONFIG
 from models import LoRaSendMessage
+from api.device_routes import get_device
+from event_stream import (
+    SSE_MAX_BATCH, SSE_FLUSH_MS,
+    build_lora_event, format_sse, batched_subscription_events
+)
+from ws_stream import record_stream, execute_command
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["LoRa"])
 
-# 这个对象会在main.py中注入
-udp_sender = None
-
-def init_sender(sender):
-    """初始化发送器引用"""
-    global udp_sender
-    udp_sender = sender
+# 按设备ID访问: /api/devices/{device_id}/lora/...
+device_router = APIRouter(prefix="/api/devices/{device_id}", tags=["LoRa"])
 
 @router.post("/lora/send")
-async def lora_send_message(msg: LoRaSendMessage):
+@device_router.post("/lora/send")
+async def lora_send_message(msg: LoRaSendMessage, device_id: Optional[str] = None):
     """LoRa发送消息"""
+    device = get_device(device_id)
     try:
-        success = udp_sender.send_lora_message(
+        success = await device.transmit_queue.submit(
+            device.sender.send_lora_message,
             timing_enable=msg.timing_enable,
             timing_time=msg.timing_time,
             data_content=msg.data_content,
-            target_ip=CONFIG["arm_ip"],
-            target_port=CONFIG["arm_port"],
             frame_count = msg.frame_count
         )
         
@@ -49,45 +51,53 @@ async def lora_send_message(msg: LoRaSendMessage):
 
     # SSE 推送 LoRa 接收消息
 @router.get("/lora/stream")
-async def lora_receive_stream():
-    """SSE流式推送LoRa接收消息"""
+@device_router.get("/lora/stream")
+async def lora_receive_stream(
+    device_id: Optional[str] = None,
+    max_batch: int = Query(SSE_MAX_BATCH, ge=1, le=1000, description="每条SSE事件最多合并的帧数, 1为不合并"),
+    flush_ms: int = Query(SSE_FLUSH_MS, ge=0, le=1000, description="流量大时两次推送的最小间隔(毫秒)"),
+    last_event_id: Optional[str] = Query(None, description="已收到的最后一个事件ID(手动重连时使用)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    SSE流式推送LoRa接收消息
+    
+    max_batch > 1 时自适应批量: 流量小时逐帧推送(lora_receive), 
+    流量大时按 flush_ms 间隔合并推送(lora_receive_batch, data 为数组)
+    
+    每条事件带递增的事件ID; 重连时带上 Last-Event-ID 请求头(浏览器自动重连)
+    或 last_event_id 参数, 从设备的重放缓冲区补发断线期间的帧.
+    缓冲区已淘汰的帧以 replay_gap 事件告知数量
+    """
+    device = get_device(device_id)
+    resume_id = last_event_id_header or last_event_id
+    try:
+        after_id = int(resume_id) if resume_id else None
+    except ValueError:
+        after_id = None
     
     async def event_generator():
         """生成SSE事件"""
-        from udp_receiver import get_message_queue
-        
-        message_queue = get_message_queue()
-        message_queue.clear()
+        # 该设备LoRa接收帧重放缓冲区的读取位置(每个SSE连接独立, 互不抢占)
+        cursor = device.lora_replay.cursor(after_id, name=f"sse-lora-{device.device_id}")
         
         # 发送初始连接消息
-        yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE连接成功'})}\n\n"
-        logger.info("SSE客户端已连接")
+        yield format_sse({'type': 'connected', 'message': 'SSE连接成功', 'last_event_id': device.lora_replay.last_id})
+        if after_id is None:
+            logger.info("SSE客户端已连接")
+        else:
+            logger.info(f"SSE客户端重新连接, 从事件 #{cursor.position} 之后补发 {cursor.lag} 帧")
         
         try:
-            while True:
-                # 检查队列是否有消息
-                if len(message_queue) > 0:
-                    # 从队列中取出第一条消息（pop）
-                    msg = message_queue.popleft()
-                    
-                    # 只推送LoRa接收消息
-                    if msg.get("message_type") == 0x07 and "lora_receive_info" in msg:
-                        lora_info = msg["lora_receive_info"]
-                        
-                        event_data = {
-                            "type": "lora_receive",
-                            "data": {
-                                "frame_count": lora_info.get("frame_count", 0),
-                                "duration_ms": lora_info["duration_ms"],
-                                "data_hex": lora_info["data_content"]
-                            }
-                        }
-                        
-                        yield f"data: {json.dumps(event_data)}\n\n"
-                        logger.info(f"SSE推送LoRa接收消息: 帧#{lora_info.get('frame_count', 0)}")
-                
-                # 每100ms检查一次（更快响应）
-                await asyncio.sleep(0.1)
+            # 消息到达即唤醒(接收线程经 call_soon_threadsafe 通知), 每次唤醒推送全部积压消息
+            async for chunk in batched_subscription_events(
+                cursor,
+                build_lora_event,
+                max_batch=max_batch,
+                flush_interval=flush_ms / 1000,
+                threadsafe=not device.transport.async_delivery
+            ):
+                yield chunk
                 
         except asyncio.CancelledError:
             logger.info("SSE客户端断开连接")
@@ -95,6 +105,8 @@ async def lora_receive_stream():
         except Exception as e:
             logger.error(f"SSE流错误: {e}")
             raise
+        finally:
+            cursor.close()
     
     return StreamingResponse(
         event_generator(),
@@ -104,4 +116,40 @@ async def lora_receive_stream():
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         }
-    )
\ No newline at end of file
+    )
+
+# WebSocket 二进制流: 推送LoRa接收帧记录, 同一连接接收发送命令(格式见 ws_stream.py)
+@router.websocket("/lora/ws")
+@device_router.websocket("/lora/ws")
+async def lora_websocket(websocket: WebSocket, device_id: Optional[str] = None):
+    """WebSocket 收发LoRa帧"""
+    try:
+        device = get_device(device_id)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    await websocket.accept()
+    subscription = device.bus.subscribe(topics=(0x07,), name=f"ws-lora-{device.device_id}")
+    logger.info("WebSocket客户端已连接")
+    
+    async def push_records():
+        """消息到达即推送, 每次唤醒的全部帧合并为尽量少的二进制消息"""
+        async for message in record_stream(subscription, threadsafe=not device.transport.async_delivery):
+            await websocket.send_bytes(message)
+    
+    pusher = asyncio.create_task(push_records())
+    
+    try:
+        while True:
+            text = await websocket.receive_text()
+            reply = await execute_command(device, text)
+            await websocket.send_text(json.dumps(reply))
+            
+    except WebSocketDisconnect:
+        logger.info("WebSocket客户端断开连接")
+    except Exception as e:
+        logger.error(f"WebSocket错误: {e}")
+    finally:
+        pusher.cancel()
+        subscription.close()
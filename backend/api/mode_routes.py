@@ -3,54 +3,29 @@
 from fastapi import APIRouter, HTTPException
 import logging
 from datetime import datetime
-from typing import Callable, Optional
 
 from config import SystemMode, current_mode
-from udp_receiver import get_message_queue
+from api import device_routes
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/mode", tags=["Mode"])
 
-# UDP接收器引用
-udp_receiver = None
-
-# 🔧 虚实融合监控器获取函数
-get_virtual_monitor: Optional[Callable] = None
-
-def init_receiver(receiver):
-    """初始化接收器引用"""
-    global udp_receiver
-    udp_receiver = receiver
-
-def init_virtual_monitor(monitor_getter: Callable):
-    """
-    初始化虚实融合监控器获取函数
-    
-    Args:
-        monitor_getter: 返回 VirtualMonitor 实例的函数
-    """
-    global get_virtual_monitor
-    get_virtual_monitor = monitor_getter
-    logger.info("✅ 虚实融合监控器已注入到模式路由")
-
 @router.get("/current")
 async def get_current_mode():
-    """获取当前系统模式"""
-    monitor_status = None
-    
-    if get_virtual_monitor:
-        monitor = get_virtual_monitor()
-        if monitor:
-            monitor_status = monitor.get_status()
+    """获取当前系统模式(默认设备状态 + 全部设备状态)"""
+    registry = device_routes.registry
+    device = registry.get() if registry else None
     
     return {
         "success": True,
         "data": {
             "mode": current_mode["mode"],
             "last_switch_time": current_mode["last_switch_time"],
-            "receiver_status": udp_receiver.get_status() if udp_receiver else None,
-            "virtual_monitor_status": monitor_status
+            "transport_status": device.transport.get_status() if device else None,
+            "virtual_monitor_status": device.monitor.get_status() if device else None,
+            "message_bus": device.bus.get_stats() if device else None,
+            "devices": registry.get_status() if registry else None
         }
     }
 
@@ -69,24 +44,22 @@ async def switch_mode(mode: SystemMode):
         
         logger.info(f"🔄 切换系统模式: {old_mode} → {mode}")
         
-        # 清空消息队列
-        message_queue = get_message_queue()
-        old_count = len(message_queue)
-        message_queue.clear()
+        registry = device_routes.registry
+        
+        # 清空所有设备的消息队列
+        old_count = registry.clear_messages() if registry else 0
         logger.info(f"模式切换时清空了 {old_count} 条旧消息")
         
-        # 🔧 根据模式启动/停止虚实融合监控器
-        if get_virtual_monitor:
-            monitor = get_virtual_monitor()
-            if monitor:
-                if mode == SystemMode.VIRTUAL:
-                    # 切换到虚实融合模式 → 启动监控器
-                    monitor.start()
-                    logger.info("✅ VirtualMonitor 已启动")
-                else:
-                    # 切换到地面检测模式 → 停止监控器
-                    monitor.stop()
-                    logger.info("⏹️ VirtualMonitor 已停止")
+        # 🔧 根据模式启动/停止各设备的虚实融合监控器
+        for device in registry or ():
+            if mode == SystemMode.VIRTUAL:
+                # 切换到虚实融合模式 → 启动监控器
+                device.monitor.start()
+                logger.info(f"✅ VirtualMonitor 已启动 (设备: {device.device_id})")
+            else:
+                # 切换到地面检测模式 → 停止监控器
+                device.monitor.stop()
+                logger.info(f"⏹️ VirtualMonitor 已停止 (设备: {device.device_id})")
         
         # 更新模式
         current_mode["mode"] = mode
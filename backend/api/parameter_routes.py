@@ -2,20 +2,18 @@
 # api/parameter_routes.py - 参数设置API路由
 from fastapi import APIRouter, HTTPException
 import logging
+from typing import Optional
 
 from models import AllChannelParameters
-from config import CONFIG, current_parameters
+from api.device_routes import get_device
+from fpga_transactions import FpgaTimeout, FpgaBusy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["Parameters"])
 
-udp_sender = None
-
-def init_sender(sender):
-    """初始化发送器引用"""
-    global udp_sender
-    udp_sender = sender
+# 按设备ID访问: /api/devices/{device_id}/parameters
+device_router = APIRouter(prefix="/api/devices/{device_id}", tags=["Parameters"])
 
 # 带宽映射
 BANDWIDTH_MAP = {
@@ -138,15 +136,17 @@ def build_doppler_registers(doppler, bandwidth: int):
     ]
 
 @router.get("/parameters")
-async def get_parameters():
+@device_router.get("/parameters")
+async def get_parameters(device_id: Optional[str] = None):
     """读取所有通道参数"""
+    device = get_device(device_id)
     try:
-        logger.info("读取通道参数...")
+        logger.info(f"读取通道参数... (设备: {device.device_id})")
         
         # 返回当前缓存的参数
         return {
             "success": True,
-            "data": current_parameters
+            "data": device.parameters
         }
         
     except Exception as e:
@@ -154,10 +154,17 @@ async def get_parameters():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/parameters")
-async def write_parameters(params: AllChannelParameters):
-    """写入所有通道参数"""
+@device_router.post("/parameters")
+async def write_parameters(params: AllChannelParameters, device_id: Optional[str] = None):
+    """
+    写入所有通道参数
+    
+    等待FPGA对写请求的响应(0x05 写操作, 地址集合一致)后才更新参数缓存并返回成功,
+    无响应(含重发)返回504, 发送失败返回500
+    """
+    device = get_device(device_id)
     try:
-        logger.info("开始写入通道参数...")
+        logger.info(f"开始写入通道参数... (设备: {device.device_id})")
         
         # 收集所有写操作
         batch_operations = []
@@ -214,28 +221,41 @@ async def write_parameters(params: AllChannelParameters):
         if doppler_regs:
             batch_operations.extend(doppler_regs)
         
-        # 使用 send_fpga_operation 批量写入
-        success = udp_sender.send_fpga_operation(
-            operation_type=1,  # 写操作
-            batch_operations=batch_operations,
-            target_ip=CONFIG["arm_ip"],
-            target_port=CONFIG["arm_port"]
-        )
+        # 经FPGA事务层批量写入, 等待对应的写响应
+        try:
+            ack = await device.transactions.request(
+                operation_type=1,  # 写操作
+                batch_operations=batch_operations
+            )
+        except FpgaTimeout as e:
+            raise HTTPException(status_code=504, detail=f"FPGA未确认写入: {e}")
+        except FpgaBusy as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ConnectionError as e:
+            raise HTTPException(status_code=500, detail=f"FPGA写入失败: {e}")
         
-        if not success:
-            raise HTTPException(status_code=500, detail="FPGA写入失败")
+        ack_info = ack["fpga_operation_info"]
+        logger.info(f"✅ FPGA已确认写入 {ack_info.get('operation_count')} 个寄存器 (设备: {device.device_id})")
         
         # 更新本地缓存
-        current_parameters["uplink"] = params.uplink.dict()
-        current_parameters["downlink"] = params.downlink.dict()
-        current_parameters["interference"] = params.interference.dict()
-        current_parameters["doppler"] = params.doppler.dict()
-        current_parameters["lora_data_length"] = params.lora_data_length
+        parameters = device.parameters
+        parameters["uplink"] = params.uplink.dict()
+        parameters["downlink"] = params.downlink.dict()
+        parameters["interference"] = params.interference.dict()
+        parameters["doppler"] = params.doppler.dict()
+        parameters["lora_data_length"] = params.lora_data_length
         
         return {
             "success": True,
-            "data": current_parameters,
+            "data": parameters,
             "message": "通道参数写入成功",
+            "ack": {
+                "operation_count": ack_info.get("operation_count"),
+                "operations": [
+                    {"address": op.get("address"), "value": op.get("value")}
+                    for op in ack_info.get("operations", [])
+                ]
+            }
         }
         
     except HTTPException:
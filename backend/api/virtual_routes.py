@@ -1,32 +1,34 @@
 #!/usr/bin/env python3
 # api/virtual_routes.py - 虚实融合系统专用API路由
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 import logging
-from models import NodeSettings
+from typing import Optional
+
+from models import NodeSettings, WatchRulesUpdate
+from api.device_routes import get_device
+from register_watch import parse_int
+from register_history import DEFAULT_HISTORY_POINTS, MAX_HISTORY_POINTS
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/virtual", tags=["Virtual"])
 
-def init_sender(sender):
-    """初始化发送器引用"""
-    global udp_sender
-    udp_sender = sender
+# 按设备ID访问: /api/devices/{device_id}/virtual/...
+device_router = APIRouter(prefix="/api/devices/{device_id}/virtual", tags=["Virtual"])
 
 @router.post("/node-settings")
-async def send_node_settings(settings: NodeSettings):
+@device_router.post("/node-settings")
+async def send_node_settings(settings: NodeSettings, device_id: Optional[str] = None):
     """发送节点配置到目标设备"""
+    device = get_device(device_id)
     try:
-        logger.info("📤 准备发送节点配置...")
-        
-        if not udp_sender:
-            raise HTTPException(status_code=500, detail="UDP发送器未初始化")
+        logger.info(f"📤 准备发送节点配置... (设备: {device.device_id})")
         
         # 转换为字典
         settings_dict = settings.dict()
         
         # 发送节点配置
-        success = udp_sender.send_node_operation(settings_dict)
+        success = await device.transmit_queue.submit(device.sender.send_node_operation, settings_dict)
         
         if not success:
             raise HTTPException(status_code=500, detail="节点配置发送失败")
@@ -41,4 +43,91 @@ async def send_node_settings(settings: NodeSettings):
         raise
     except Exception as e:
         logger.error(f"❌ 发送节点配置失败: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/watch")
+@device_router.get("/watch")
+async def get_watch_rules(device_id: Optional[str] = None):
+    """获取寄存器监视规则及其状态(批量读取的寄存器、各规则当前位段值与触发次数)"""
+    device = get_device(device_id)
+    return {
+        "success": True,
+        "data": device.monitor.watch.get_status()
+    }
+
+@router.put("/watch")
+@device_router.put("/watch")
+async def set_watch_rules(update: WatchRulesUpdate, device_id: Optional[str] = None):
+    """替换寄存器监视规则, 下一轮询周期生效(所有规则的寄存器合并为一次批量读取)"""
+    device = get_device(device_id)
+    try:
+        watch = device.monitor.set_watch_rules(update.rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"监视规则无效: {e}")
+    
+    return {
+        "success": True,
+        "message": f"监视规则已更新: {len(watch.rules)} 条",
+        "data": watch.get_status()
+    }
+
+@router.get("/history")
+@device_router.get("/history")
+async def get_register_history_status(device_id: Optional[str] = None):
+    """寄存器历史概况: 每个寄存器的记录数与最早/最新记录时间, 缓冲区容量与内存"""
+    device = get_device(device_id)
+    return {
+        "success": True,
+        "data": device.history.get_status()
+    }
+
+@router.get("/history/{register}")
+@device_router.get("/history/{register}")
+async def query_register_history(
+    register: str,
+    device_id: Optional[str] = None,
+    start: Optional[float] = Query(None, description="起始时间(Unix秒), 为空时为最早记录"),
+    end: Optional[float] = Query(None, description="结束时间(Unix秒), 为空时为最新记录"),
+    points: int = Query(DEFAULT_HISTORY_POINTS, ge=1, le=MAX_HISTORY_POINTS, description="最多返回的点数"),
+    bits: Optional[str] = Query(None, description="只取位段, 如 11:8")
+):
+    """
+    按时间范围查询单个寄存器的历史
+
+    记录数超过 points 时把 [start, end] 等分为 points 个时间桶, 每桶返回
+    桶起始时间 t / 最小值 min / 最大值 max / 最后一个值 last / 记录数 count(列数组)
+    """
+    device = get_device(device_id)
+    try:
+        address = parse_int(register, "register")
+        field = None
+        if bits:
+            high, low = (parse_int(item.strip(), "bits") for item in bits.split(":"))
+            if not 0 <= low <= high <= 31:
+                raise ValueError(f"bits 超出范围: {bits}")
+            field = (high, low)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="结束时间早于起始时间")
+
+    result = device.history.query(address, start, end, points, field)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"寄存器 0x{address:02X} 没有历史记录")
+
+    return {
+        "success": True,
+        "data": result
+    }
+
+@router.delete("/history")
+@device_router.delete("/history")
+async def clear_register_history(device_id: Optional[str] = None):
+    """清空寄存器历史"""
+    device = get_device(device_id)
+    device.history.clear()
+    return {
+        "success": True,
+        "message": "寄存器历史已清空"
+    }
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# benchmarks/clock_sync.py - 主机/FPGA时钟同步: 系统时间(秒) vs 请求/响应对直线拟合
+#
+# 用法 (在 backend 目录下): python -m benchmarks.clock_sync [秒数]
+#
+# 1. 离线: 标称1MHz、漂移+50ppm、任意初始偏移的模拟计数器, 往返时间0.2~2ms随机、5%样本排队20ms,
+#    不同拟合窗口下换算误差(对比真实计数值)和每个样本的拟合开销; 同时给出旧实现(系统时间秒)的误差;
+#    往返时间从 0.2~0.5ms 持续升高到 10~11ms 后, 重新采用样本前丢弃的读取次数
+# 2. 实时: 本地UDP模拟FPGA板卡, 计数器寄存器随主机时钟带漂移前进, 监控器 50Hz 轮询并同步,
+#    统计 0x02 帧时间字段、接收帧 fpga_time 与板卡真实计数器的误差
+import sys
+import time
+import random
+import asyncio
+import statistics
+
+from config import SystemMode, current_mode
+from clock_sync import ClockSync, COUNTER_MODULUS, UNSYNCED_COUNTER, CLOCK_SYNC_WINDOW
+from device_registry import DeviceRegistry
+from benchmarks.virtual_monitor import StandInFpga
+
+COUNTER_REGISTER = 0x20
+NOMINAL_HZ = 1000000
+DRIFT_PPM = 50.0
+
+class DriftingCounter:
+    """模拟FPGA计数器: 标称 NOMINAL_HZ, 实际快 DRIFT_PPM, 初始值随机"""
+
+    def __init__(self, origin: float):
+        self.origin = origin
+        self.start = random.randrange(COUNTER_MODULUS)
+        self.rate = NOMINAL_HZ * (1 + DRIFT_PPM * 1e-6)
+
+    def at(self, host_time: float) -> int:
+        return int(self.start + (host_time - self.origin) * self.rate) % COUNTER_MODULUS
+
+class CounterRegisters(dict):
+    """板卡寄存器: 计数器寄存器每次读取时取当前计数值"""
+
+    def __init__(self, registers: dict, counter: DriftingCounter):
+        super().__init__(registers)
+        self.counter = counter
+
+    def get(self, address, default=None):
+        if address == COUNTER_REGISTER:
+            return self.counter.at(time.perf_counter())
+        return super().get(address, default)
+
+def counter_error_us(measured: int, actual: int) -> float:
+    """两个32位计数值之差(微秒, 按标称频率)"""
+    delta = (measured - actual) % COUNTER_MODULUS
+    if delta >= COUNTER_MODULUS / 2:
+        delta -= COUNTER_MODULUS
+    return abs(delta) / NOMINAL_HZ * 1e6
+
+def offline(window: int, samples: int = 3000, rate: float = 50.0):
+    random.seed(window)
+    counter = DriftingCounter(0.0)
+    clock = ClockSync(register=COUNTER_REGISTER, clock_hz=NOMINAL_HZ, window=window)
+
+    errors = []
+    fit_time = 0.0
+    for i in range(samples):
+        sent_at = 1000.0 + i / rate
+        rtt = random.uniform(0.0002, 0.002) + (0.02 if random.random() < 0.05 else 0.0)
+        # 计数器在往返中的任意时刻被读取
+        read_at = sent_at + random.uniform(0.25, 0.75) * rtt
+        start = time.perf_counter()
+        clock.add_sample(sent_at, sent_at + rtt, counter.at(read_at))
+        fit_time += time.perf_counter() - start
+
+        # 两个样本之间的任意时刻换算
+        query = sent_at + random.uniform(0, 1 / rate)
+        measured = clock.to_counter(query)
+        if measured is not None and i > samples // 10:
+            errors.append(counter_error_us(measured, counter.at(query)))
+
+    status = clock.get_status()
+    errors.sort()
+    print(f"窗口 {window:>4}  误差 平均 {statistics.mean(errors):7.1f} us / p99 {errors[int(len(errors) * 0.99)]:7.1f} us  "
+          f"漂移估计 {status['drift_ppm']:+7.2f} ppm (实际 {DRIFT_PPM:+.2f})  "
+          f"丢弃 {status['rejected']:>3}  拟合 {fit_time * 1e6 / samples:6.1f} us/样本")
+
+def rtt_step(window: int, samples: int = 1000, rate: float = 50.0):
+    """往返时间在第 samples/2 次读取时持续升高(如链路改走路由), 统计升高后丢弃的样本数与之后的换算误差"""
+    random.seed(window)
+    counter = DriftingCounter(0.0)
+    clock = ClockSync(register=COUNTER_REGISTER, clock_hz=NOMINAL_HZ, window=window)
+
+    step = samples // 2
+    rejected_before = 0
+    errors = []
+    for i in range(samples):
+        if i == step:
+            rejected_before = clock.rejected
+        sent_at = 1000.0 + i / rate
+        rtt = random.uniform(0.0002, 0.0005) + (0.01 if i >= step else 0.0)
+        clock.add_sample(sent_at, sent_at + rtt, counter.at(sent_at + rtt / 2))
+
+        query = sent_at + random.uniform(0, 1 / rate)
+        if i >= samples - 100:
+            errors.append(counter_error_us(clock.to_counter(query), counter.at(query)))
+
+    print(f"窗口 {window:>4}  往返时间升高后丢弃 {clock.rejected - rejected_before:>4}/{samples - step} 次读取  "
+          f"最后100次换算误差 平均 {statistics.mean(errors):7.1f} us")
+
+def legacy_error():
+    """旧实现: int(time.time()) 的截断误差 0 ~ 1s"""
+    errors = [(now - int(now)) * 1e6 for now in (1700000000 + random.random() for _ in range(10000))]
+    print(f"旧: 系统时间(秒)  误差 平均 {statistics.mean(errors):9.1f} us / 最大 {max(errors):9.1f} us, "
+          f"且与链路时间戳(FPGA计数器)不是同一时基")
+
+async def live(seconds: float):
+    board = StandInFpga(delay=0)
+    counter = DriftingCounter(time.perf_counter())
+    board.registers = CounterRegisters(board.registers, counter)
+
+    registry = DeviceRegistry.from_config({
+        "devices": [{
+            "id": "fpga", "transport": "udp", "local_ip": "127.0.0.1", "udp_receive_port": 0,
+            "arm_ip": "127.0.0.1", "arm_port": board.port,
+            "virtual_monitor_rate": 50,
+            "clock_sync_register": COUNTER_REGISTER, "fpga_clock_hz": NOMINAL_HZ
+        }]
+    })
+    device = registry.get()
+    await registry.start()
+    responses = device.bus.subscribe(topics=(0x05,), maxlen=100000)
+    device.monitor.start()
+
+    # 每100ms置位一次 0x26[11:8] 触发 0x02 帧
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        board.registers[0x26] = 1 << 8
+        await asyncio.sleep(0.05)
+        board.registers[0x26] = 0
+        await asyncio.sleep(0.05)
+
+    device.monitor.stop()
+    received = responses.drain()
+    responses.close()
+    status = device.clock.get_status()
+    registry.stop()
+    board.close()
+
+    # 同步锁定前发出的帧时间字段为 UNSYNCED_COUNTER, 单独计数
+    unlocked = sum(1 for field in board.timestamp_fields if field == UNSYNCED_COUNTER)
+    frame_errors = [
+        counter_error_us(field, counter.at(arrived))
+        for arrived, field in zip(board.timestamp_frames, board.timestamp_fields)
+        if field != UNSYNCED_COUNTER
+    ]
+    receive_errors = []
+    for msg in received:
+        if "fpga_time" not in msg:
+            continue
+        for op in msg["fpga_operation_info"].get("operations", []):
+            if op.get("address") == COUNTER_REGISTER:
+                receive_errors.append(counter_error_us(msg["fpga_time"], op["value"]))
+
+    print(f"同步状态: 锁定 {status['locked']}  样本 {status['samples']} (丢弃 {status['rejected']})  "
+          f"漂移 {status.get('drift_ppm', 0):+.2f} ppm  残差 {status.get('residual_us', 0):.1f} us  "
+          f"往返 最小 {status.get('rtt_ms', {}).get('min', 0):.3f} ms  锁定前发出的 0x02 帧 {unlocked}")
+    for name, errors in (("0x02 帧时间字段(含发送和板卡接收延迟)", frame_errors),
+                         ("接收帧 fpga_time(含板卡发送到主机接收)", receive_errors)):
+        if errors:
+            errors.sort()
+            print(f"{name}: {len(errors)} 帧  误差 平均 {statistics.mean(errors):7.1f} us / "
+                  f"p99 {errors[int(len(errors) * 0.99)]:7.1f} us")
+        else:
+            print(f"{name}: 无")
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+    legacy_error()
+    print(f"默认拟合窗口 {CLOCK_SYNC_WINDOW}")
+    for window in (16, 64, 256, 512, 1024):
+        offline(window)
+    for window in (64, 512):
+        rtt_step(window)
+    print()
+
+    current_mode["mode"] = SystemMode.VIRTUAL
+    await live(seconds)
+    current_mode["mode"] = SystemMode.GROUND
+
+if __name__ == "__main__":
+    asyncio.run(main())
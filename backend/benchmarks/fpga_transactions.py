@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# benchmarks/fpga_transactions.py - FPGA事务层: 发送即返回 vs 等待响应, 在途请求数, 丢包与重发
+#
+# 用法 (在 backend 目录下): python -m benchmarks.fpga_transactions [请求数]
+#
+# 本地UDP模拟ARM: 每个 0x05 请求延迟5ms后原样应答(各请求的应答互不阻塞), 可按比例丢弃请求.
+# 1. 旧实现(发送即返回): 丢包20%时报告成功的请求中实际未被应答的比例
+# 2. 事务层: 在途上限 1 / 4 / 16 时完成全部请求的耗时和吞吐
+# 3. 丢包20%: 重发 0 / 2 次时成功、超时与重发次数
+import sys
+import time
+import random
+import socket
+import asyncio
+import threading
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import FPGA, FPGA_READ
+from device_registry import DeviceRegistry
+from fpga_transactions import FpgaTimeout
+
+class EchoArm:
+    """模拟ARM: 0x05 请求延迟 delay 秒后应答, 按 drop 比例丢弃请求"""
+
+    def __init__(self, delay: float = 0.005, drop: float = 0.0):
+        self.delay = delay
+        self.drop = drop
+        self.received = 0
+        self.answered = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.deframer = StreamDeframer()
+        self.random = random.Random(1)
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            for frame in self.deframer.feed_datagram(data):
+                if frame.message_type != 0x05:
+                    continue
+                self.received += 1
+                if self.random.random() < self.drop:
+                    continue
+                operation_type, count = FPGA.decode(frame)
+                schema = FPGA_READ if frame.message_length == 2 + 4 * count else FPGA
+                items = [(item[0], item[1] if len(item) > 1 else 0) for item in schema.iter_items(frame, count)]
+                reply = bytes(FPGA.encode(operation_type, len(items), items=items))
+                threading.Timer(self.delay, self._reply, (reply, addr)).start()
+
+    def _reply(self, reply: bytes, addr):
+        if self.running:
+            self.answered += 1
+            self.sock.sendto(reply, addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+def requests(count: int) -> list:
+    """count 个写请求, 每个写3个寄存器(地址集合各不相同)"""
+    return [[(0x100 + i % 200, i), (0x300 + i % 7, i), (0x400, i)] for i in range(count)]
+
+async def start_device(arm: EchoArm, **settings):
+    registry = DeviceRegistry.from_config({
+        "devices": [dict({
+            "id": "fpga", "transport": "udp", "local_ip": "127.0.0.1", "udp_receive_port": 0,
+            "arm_ip": "127.0.0.1", "arm_port": arm.port
+        }, **settings)]
+    })
+    await registry.start()
+    return registry, registry.get()
+
+async def fire_and_forget(count: int):
+    arm = EchoArm(drop=0.2)
+    registry, device = await start_device(arm)
+
+    successes = 0
+    for operations in requests(count):
+        successes += bool(await device.transmit_queue.submit(
+            device.sender.send_fpga_operation, operation_type=1, batch_operations=operations
+        ))
+    await asyncio.sleep(0.1)
+    registry.stop()
+    arm.close()
+    print(f"旧: 发送即返回   报告成功 {successes}/{count}  ARM实际应答 {arm.answered}  "
+          f"未应答却报告成功 {successes - arm.answered}")
+
+async def in_flight(count: int, limit: int):
+    arm = EchoArm()
+    registry, device = await start_device(arm, fpga_max_in_flight=limit)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(device.transactions.request(1, operations) for operations in requests(count)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    status = device.transactions.get_status()
+    registry.stop()
+    arm.close()
+
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    print(f"在途上限 {limit:>2}   {count} 个请求 {elapsed * 1000:7.1f} ms  {count / elapsed:7.0f} 请求/秒  "
+          f"平均延迟 {status['mean_latency_ms']:6.1f} ms  失败 {failed}")
+
+async def lossy(count: int, retries: int):
+    arm = EchoArm(drop=0.2)
+    registry, device = await start_device(arm, fpga_retries=retries, fpga_response_timeout_ms=50, fpga_max_in_flight=16)
+
+    results = await asyncio.gather(
+        *(device.transactions.request(1, operations) for operations in requests(count)),
+        return_exceptions=True
+    )
+    status = device.transactions.get_status()
+    registry.stop()
+    arm.close()
+
+    timeouts = sum(1 for result in results if isinstance(result, FpgaTimeout))
+    print(f"丢包20% 重发 {retries}  成功 {count - timeouts}/{count}  超时 {timeouts}  重发 {status['retried']}  "
+          f"丢弃的迟到应答 {status['stale']}  无对应请求 {status['unmatched']}")
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    current_mode["mode"] = SystemMode.VIRTUAL
+
+    await fire_and_forget(count)
+    print()
+    for limit in (1, 4, 16):
+        await in_flight(count, limit)
+    print()
+    for retries in (0, 2):
+        await lossy(count, retries)
+
+    current_mode["mode"] = SystemMode.GROUND
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# benchmarks/frame_decode.py - 帧解码+处理: 切片解析为字典 vs 零拷贝 Frame 记录
+#
+# 用法 (在 backend 目录下): python -m benchmarks.frame_decode [迭代次数]
+#
+# 旧实现(legacy_*): 帧头/内容/CRC逐段切片为 bytes, 处理时再切片 + struct.unpack, LoRa数据立即转十六进制;
+# 新实现: decode_frame 返回 Frame(缓冲区 + 偏移), 处理函数用预编译 Struct 原位解析, 数据保留为视图.
+# FPGA帧: 单个操作(18字节) 与 16个操作的批量读写.
+# 两者都不校验CRC, 只比较解码与处理本身; 另统计消息队列中每条积压的LoRa结果占用的内存.
+import sys
+import time
+import struct
+import tracemalloc
+
+from config import FRAME_SYNC_HEADER
+from frame_parser import decode_frame, build_message
+from frame_processor import process_fpga_frame, process_lora_frame
+
+ADDR = ("127.0.0.1", 8003)
+
+def legacy_parse(data: bytes):
+    if len(data) < 8 or struct.unpack('>I', data[0:4])[0] != FRAME_SYNC_HEADER:
+        return None
+    message_type, message_length = data[4], data[5]
+    if len(data) < 8 + message_length:
+        return None
+    struct.unpack('>H', data[6 + message_length:8 + message_length])
+    return {"message_type": message_type, "message_length": message_length,
+            "message_content": data[6:6 + message_length]}
+
+def legacy_fpga(parsed: dict) -> dict:
+    content = parsed["message_content"]
+    if len(content) < 2:
+        raise ValueError("FPGA数据长度不足")
+    operation_type, operation_count = content[0], content[1]
+    operations = []
+    offset = 2
+    for i in range(operation_count):
+        if offset + 8 > len(content):
+            break
+        address = struct.unpack('>I', content[offset:offset + 4])[0]
+        data = struct.unpack('>I', content[offset + 4:offset + 8])[0]
+        operations.append({"index": i + 1, "address": address, "value": data})
+        offset += 8
+    return {"message_type": 0x05, "fpga_operation_info": {
+        "operation_type_code": operation_type, "operation_count": operation_count,
+        "operations": operations, "total_operations_parsed": len(operations)}}
+
+def legacy_lora(parsed: dict) -> dict:
+    content = parsed["message_content"]
+    receive_timestamp = struct.unpack('>I', content[0:4])[0]
+    complete_timestamp = struct.unpack('>I', content[4:8])[0]
+    frame_count = content[8]
+    data_hex = content[9:].hex().upper()
+    return {"message_type": 0x07, "lora_receive_info": {
+        "frame_count": frame_count, "duration_ms": complete_timestamp - receive_timestamp,
+        "data_content": data_hex}}
+
+def rate(func, iterations: int) -> float:
+    """帧/秒(7轮取最快)"""
+    best = float("inf")
+    for _ in range(7):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return iterations / best
+
+def retained(build, count: int = 5000) -> float:
+    """积压 count 条处理结果(每条来自独立的数据报)时每条占用的字节数"""
+    tracemalloc.start()
+    results = [build() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return size / count
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+
+    fpga = build_message(0x05, bytes([0, 1]) + struct.pack('>II', 0x25, 0x1234))
+    fpga_batch = build_message(0x05, bytes([1, 16]) + b"".join(struct.pack('>II', 0x100 + i, i) for i in range(16)))
+    lora = build_message(0x07, struct.pack('>IIB', 100, 140, 7) + bytes(range(246)))
+
+    for name, frame, legacy_process, process in (
+        (f"{len(fpga)}B FPGA", fpga, legacy_fpga, process_fpga_frame),
+        (f"{len(fpga_batch)}B FPGA", fpga_batch, legacy_fpga, process_fpga_frame),
+        (f"{len(lora)}B LoRa", lora, legacy_lora, process_lora_frame)
+    ):
+        old = rate(lambda: legacy_process(legacy_parse(frame)), iterations)
+        new = rate(lambda: process(decode_frame(frame, check_crc=False), ADDR), iterations)
+        print(f"{name:<10} 字典 {old:>10,.0f} 帧/秒  →  Frame {new:>10,.0f} 帧/秒")
+
+    old = retained(lambda: legacy_lora(legacy_parse(bytes(lora))))
+    new = retained(lambda: process_lora_frame(decode_frame(bytes(lora), check_crc=False), ADDR))
+    print(f"积压的LoRa结果(含数据报) {old:6.0f} 字节/条  →  {new:6.0f} 字节/条 (不生成十六进制字符串)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# benchmarks/frame_stream.py - 通用帧流: 全部推送后客户端过滤 vs 服务端先过滤再编码
+#
+# 用法 (在 backend 目录下): python -m benchmarks.frame_stream [帧数]
+#
+# 经回环设备的接收管线发布混合帧(虚实融合模式 0x00/0x01/0x05, 地面检测模式 0x07),
+# 积压后由SSE生成器输出, 统计各过滤条件下服务端的CPU开销(按发布的全部帧平均)、推送字节数和推送帧数.
+import sys
+import json
+import time
+import asyncio
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import VIRTUAL_SEND, VIRTUAL_RECEIVE, FPGA, LORA_RECEIVE
+from device_registry import DeviceRegistry
+from event_stream import FRAME_INFO_KEYS, FrameFilter, build_frame_event, batched_subscription_events
+
+def make_frames(count: int, mode: SystemMode) -> list:
+    """虚实融合模式: 信号发送/接收帧各40%, FPGA响应20%; 地面检测模式: LoRa接收帧"""
+    deframer = StreamDeframer()
+    datagrams = []
+    for i in range(count):
+        if mode == SystemMode.GROUND:
+            data = LORA_RECEIVE.encode(i, i + 40, i & 0xFF, payload=bytes(64))
+        elif i % 5 < 2:
+            data = VIRTUAL_SEND.encode(i, 0x100, payload=bytes(128))
+        elif i % 5 < 4:
+            data = VIRTUAL_RECEIVE.encode(i, i + 1, payload=bytes(128))
+        else:
+            data = FPGA.encode(0, 2, items=[(0x25, i), (0x26, i)])
+        datagrams.append(deframer.feed_datagram(bytes(data))[0])
+    return datagrams
+
+async def measure(name: str, device, frames: list, types, build_event, wanted=None):
+    """积压 frames 后输出全部SSE事件, wanted 为客户端需要的帧类型(客户端过滤时)"""
+    subscription = device.bus.subscribe(topics=types, name=f"bench-{name}", maxlen=len(frames))
+    for frame in frames:
+        device.pipeline.dispatch(frame, ("127.0.0.1", 0))
+
+    chunks = []
+    start = time.process_time()
+    async for chunk in batched_subscription_events(subscription, build_event, 200, 0.05):
+        chunks.append(chunk)
+        if subscription.lag == 0:
+            break
+    elapsed = time.process_time() - start
+    subscription.close()
+
+    size = delivered = kept = errors = 0
+    for chunk in chunks:
+        size += len(chunk)
+        for block in chunk.split("\n\n"):
+            if not block:
+                continue
+            event = json.loads(block[6:])
+            items = event["data"] if event["type"].endswith("_batch") else [event["data"]]
+            delivered += len(items)
+            kept += sum(1 for item in items if wanted is None or item["message_type"] in wanted)
+            errors += sum(1 for item in items if "error" in item)
+
+    print(f"{name:<28} CPU {elapsed * 1e6 / len(frames):6.2f} us/帧  推送 {delivered:>6} 帧  "
+          f"需要 {kept:>6} 帧  {size / 1024:8.1f} KB  处理失败 {errors}")
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    registry = DeviceRegistry.from_config({"devices": [{"id": "bench", "transport": "loopback"}]})
+    device = registry.get()
+    await registry.start()
+
+    current_mode["mode"] = SystemMode.VIRTUAL
+    frames = make_frames(count, SystemMode.VIRTUAL)
+    print(f"虚实融合模式 {count} 帧 (0x00 40% / 0x01 40% / 0x05 20%), 客户端只需要 FPGA响应 0x05")
+    await measure("不过滤, 客户端丢弃", device, frames, None, build_frame_event, wanted={0x05})
+    await measure("服务端按类型过滤", device, frames, {0x05}, FrameFilter())
+    await measure("全部类型, 不推送数据", device, frames, set(FRAME_INFO_KEYS), FrameFilter(payload_bytes=0))
+
+    current_mode["mode"] = SystemMode.GROUND
+    frames = make_frames(count, SystemMode.GROUND)
+    print(f"\n地面检测模式 {count} 帧 LoRa, frame_count 0~255 循环")
+    await measure("LoRa 全部", device, frames, {0x07}, FrameFilter())
+    await measure("frame_count 0~63", device, frames, {0x07}, FrameFilter(0, 63))
+    await measure("每10帧抽1帧, 数据前8字节", device, frames, {0x07}, FrameFilter(sample_every=10, payload_bytes=8))
+
+    registry.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# benchmarks/loop_lag.py - 并发LoRa发送时的事件循环延迟
+#
+# 用法 (在 backend 目录下): python -m benchmarks.loop_lag [并发请求数] [波特率]
+#
+# 模拟 /api/lora/send 处理函数: 直接调用同步发送 vs 经由 TransmitQueue 提交.
+# 串口发送用按波特率计算的线路时间模拟 serial.write + flush 的阻塞.
+import sys
+import time
+import socket
+import asyncio
+import statistics
+
+from transport import Transport, UDPMultiplexer, UDPTransport
+from frame_sender import FrameSender
+from transmit_queue import TransmitQueue
+
+DATA_HEX = "0123456789ABCDEF" * 8
+
+class SimulatedSerialTransport(Transport):
+    """按线路时间阻塞的串口传输 (10位/字节)"""
+
+    kind = "serial"
+
+    def __init__(self, baudrate: int):
+        self.baudrate = baudrate
+
+    async def start(self):
+        return True
+
+    def stop(self):
+        pass
+
+    def send(self, data, target=None):
+        time.sleep(len(data) * 10 / self.baudrate)
+        return True
+
+    def get_status(self):
+        return {"kind": self.kind, "baudrate": self.baudrate}
+
+async def probe_lag(samples: list, stop: asyncio.Event, interval: float = 0.001):
+    """每 interval 秒唤醒一次, 记录实际唤醒的延迟"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - start - interval) * 1000)
+
+async def run(sender, transmit_queue, requests: int):
+    """并发发起 requests 个发送请求, 返回 (事件循环延迟样本, 总耗时)"""
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(samples, stop))
+    await asyncio.sleep(0.05)
+
+    async def handler(i):
+        kwargs = dict(timing_enable=0, timing_time=0, data_content=DATA_HEX, frame_count=i & 0xFF)
+        if transmit_queue is None:
+            return sender.send_lora_message(**kwargs)
+        return await transmit_queue.submit(sender.send_lora_message, **kwargs)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.05)
+    stop.set()
+    await probe
+    assert all(results)
+    return samples, elapsed
+
+def report(name: str, samples: list, elapsed: float, requests: int):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    print(f"{name:<26} 延迟 p50 {statistics.median(samples):7.2f} ms  p99 {p99:8.2f} ms  "
+          f"max {samples[-1]:8.2f} ms   {requests / elapsed:9,.0f} 请求/秒")
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    baudrate = int(sys.argv[2]) if len(sys.argv) > 2 else 115200
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    sink.bind(("127.0.0.1", 0))
+    target = sink.getsockname()
+
+    # 未启动接收器的UDP传输: 发送器使用自有socket(临时端口)
+    udp_transport = UDPTransport(UDPMultiplexer("127.0.0.1", 0), target[0], target[1])
+    udp_sender = FrameSender(udp_transport)
+    serial_sender = FrameSender(SimulatedSerialTransport(baudrate))
+
+    print(f"并发请求 {requests}, 串口模拟 {baudrate} baud")
+    for name, sender in (("UDP", udp_sender), (f"串口@{baudrate}", serial_sender)):
+        samples, elapsed = await run(sender, None, requests)
+        report(f"{name} 直接调用", samples, elapsed, requests)
+
+        transmit_queue = TransmitQueue(name)
+        transmit_queue.start()
+        samples, elapsed = await run(sender, transmit_queue, requests)
+        transmit_queue.stop()
+        report(f"{name} TransmitQueue", samples, elapsed, requests)
+
+    udp_transport.stop()
+    sink.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
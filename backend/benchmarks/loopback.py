@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# benchmarks/loopback.py - 全链路回环: 发送 → 发送队列 → 传输层 → 拆帧 → 处理 → 消息总线 → 订阅者
+#
+# 用法 (在 backend 目录下): python -m benchmarks.loopback [请求数] [并发数]
+#
+# 使用内存回环传输, 模拟设备对每个LoRa发送帧回一个LoRa接收帧, 无需硬件.
+import sys
+import time
+import asyncio
+import statistics
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import LORA_SEND, LORA_RECEIVE
+from message_bus import message_bus
+from transport import LoopbackTransport
+from frame_sender import FrameSender
+from transmit_queue import TransmitQueue
+
+DATA_HEX = "0123456789ABCDEF" * 8
+
+device_deframer = StreamDeframer()
+
+def lora_echo(data: bytes) -> bytes:
+    """模拟设备: LoRa发送帧原样回送为LoRa接收帧(frame_count不变)"""
+    frame = device_deframer.feed_datagram(data)[0]
+    _, _, frame_count = LORA_SEND.decode(frame)
+    payload = frame.content_view(LORA_SEND.payload_offset())
+    return bytes(LORA_RECEIVE.encode(0, 1, frame_count, payload=payload))
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    current_mode["mode"] = SystemMode.GROUND
+    transport = LoopbackTransport(responder=lora_echo)
+    await transport.start()
+    sender = FrameSender(transport)
+    transmit_queue = TransmitQueue("loopback")
+    transmit_queue.start()
+
+    # 应答由写线程发布: 订阅者回调切回事件循环, 按 frame_count 唤醒等待方
+    loop = asyncio.get_running_loop()
+    waiters = {}
+    subscription = message_bus.subscribe(topics=(0x07,), name="bench-loopback")
+
+    def on_arrival():
+        for msg in subscription.drain():
+            future = waiters.pop(msg["lora_receive_info"]["frame_count"], None)
+            if future is not None and not future.done():
+                future.set_result(time.perf_counter())
+
+    subscription.notify = lambda: loop.call_soon_threadsafe(on_arrival)
+
+    latencies = []
+    slots = asyncio.Semaphore(min(concurrency, 256))
+
+    async def round_trip(i: int):
+        async with slots:
+            frame_count = i & 0xFF
+            future = loop.create_future()
+            waiters[frame_count] = future
+            start = time.perf_counter()
+            await transmit_queue.submit(sender.send_lora_message, 0, 0, DATA_HEX, frame_count)
+            done = await asyncio.wait_for(future, 1.0)
+            latencies.append((done - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(round_trip(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    subscription.close()
+    transmit_queue.stop()
+    transport.stop()
+
+    latencies.sort()
+    stats = transport.get_status()["stats"]
+    print(f"请求 {requests}, 并发 {min(concurrency, 256)}, 发送帧长 {stats['sent_bytes'] // stats['sent_frames']} 字节")
+    print(f"往返延迟 p50 {statistics.median(latencies):.3f} ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms  "
+          f"max {latencies[-1]:.3f} ms   {requests / elapsed:,.0f} 往返/秒")
+    print(f"传输层统计: {stats}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
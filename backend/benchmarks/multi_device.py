@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# benchmarks/multi_device.py - 多设备: 本地UDP模拟板卡, 验证设备隔离并测量共用接收的吞吐
+#
+# 用法 (在 backend 目录下): python -m benchmarks.multi_device [设备数] [每设备帧数]
+#
+# 每块模拟板卡一个UDP socket: LoRa发送帧原样回送为LoRa接收帧, FPGA读请求回送 (板号<<16 | 地址).
+# 所有设备共用一个本地接收socket, 按源地址分发到各设备的消息总线.
+# 另检查非ARM源地址(127.0.0.3)发来的数据报: 单设备时由该设备处理, 多设备时交给 udp_catch_all 设备或计入未匹配.
+import sys
+import time
+import socket
+import asyncio
+import threading
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import LORA_SEND, LORA_RECEIVE, FPGA, FPGA_READ
+from device_registry import DeviceRegistry
+
+class StandInBoard:
+    """模拟ARM板卡"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.deframer = StreamDeframer()
+        self.received = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def _reply(self, frame) -> bytes:
+        if frame.message_type == 0x07:
+            _, _, frame_count = LORA_SEND.decode(frame)
+            payload = frame.content_view(LORA_SEND.payload_offset())
+            return bytes(LORA_RECEIVE.encode(0, 1, frame_count, payload=payload))
+
+        if frame.message_type == 0x05:
+            operation_type, count = FPGA.decode(frame)
+            schema = FPGA_READ if frame.message_length == 2 + 4 * count else FPGA
+            items = [(item[0], (self.index << 16) | item[0]) for item in schema.iter_items(frame, count)]
+            return bytes(FPGA.encode(operation_type, len(items), items=items))
+        return b""
+
+    def _loop(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            for frame in self.deframer.feed_datagram(data):
+                self.received += 1
+                reply = self._reply(frame)
+                if reply:
+                    self.sock.sendto(reply, addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        await asyncio.sleep(0.001)
+    return True
+
+async def run(mode: str, device_count: int, frames: int):
+    boards = [StandInBoard(i + 1) for i in range(device_count)]
+    registry = DeviceRegistry.from_config({
+        "devices": [
+            {
+                "id": f"arm{board.index}",
+                "transport": "udp",
+                "local_ip": "127.0.0.1",
+                "udp_receive_port": 0,
+                "udp_receiver_mode": mode,
+                "arm_ip": "127.0.0.1",
+                "arm_port": board.port
+            }
+            for board in boards
+        ]
+    })
+    assert await registry.start()
+    devices = list(registry)
+    threads_before = threading.active_count()
+
+    # ---- LoRa: 每个设备并发发送, 只应收到自己板卡的回送 ----
+    current_mode["mode"] = SystemMode.GROUND
+    subscriptions = {d.device_id: d.bus.subscribe(topics=(0x07,), maxlen=frames * 2) for d in devices}
+
+    async def send_all(device, index: int):
+        tag = f"{index:02X}" * 16
+        for i in range(frames):
+            await device.transmit_queue.submit(device.sender.send_lora_message, 0, 0, tag, i & 0xFF)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send_all(d, i + 1) for i, d in enumerate(devices)))
+    complete = await wait_for(lambda: all(len(s) >= frames for s in subscriptions.values()))
+    elapsed = time.perf_counter() - start
+
+    isolated = True
+    for i, device in enumerate(devices):
+        messages = subscriptions[device.device_id].drain()
+        tags = {bytes(m["lora_receive_info"]["data"][:1])[0] for m in messages}
+        isolated &= len(messages) == frames and tags == {i + 1}
+        subscriptions[device.device_id].close()
+
+    total = frames * device_count
+    print(f"[{mode:<7}] {device_count} 个设备 LoRa往返 {total} 帧  {total / elapsed:9,.0f} 帧/秒  "
+          f"{'完整' if complete else '不完整'}  {'隔离正确' if isolated else '串扰!'}")
+
+    # ---- FPGA: 各设备读寄存器, 应答值必须来自对应板卡 ----
+    current_mode["mode"] = SystemMode.VIRTUAL
+    mailboxes = {d.device_id: d.bus.mailbox(topics=(0x05,), key=lambda m: 0) for d in devices}
+    for device in devices:
+        await device.transmit_queue.submit(
+            device.sender.send_fpga_operation, 0, batch_operations=[(0x25, 0), (0x26, 0)]
+        )
+    await wait_for(lambda: all(m.get(0) is not None for m in mailboxes.values()))
+
+    correct = True
+    for i, device in enumerate(devices):
+        msg = mailboxes[device.device_id].take(0)
+        values = [op["value"] for op in msg["fpga_operation_info"]["operations"]] if msg else []
+        correct &= values == [((i + 1) << 16) | 0x25, ((i + 1) << 16) | 0x26]
+        mailboxes[device.device_id].close()
+    print(f"[{mode:<7}] FPGA读应答按设备分发 {'正确' if correct else '错误'}")
+
+    status = registry.get_status()
+    mux = status["udp_multiplexers"]
+    receive_threads = threads_before - 1 - 2 * device_count  # 除去主线程、发送队列和模拟板卡
+    print(f"[{mode:<7}] 接收复用器 {len(mux)} 个, 接收socket {mux[0]['local']}, 未匹配帧 {mux[0]['unrouted']}, "
+          f"接收线程 {receive_threads} 个")
+
+    registry.stop()
+    for board in boards:
+        board.close()
+    current_mode["mode"] = SystemMode.GROUND
+
+async def stray_source(mode: str, device_count: int, catch_all: bool):
+    """从非ARM地址向共用接收端口发送一帧LoRa接收帧, 返回 (收到该帧的设备ID列表, 未匹配帧数)"""
+    registry = DeviceRegistry.from_config({
+        "devices": [
+            {
+                "id": f"arm{i + 1}",
+                "transport": "udp",
+                "local_ip": "127.0.0.1",
+                "udp_receive_port": 0,
+                "udp_receiver_mode": mode,
+                "arm_ip": "127.0.0.2",
+                "arm_port": 9000 + i,
+                "udp_catch_all": catch_all and i == 0
+            }
+            for i in range(device_count)
+        ]
+    })
+    assert await registry.start()
+    current_mode["mode"] = SystemMode.GROUND
+    devices = list(registry)
+    subscriptions = {d.device_id: d.bus.subscribe(topics=(0x07,)) for d in devices}
+
+    local_ip, local_port = registry.get_status()["udp_multiplexers"][0]["local"].split(":")
+    stranger = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    stranger.bind(("127.0.0.3", 0))
+    stranger.sendto(bytes(LORA_RECEIVE.encode(0, 1, 7, payload=b"stray")), (local_ip, int(local_port)))
+    stranger.close()
+    await wait_for(lambda: any(len(s) for s in subscriptions.values()), timeout=0.5)
+
+    receivers = [device_id for device_id, s in subscriptions.items() if s.drain()]
+    for subscription in subscriptions.values():
+        subscription.close()
+    unrouted = registry.get_status()["udp_multiplexers"][0]["unrouted"]
+    registry.stop()
+    return receivers, unrouted
+
+async def check_stray_sources(mode: str):
+    for device_count, catch_all, expected in ((1, False, ["arm1"]), (2, True, ["arm1"]), (2, False, [])):
+        receivers, unrouted = await stray_source(mode, device_count, catch_all)
+        ok = receivers == expected and unrouted == (0 if expected else 1)
+        print(f"[{mode:<7}] 非ARM源地址 {device_count} 个设备{' (arm1 udp_catch_all)' if catch_all else ''}: "
+              f"处理设备 {receivers or '无'}  未匹配帧 {unrouted}  {'正确' if ok else '错误'}")
+
+async def main():
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    for mode in ("thread", "asyncio"):
+        await run(mode, device_count, frames)
+        await check_stray_sources(mode)
+
+if __name__ == "__main__":
+    asyncio.run(main())
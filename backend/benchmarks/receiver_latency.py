@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# benchmarks/receiver_latency.py - UDP接收: 接收线程 vs asyncio数据报端点 (从发送到事件循环中消费者的延迟)
+#
+# 用法 (在 backend 目录下): python -m benchmarks.receiver_latency [秒数]
+#
+# 本地UDP发送LoRa接收帧(数据前8字节为发送时刻) → 接收 → 消息总线 → 事件循环中的消费者:
+# - 线程 + 100ms轮询: 旧实现, 接收线程发布, 消费者每100ms取一次队列
+# - 线程 + 唤醒: 接收线程发布, 跨线程唤醒事件循环(call_soon_threadsafe)
+# - asyncio: 数据报端点在事件循环中解析并发布, 直接唤醒消费者
+# 分别在稀疏(10帧/秒)与密集(1000帧/秒、尽快发送)时统计延迟分位数.
+import sys
+import time
+import struct
+import asyncio
+import statistics
+import threading
+
+from config import SystemMode, current_mode
+from message_bus import message_bus
+from transport import UDPMultiplexer, UDPTransport
+from benchmarks.sse_delivery import paced_sender
+
+def sent_at(msg: dict) -> float:
+    return struct.unpack_from("<d", msg["lora_receive_info"]["data"])[0]
+
+async def consume(subscription, latencies: list, poll: bool, threadsafe: bool):
+    """取出全部积压消息并记录延迟; poll 为True时每100ms取一次, 否则等待唤醒"""
+    wakeup = None if poll else subscription.async_wakeup(threadsafe)
+    while True:
+        if poll:
+            await asyncio.sleep(0.1)
+        elif subscription.lag == 0:
+            await wakeup.wait()
+            continue
+        while True:
+            msg = subscription.get_nowait()
+            if msg is None:
+                break
+            latencies.append((time.perf_counter() - sent_at(msg)) * 1000)
+
+async def measure(name: str, mode: str, poll: bool, rate: float, seconds: float):
+    multiplexer = UDPMultiplexer("127.0.0.1", 0, mode)
+    transport = UDPTransport(multiplexer, "127.0.0.1", 0)
+    await transport.start()
+    target = multiplexer.receiver.get_socket().getsockname()
+
+    subscription = message_bus.subscribe(topics=(0x07,), name=f"bench-{name}", maxlen=1 << 20)
+    latencies = []
+    task = asyncio.create_task(consume(subscription, latencies, poll, not multiplexer.async_delivery))
+    stop = threading.Event()
+    sender = threading.Thread(target=paced_sender, args=(target, rate, seconds, stop), daemon=True)
+
+    start = time.perf_counter()
+    sender.start()
+    # 发送线程与事件循环并行运行, 期间事件循环只处理消费者(与接收端点)
+    await asyncio.sleep(seconds + 0.2)
+    stop.set()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    elapsed = time.perf_counter() - start
+    sent = subscription.published
+    subscription.close()
+    transport.stop()
+
+    label = f"{rate:,.0f} 帧/秒" if rate else "尽快发送"
+    if not latencies:
+        print(f"{name:<14} {label:<12} 无消息")
+        return
+    latencies.sort()
+    print(f"{name:<14} {label:<12} 消费 {len(latencies):>7}/{sent:<7} {len(latencies) / elapsed:9,.0f} 帧/秒  "
+          f"延迟 p50 {statistics.median(latencies):8.3f} ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:8.3f} ms  "
+          f"最大 {latencies[-1]:8.3f} ms")
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    current_mode["mode"] = SystemMode.GROUND
+
+    for rate in (10, 1000, 0):
+        if rate:
+            await measure("线程+100ms轮询", "thread", True, rate, seconds)
+        await measure("线程+唤醒", "thread", False, rate, seconds)
+        await measure("asyncio", "asyncio", False, rate, seconds)
+        print()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# benchmarks/register_history.py - 寄存器历史: NumPy环形缓冲区 vs Python列表, 降采样查询
+#
+# 用法 (在 backend 目录下): python -m benchmarks.register_history [每个寄存器的记录数]
+#
+# 1. 写入: 每次读响应4个寄存器, 每次记录的开销; 写满后的内存(对比 (时间, 值) 元组列表)
+# 2. 查询: 全部范围 / 最近1小时, 降采样到1000点的耗时与JSON大小(对比返回全部原始记录)
+# 3. 尖峰: 单条记录的尖峰在降采样后是否仍可见
+import sys
+import json
+import time
+import tracemalloc
+
+from register_history import RegisterHistory
+
+REGISTERS = (0x25, 0x26, 0x45, 0x46)
+RATE = 10.0
+
+def fill(history: RegisterHistory, count: int, origin: float) -> float:
+    """按 RATE 写入 count 次读取, 返回每次记录的耗时(微秒)"""
+    start = time.perf_counter()
+    for i in range(count):
+        history.record(origin + i / RATE, {address: (i * address) & 0xFFFF for address in REGISTERS})
+    return (time.perf_counter() - start) * 1e6 / count
+
+def list_memory(count: int) -> int:
+    """旧式历史: 每个寄存器一个 (时间, 值) 元组列表"""
+    tracemalloc.start()
+    lists = {address: [(i / RATE, (i * address) & 0xFFFF) for i in range(count)] for address in REGISTERS}
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del lists
+    return size
+
+def query(history: RegisterHistory, name: str, start, end, points: int = 1000, repeat: int = 20):
+    began = time.perf_counter()
+    for _ in range(repeat):
+        result = history.query(0x26, start, end, points)
+    elapsed = (time.perf_counter() - began) * 1000 / repeat
+    size = len(json.dumps(result))
+
+    times, values = history.series[0x26].select(start, end)
+    raw_size = len(json.dumps({"t": times.tolist(), "value": values.tolist()}))
+    print(f"{name:<12} {result['samples']:>8} 条记录 → {len(result['t']):>5} 点  查询 {elapsed:7.2f} ms  "
+          f"JSON {size / 1024:8.1f} KB  (全部原始记录 {raw_size / 1024:9.1f} KB)")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 360000
+    origin = time.time() - count / RATE
+
+    history = RegisterHistory(capacity=count)
+    cost = fill(history, count, origin)
+    status = history.get_status()
+    print(f"{count} 次读取 x {len(REGISTERS)} 个寄存器 ({count / RATE / 3600:.1f} 小时 @ {RATE:.0f}Hz)")
+    print(f"NumPy 环形缓冲区  记录 {cost:6.2f} us/次  内存 {status['memory_bytes'] / 2 ** 20:7.1f} MB (固定)")
+    print(f"元组列表          {'':>20}内存 {list_memory(count) / 2 ** 20:7.1f} MB (随时间增长, 无上限)")
+
+    # 再写入一半: 覆盖最旧的记录, 内存不变
+    fill(history, count // 2, origin + count / RATE)
+    newest = origin + (count + count // 2) / RATE
+    print(f"写满后继续写入 {count // 2} 次: 内存 {history.get_status()['memory_bytes'] / 2 ** 20:.1f} MB, "
+          f"最早记录 {history.get_status()['registers']['0x26']['oldest'] - origin:.0f} 秒处")
+    print()
+
+    query(history, "全部范围", None, None)
+    query(history, "最近1小时", newest - 3600, None)
+    query(history, "最近1分钟", newest - 60, None)
+    print()
+
+    # 尖峰: 一条记录为0xFFFF, 其余小于0x100
+    spike = RegisterHistory(capacity=count)
+    for i in range(count):
+        spike.record(origin + i / RATE, {0x26: 0xFFFF if i == count // 3 else i & 0xFF})
+    result = spike.query(0x26, points=1000)
+    print(f"尖峰 0xFFFF (1/{count} 条记录): 降采样到 {len(result['t'])} 点后 max 中出现 {result['max'].count(0xFFFF)} 次, "
+          f"last 中出现 {result['last'].count(0xFFFF)} 次")
+
+if __name__ == "__main__":
+    main()
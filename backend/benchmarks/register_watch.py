@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# benchmarks/register_watch.py - 寄存器监视规则: 评估开销、去抖效果、规则数与轮询往返
+#
+# 用法 (在 backend 目录下): python -m benchmarks.register_watch [秒数]
+#
+# 1. 评估: 每次批量读取结果评估全部规则的CPU开销
+# 2. 去抖: 含单次毛刺的位段序列, 不同 debounce 下边沿触发的次数
+# 3. 轮询: 本地UDP模拟FPGA板卡, 2条 / 24条规则时每周期的读请求数、实际频率和读响应延迟
+import sys
+import time
+import asyncio
+
+from config import SystemMode, current_mode
+from device_registry import DeviceRegistry
+from register_watch import RegisterWatch, DEFAULT_WATCH_RULES, WATCH_EVENT_TOPIC
+from virtual_monitor import VirtualMonitor
+from benchmarks.virtual_monitor import StandInFpga
+
+def extra_rules(count: int) -> list:
+    """count 条监视 0x100 起各寄存器低8位变化的事件规则"""
+    return [
+        {"name": f"reg{i}", "register": 0x100 + i, "bits": [7, 0], "condition": "changed", "action": "event"}
+        for i in range(count)
+    ]
+
+def evaluate_cost(rule_count: int, cycles: int = 20000):
+    watch = RegisterWatch(DEFAULT_WATCH_RULES + extra_rules(rule_count - len(DEFAULT_WATCH_RULES)))
+    samples = [
+        {address: (cycle >> 4) & 0xFFFF for address in watch.addresses}
+        for cycle in range(256)
+    ]
+    start = time.perf_counter()
+    fired = 0
+    for cycle in range(cycles):
+        fired += len(watch.evaluate(samples[cycle & 0xFF]))
+    elapsed = time.perf_counter() - start
+    print(f"{rule_count:>3} 条规则  批量读取 {len(watch.addresses):>3} 个寄存器  评估 {elapsed * 1e6 / cycles:6.2f} us/周期  触发 {fired}")
+
+def debounce_effect():
+    # 0x26[11:8]: 稳定0 → 单次毛刺 → 稳定0 → 持续置位 → 单次掉落 → 持续置位 → 清零
+    sequence = [0] * 5 + [1] + [0] * 5 + [1] * 6 + [0] + [1] * 6 + [0] * 5
+    for debounce in (1, 2, 3):
+        rule = dict(DEFAULT_WATCH_RULES[0], debounce=debounce)
+        watch = RegisterWatch([rule])
+        fired = [i for i, field in enumerate(sequence) if watch.evaluate({0x26: field << 8, 0x25: 0})]
+        print(f"debounce {debounce}: 边沿触发 {len(fired)} 次, 位于读取 #{fired}")
+
+    watch = RegisterWatch([dict(DEFAULT_WATCH_RULES[0], trigger="level", debounce=2)])
+    fired = sum(1 for field in sequence if watch.evaluate({0x26: field << 8, 0x25: 0}))
+    print(f"level debounce 2: 触发 {fired} 次(条件为真的读取每次触发)")
+
+async def poll(rule_count: int, seconds: float):
+    board = StandInFpga()
+    registry = DeviceRegistry.from_config({
+        "devices": [{
+            "id": "fpga", "transport": "udp", "local_ip": "127.0.0.1", "udp_receive_port": 0,
+            "arm_ip": "127.0.0.1", "arm_port": board.port
+        }]
+    })
+    device = registry.get()
+    await registry.start()
+
+    watch = RegisterWatch(DEFAULT_WATCH_RULES + extra_rules(rule_count - len(DEFAULT_WATCH_RULES)))
+    monitor = VirtualMonitor(device.sender, device.bus, name="bench-watch", rate=50, watch=watch, transactions=device.transactions)
+    events = device.bus.subscribe(topics=(WATCH_EVENT_TOPIC,), maxlen=100000)
+    monitor.start()
+
+    # 模拟寄存器变化: 每20ms改变一个被监视寄存器
+    start = time.perf_counter()
+    step = 0
+    while time.perf_counter() - start < seconds:
+        board.registers[0x100 + step % max(1, rule_count - 2)] = step & 0xFF
+        step += 1
+        await asyncio.sleep(0.02)
+
+    monitor.stop()
+    stats = monitor.get_stats()
+    event_count = len(events.drain())
+    events.close()
+    registry.stop()
+    board.close()
+
+    latency = stats["response_latency_ms"]
+    print(f"{rule_count:>3} 条规则  读请求 {board.reads:>4} 次 / 周期 {stats['cycles']:>4}  实际 {stats['actual_rate_hz']:5.1f} Hz  "
+          f"读响应 平均 {latency.get('mean', 0):5.2f} ms / p99 {latency.get('p99', 0):5.2f} ms  "
+          f"监视事件 {event_count:>4}  超时 {stats['timeouts']}")
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+
+    for rule_count in (2, 8, 24):
+        evaluate_cost(rule_count)
+    print()
+    debounce_effect()
+    print()
+
+    current_mode["mode"] = SystemMode.VIRTUAL
+    for rule_count in (2, 24):
+        await poll(rule_count, seconds)
+    current_mode["mode"] = SystemMode.GROUND
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# benchmarks/serial_receive.py - 串口接收: 空闲CPU占用与持续吞吐 (Linux pty 模拟串口)
+#
+# 用法 (在 backend 目录下): python -m benchmarks.serial_receive [秒数]
+#
+# pty 主端按波特率节奏写入LoRa接收帧(10位/字节), 从端交给 SerialCommunicator 接收.
+import os
+import sys
+import time
+import tty
+import threading
+
+from config import SystemMode, current_mode
+from frame_schema import LORA_RECEIVE
+from message_bus import message_bus
+from serial_communicator import SerialCommunicator
+
+def open_pty():
+    """创建pty对, 返回 (主端fd, 从端设备名)"""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+    return master, slave, name
+
+def paced_writer(fd: int, frame: bytes, baudrate: int, seconds: float, counter: dict):
+    """按线路速率写入帧"""
+    byte_time = 10 / baudrate
+    burst = max(1, int(0.005 / (len(frame) * byte_time)))  # 每5ms左右写一批
+    start = time.perf_counter()
+    sent_bytes = 0
+    while time.perf_counter() - start < seconds:
+        os.write(fd, frame * burst)
+        sent_bytes += len(frame) * burst
+        counter["sent"] += burst
+        # 按线路时间等待
+        delay = start + sent_bytes * byte_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+def measure_idle(comm: SerialCommunicator, seconds: float) -> float:
+    """空闲时接收线程的CPU占用(%)"""
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    time.sleep(seconds)
+    return (time.process_time() - start_cpu) / (time.perf_counter() - start) * 100
+
+def measure_throughput(master: int, comm: SerialCommunicator, baudrate: int, seconds: float):
+    """按波特率持续写入, 统计接收帧数和CPU占用"""
+    frame = bytes(LORA_RECEIVE.encode(0, 10, 1, payload=bytes(range(48))))
+    subscription = message_bus.subscribe(topics=(0x07,), name="bench", maxlen=1 << 20)
+    counter = {"sent": 0}
+
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    writer = threading.Thread(target=paced_writer, args=(master, frame, baudrate, seconds, counter))
+    writer.start()
+    writer.join()
+    time.sleep(0.2)  # 等待接收完尾部
+    elapsed = time.perf_counter() - start
+    cpu = (time.process_time() - start_cpu) / elapsed * 100
+
+    received = len(subscription.drain())
+    subscription.close()
+
+    line_rate = baudrate / 10 / len(frame)
+    print(f"{baudrate:>7} baud  帧长 {len(frame)}B  发送 {counter['sent']:>6}  接收 {received:>6}  "
+          f"{received / seconds:8.0f} 帧/秒 (线路上限 {line_rate:6.0f})  CPU {cpu:5.1f}%")
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    current_mode["mode"] = SystemMode.GROUND
+
+    for baudrate in (115200, 921600):
+        master, slave, name = open_pty()
+        comm = SerialCommunicator(port=name, baudrate=baudrate)
+        comm.start_receiving()
+        time.sleep(0.2)
+
+        if baudrate == 115200:
+            print(f"空闲CPU占用: {measure_idle(comm, seconds):.2f}%")
+        measure_throughput(master, comm, baudrate, seconds)
+        print(f"         接收统计: {comm.get_status()['recv_stats']}")
+
+        comm.stop()
+        os.close(master)
+        os.close(slave)
+
+if __name__ == "__main__":
+    main()
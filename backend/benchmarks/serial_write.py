@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# benchmarks/serial_write.py - 串口发送: 逐帧 write+flush 与合并写入的线路利用率 (Linux pty 回环)
+#
+# 用法 (在 backend 目录下): python -m benchmarks.serial_write [帧数] [波特率]
+#
+# pty 主端按波特率节奏读出数据(10位/字节)模拟线路, 并校验收到的字节流与发送的一致.
+# pty 的 tcdrain 不等待主端读出, 逐帧flush的阻塞用"等待该帧在线路上传完"模拟(真实UART的行为).
+import os
+import sys
+import time
+import tty
+import select
+import threading
+
+from frame_schema import lora_frame_encoder, build_fpga_frame
+from serial_communicator import SerialCommunicator
+
+def open_pty():
+    """创建pty对, 返回 (主端fd, 从端fd, 从端设备名)"""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+def line_reader(fd: int, baudrate: int, expected: int, result: dict):
+    """按线路速率从主端读出 expected 字节"""
+    byte_time = 10 / baudrate
+    received = bytearray()
+    start = None
+    while len(received) < expected:
+        readable, _, _ = select.select([fd], [], [], 2.0)
+        if not readable:
+            break
+        now = time.perf_counter()
+        if start is None:
+            start = now
+        # 线路上最多已传完的字节数
+        allowed = int((now - start) / byte_time) + 1 - len(received)
+        if allowed <= 0:
+            time.sleep(byte_time)
+            continue
+        received += os.read(fd, min(allowed, 4096))
+    result["data"] = bytes(received)
+    result["elapsed"] = time.perf_counter() - start if start else 0.0
+
+def run(name: str, frames: list, baudrate: int, send):
+    """发送 frames 并统计线路利用率"""
+    master, slave, port = open_pty()
+    comm = SerialCommunicator(port=port, baudrate=baudrate)
+    expected = b"".join(frames)
+    result = {}
+    reader = threading.Thread(target=line_reader, args=(master, baudrate, len(expected), result))
+    reader.start()
+
+    start = time.perf_counter()
+    send(comm, frames)
+    blocked = time.perf_counter() - start
+    if comm.writer:
+        comm.writer.flush(timeout=30)
+    reader.join()
+
+    line_time = len(expected) * 10 / baudrate
+    utilization = line_time / result["elapsed"] if result["elapsed"] else 0.0
+    ok = "一致" if result["data"] == expected else "不一致!"
+    print(f"{name:<22} {len(frames):>5} 帧 {len(expected):>7} 字节  耗时 {result['elapsed']:6.3f}s  "
+          f"调用方阻塞 {blocked:6.3f}s  线路利用率 {utilization * 100:5.1f}%  数据{ok}")
+
+    status = comm.get_status()["writer"]
+    comm.stop()
+    os.close(master)
+    os.close(slave)
+    return status
+
+def per_frame_flush(comm: SerialCommunicator, frames: list):
+    """原实现: 每帧 write 后 flush (flush 等待该帧在线路上传完)"""
+    byte_time = 10 / comm.baudrate
+    line_free = time.perf_counter()
+    for frame in frames:
+        comm.serial.write(frame)
+        comm.serial.flush()
+        line_free = max(line_free, time.perf_counter()) + len(frame) * byte_time
+        delay = line_free - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+def coalesced(comm: SerialCommunicator, frames: list):
+    """SerialWriter: 入队即返回, 写线程合并写出"""
+    for frame in frames:
+        comm.send_raw_data(frame)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    baudrate = int(sys.argv[2]) if len(sys.argv) > 2 else 921600
+
+    lora = [bytes(lora_frame_encoder.encode(0, 0, i & 0xFF, "0123456789ABCDEF" * 2)) for i in range(count)]
+    fpga = [bytes(build_fpga_frame(1, batch_operations=[(0x25 + i % 4, i)] * 4)) for i in range(count)]
+
+    print(f"波特率 {baudrate}")
+    for label, frames in (("LoRa", lora), ("FPGA批量写", fpga)):
+        run(f"{label} 逐帧flush", frames, baudrate, per_frame_flush)
+        status = run(f"{label} 合并写入", frames, baudrate, coalesced)
+        print(f"{'':<22} 写次数 {status['stats']['writes']}, 平均每次 {status['avg_frames_per_write']} 帧")
+
+if __name__ == "__main__":
+    main()
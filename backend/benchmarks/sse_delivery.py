@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# benchmarks/sse_delivery.py - SSE推送: 100ms轮询 vs 到达即唤醒 vs 自适应批量 (延迟/吞吐/编码开销)
+#
+# 用法 (在 backend 目录下): python -m benchmarks.sse_delivery [秒数]
+#
+# 本地UDP发送LoRa接收帧(数据中带发送时刻) → 接收线程 → 消息总线 → SSE生成器,
+# 统计从发送到SSE生成器输出的延迟和每秒推送的帧数; 另测积压消息的编码开销.
+import sys
+import json
+import logging
+import time
+import struct
+import socket
+import asyncio
+import statistics
+import threading
+
+from config import SystemMode, current_mode
+from frame_schema import LORA_RECEIVE
+from message_bus import message_bus
+from transport import UDPMultiplexer, UDPTransport
+from frame_processor import process_lora_frame
+from deframer import StreamDeframer
+from event_stream import build_lora_event, format_sse, subscription_events, batched_subscription_events
+
+logger = logging.getLogger("sse")
+
+async def polling_events(subscription):
+    """旧实现: 每100ms取一条"""
+    while True:
+        msg = subscription.get_nowait()
+        if msg is None:
+            await asyncio.sleep(0.1)
+            continue
+        event_data = build_lora_event(msg)
+        if event_data is not None:
+            yield format_sse(event_data)
+            logger.info(f"SSE推送LoRa接收消息: 帧#{event_data['data']['frame_count']}")
+        await asyncio.sleep(0.1)
+
+def per_frame_events(subscription):
+    """逐帧编码推送(每帧一次 json.dumps / yield / logger.info)"""
+    async def stream():
+        while True:
+            msg = subscription.get_nowait()
+            if msg is None:
+                return
+            event_data = build_lora_event(msg)
+            yield format_sse(event_data)
+            logger.info(f"SSE推送LoRa接收消息: 帧#{event_data['data']['frame_count']}")
+    return stream()
+
+def batched(max_batch: int, flush_ms: int):
+    return lambda s: batched_subscription_events(s, build_lora_event, max_batch, flush_ms / 1000)
+
+def paced_sender(target, rate: float, seconds: float, stop: threading.Event):
+    """按 rate 帧/秒发送(0为尽快发送), 数据前8字节为发送时刻"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    next_at = start
+    while not stop.is_set() and time.perf_counter() - start < seconds:
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        payload = struct.pack("<d", time.perf_counter()) + bytes(24)
+        sock.sendto(LORA_RECEIVE.encode(0, 1, 0, payload=payload), target)
+        if not interval:
+            time.sleep(0)  # 让出GIL, 模拟网络到达
+    sock.close()
+
+async def measure(name: str, make_stream, target, rate: float, seconds: float):
+    subscription = message_bus.subscribe(topics=(0x07,), name=f"bench-{name}", maxlen=1 << 20)
+    stream = make_stream(subscription)
+    latencies = []
+    events = [0]
+    stop = threading.Event()
+    sender = threading.Thread(target=paced_sender, args=(target, rate, seconds, stop), daemon=True)
+
+    async def consume():
+        async for chunk in stream:
+            now = time.perf_counter()
+            for line in chunk.split("\n\n"):
+                if not line:
+                    continue
+                event = json.loads(line[6:])
+                events[0] += 1
+                for item in (event["data"] if event["type"].endswith("_batch") else [event["data"]]):
+                    data = bytes.fromhex(item["data_hex"])
+                    latencies.append((now - struct.unpack_from("<d", data)[0]) * 1000)
+
+    task = asyncio.create_task(consume())
+    start = time.perf_counter()
+    sender.start()
+    await asyncio.sleep(seconds + 0.2)
+    stop.set()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    elapsed = time.perf_counter() - start
+    sent = subscription.published
+    subscription.close()
+
+    latencies.sort()
+    label = f"{rate:,.0f} 帧/秒" if rate else "尽快发送"
+    if latencies:
+        print(f"{name:<10} {label:<12} 推送 {len(latencies):>7}/{sent:<7} {len(latencies) / elapsed:9,.0f} 帧/秒  "
+              f"SSE事件 {events[0]:>6}  "
+              f"延迟 p50 {statistics.median(latencies):8.2f} ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:8.2f} ms  "
+              f"积压 {sent - len(latencies)}")
+    else:
+        print(f"{name:<10} {label:<12} 无推送")
+
+async def encode_cost(name: str, make_stream, frames: int):
+    """积压 frames 条LoRa消息时, SSE生成器输出全部帧的CPU开销"""
+    subscription = message_bus.subscribe(topics=(0x07,), name=f"cost-{name}", maxlen=frames)
+    frame = StreamDeframer().feed_datagram(bytes(LORA_RECEIVE.encode(0, 1, 7, payload=bytes(range(64)))))[0]
+    for _ in range(frames):
+        subscription.put(process_lora_frame(frame, ("127.0.0.1", 0)))
+
+    events = size = 0
+    start = time.process_time()
+    async for chunk in make_stream(subscription):
+        events += chunk.count("data: ")
+        size += len(chunk)
+        if subscription.lag == 0:
+            break
+    elapsed = time.process_time() - start
+    subscription.close()
+    print(f"{name:<10} {frames} 帧  CPU {elapsed * 1e6 / frames:7.2f} us/帧  SSE事件 {events:>6}  {size / frames:6.1f} 字节/帧")
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    current_mode["mode"] = SystemMode.GROUND
+
+    multiplexer = UDPMultiplexer("127.0.0.1", 0, "thread")
+    transport = UDPTransport(multiplexer, "127.0.0.1", 0)
+    await transport.start()
+    # 发送端口为临时端口: 按IP匹配到该设备
+    target = multiplexer.receiver.get_socket().getsockname()
+
+    for rate in (10, 50, 1000, 0):
+        if rate:
+            await measure("100ms轮询", polling_events, target, rate, seconds)
+        await measure("到达即唤醒", lambda s: subscription_events(s, build_lora_event), target, rate, seconds)
+        await measure("自适应批量", batched(200, 50), target, rate, seconds)
+
+    print()
+    await encode_cost("逐帧推送", per_frame_events, 20000)
+    await encode_cost("自适应批量", batched(200, 50), 20000)
+
+    transport.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# benchmarks/sse_replay.py - SSE断线重连: 新订阅(断线期间的帧丢失) vs 重放缓冲区按 Last-Event-ID 补发
+#
+# 用法 (在 backend 目录下): python -m benchmarks.sse_replay [帧/秒] [断线秒数]
+#
+# 发送线程按固定速率经接收管线发布LoRa接收帧(数据前4字节为序号), SSE客户端接收一段时间后断开,
+# 等待后重连, 统计客户端收到的序号是否连续; 另测重放缓冲区的实际内存占用与估算值、超出容量时的丢帧告知.
+import sys
+import json
+import time
+import struct
+import asyncio
+import threading
+import tracemalloc
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import LORA_RECEIVE
+from frame_processor import process_lora_frame
+from message_bus import MessageBus
+from device_registry import DeviceRegistry
+from event_stream import build_lora_event, batched_subscription_events, lora_message_size
+
+def publisher(device, rate: float, stop: threading.Event):
+    """按 rate 帧/秒经设备接收管线发布, 数据前4字节为序号"""
+    deframer = StreamDeframer()
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    seq = 0
+    while not stop.is_set():
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_at += interval
+        data = LORA_RECEIVE.encode(0, 1, seq & 0xFF, payload=struct.pack("<I", seq) + bytes(28))
+        device.pipeline.dispatch(deframer.feed_datagram(bytes(data))[0], ("127.0.0.1", 0))
+        seq += 1
+
+class Client:
+    """SSE客户端: 解析事件, 记录收到的序号和最后的事件ID(与浏览器 EventSource 相同)"""
+
+    def __init__(self):
+        self.sequences = []
+        self.last_event_id = None
+        self.gaps = 0
+
+    def feed(self, chunk: str):
+        for block in chunk.split("\n\n"):
+            if not block:
+                continue
+            fields = dict(line.split(": ", 1) for line in block.split("\n"))
+            if "id" in fields:
+                self.last_event_id = fields["id"]
+            event = json.loads(fields["data"])
+            if event["type"] == "replay_gap":
+                self.gaps += event["data"]["missed"]
+                continue
+            items = event["data"] if event["type"].endswith("_batch") else [event["data"]]
+            for item in items:
+                self.sequences.append(struct.unpack_from("<I", bytes.fromhex(item["data_hex"]))[0])
+
+    def missing(self) -> int:
+        return self.sequences[-1] - self.sequences[0] + 1 - len(set(self.sequences))
+
+async def connect(client: Client, make_source, seconds: float):
+    """连接 seconds 秒后断开"""
+    source = make_source()
+    stream = batched_subscription_events(source, build_lora_event, 200, 0.05)
+
+    async def consume():
+        async for chunk in stream:
+            client.feed(chunk)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    source.close()
+
+async def reconnect(name: str, device, rate: float, offline: float, make_source):
+    client = Client()
+    stop = threading.Event()
+    thread = threading.Thread(target=publisher, args=(device, rate, stop), daemon=True)
+    thread.start()
+
+    await connect(client, lambda: make_source(None), 1.0)
+    await asyncio.sleep(offline)        # 断线(浏览器等待5秒后重连)
+    await connect(client, lambda: make_source(client.last_event_id), 1.0)
+    stop.set()
+    thread.join()
+
+    print(f"{name:<12} {rate:,.0f} 帧/秒 断线 {offline:.1f} 秒  收到 {len(client.sequences):>6} 帧  "
+          f"缺失 {client.missing():>6} 帧  告知丢失 {client.gaps}")
+
+def memory_usage(frames: int, size: int):
+    """重放缓冲区实际内存 vs 估算值"""
+    bus = MessageBus()
+    buffer = bus.replay_buffer(topics=(0x07,), capacity=frames, max_bytes=1 << 40, size=lora_message_size)
+    deframer = StreamDeframer()
+    datagrams = [bytes(LORA_RECEIVE.encode(i, i + 40, i & 0xFF, payload=bytes(size))) for i in range(frames)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for data in datagrams:
+        bus.publish(0x07, process_lora_frame(deframer.feed_datagram(data)[0], ("127.0.0.1", 0)))
+    actual = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # 消息中的数据是对数据报的零拷贝视图, 数据报随消息一起保留
+    actual += sum(map(sys.getsizeof, datagrams))
+    print(f"内存 {frames} 帧 x {size:>3} 字节  估算 {buffer.bytes / frames:6.0f} 字节/帧  实际 {actual / frames:6.0f} 字节/帧")
+
+async def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    offline = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    current_mode["mode"] = SystemMode.GROUND
+
+    registry = DeviceRegistry.from_config({"devices": [{"id": "bench", "transport": "loopback"}]})
+    device = registry.get()
+    await registry.start()
+
+    def new_subscription(last_event_id):
+        """旧实现: 每次连接新建订阅, 断线期间无人接收"""
+        return device.bus.subscribe(topics=(0x07,), name="sse-bench")
+
+    def replay_cursor(last_event_id):
+        return device.lora_replay.cursor(int(last_event_id) if last_event_id else None, name="sse-bench")
+
+    await reconnect("新建订阅", device, rate, offline, new_subscription)
+    await reconnect("重放补发", device, rate, offline, replay_cursor)
+
+    # 断线期间的帧超出重放缓冲区容量: 补发保留的部分, 其余以 replay_gap 告知
+    device.lora_replay.capacity = int(rate * offline / 2)
+    await reconnect("超出容量", device, rate, offline, replay_cursor)
+
+    registry.stop()
+    print()
+    for size in (32, 200):
+        memory_usage(10000, size)
+
+    # 读取开销: 实时读取方每次只取尾部少量帧, 与缓冲区长度无关
+    bus = MessageBus()
+    buffer = bus.replay_buffer(topics=(0x07,), capacity=100000, max_bytes=1 << 40)
+    for i in range(100000):
+        buffer.put(i)
+    cursor = buffer.cursor(buffer.last_id - 10)
+    start = time.perf_counter()
+    for _ in range(10000):
+        cursor.position = buffer.last_id - 10
+        cursor.drain()
+    print(f"读取尾部10帧(缓冲区 {len(buffer)} 帧)  {(time.perf_counter() - start) * 1e6 / 10000:.2f} us/次")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# benchmarks/udp_send.py - UDP发送吞吐测试 (发往本地UDP接收端)
+#
+# 用法 (在 backend 目录下): python -m benchmarks.udp_send [帧数] [批大小]
+import sys
+import time
+import socket
+import threading
+
+from frame_schema import lora_frame_encoder
+from udp_sender import UDPSender
+
+def run_sink(sock: socket.socket, counter: dict, stop: threading.Event):
+    """本地接收端: 只计数"""
+    sock.settimeout(0.2)
+    while not stop.is_set():
+        try:
+            sock.recv(65536)
+            counter["received"] += 1
+        except socket.timeout:
+            pass
+
+def bench(name: str, send, total: int, counter: dict):
+    """执行一轮发送并打印每秒发送数"""
+    counter["received"] = 0
+    start = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - start
+    time.sleep(0.3)  # 等待接收端取完
+    print(f"{name:<28} {total / elapsed:>12,.0f} 帧/秒   接收 {counter['received']}/{total}")
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    sink.bind(("127.0.0.1", 0))
+    target = sink.getsockname()
+
+    counter = {"received": 0}
+    stop = threading.Event()
+    thread = threading.Thread(target=run_sink, args=(sink, counter, stop), daemon=True)
+    thread.start()
+
+    frames = [bytes(lora_frame_encoder.encode(0, 0, i & 0xFF, "0123456789ABCDEF")) for i in range(total)]
+    sender = UDPSender(local_port=0)
+
+    def per_call_socket():
+        # 旧实现: 每次发送创建并关闭socket
+        for data in frames:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(data, target)
+
+    def persistent_socket():
+        for data in frames:
+            sender.send_raw_data(data, *target)
+
+    def batched():
+        for i in range(0, total, batch):
+            sender.send_batch(frames[i:i + batch], *target)
+
+    print(f"帧数 {total}, 帧长 {len(frames[0])} 字节, 批大小 {batch}")
+    bench("每次新建socket", per_call_socket, total, counter)
+    bench("长期socket sendto", persistent_socket, total, counter)
+    bench("send_batch" + (" (sendmmsg)" if sender.get_status()["sendmmsg"] else ""), batched, total, counter)
+
+    stop.set()
+    thread.join()
+    sender.close()
+    sink.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# benchmarks/virtual_monitor.py - 虚实融合监控: 固定等待(0.5s + 1s) vs 等待对应读响应 + 目标频率
+#
+# 用法 (在 backend 目录下): python -m benchmarks.virtual_monitor [每种配置的状态变化次数]
+#
+# 本地UDP模拟FPGA板卡: 读寄存器请求延迟2ms应答; 板卡置位 0x26[11:8] 后统计多久收到
+# 信号发送时间戳回传帧(0x02), 即监控器对寄存器变化的反应时间; 另输出监控器的轮询统计.
+import sys
+import time
+import socket
+import asyncio
+import statistics
+import threading
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import FPGA, FPGA_READ, VIRTUAL_TIMESTAMP
+from device_registry import DeviceRegistry
+from virtual_monitor import VirtualMonitor
+
+class LegacyMonitor(VirtualMonitor):
+    """旧实现: 发读请求 → 固定等待0.5s → 取响应 → 再等待1s"""
+
+    def _monitor_loop(self):
+        responses = self.bus.mailbox(topics=(0x05,), key=lambda msg: 0, name=self.name)
+        while self.running:
+            self.sender.send_fpga_operation(0, batch_operations=[(address, 0) for address in self.watch.addresses])
+            time.sleep(0.5)
+            msg = responses.take(0)
+            if msg is not None:
+                self._process_register_responses(msg)
+            self._check_and_send_frames(self.watch)
+            time.sleep(1)
+        responses.close()
+
+class StandInFpga:
+    """模拟FPGA板卡: 寄存器读请求延迟应答, 记录收到 0x02 帧的时刻和帧中的时间字段"""
+
+    def __init__(self, delay: float = 0.002):
+        self.delay = delay
+        self.registers = {0x25: 0x1234, 0x26: 0, 0x45: 0x5678, 0x46: 0}
+        self.timestamp_frames = []
+        self.timestamp_fields = []   # 0x02 帧的发送完成时间字段
+        self.reads = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.deframer = StreamDeframer()
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            for frame in self.deframer.feed_datagram(data):
+                if frame.message_type == 0x02:
+                    self.timestamp_frames.append(time.perf_counter())
+                    self.timestamp_fields.append(VIRTUAL_TIMESTAMP.decode(frame)[0])
+                elif frame.message_type == 0x05:
+                    self.reads += 1
+                    operation_type, count = FPGA.decode(frame)
+                    schema = FPGA_READ if frame.message_length == 2 + 4 * count else FPGA
+                    items = [(item[0], self.registers.get(item[0], 0)) for item in schema.iter_items(frame, count)]
+                    time.sleep(self.delay)
+                    self.sock.sendto(bytes(FPGA.encode(operation_type, len(items), items=items)), addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+def reaction_times(board: StandInFpga, changes: int, timeout: float) -> list:
+    """置位 0x26[11:8] 到收到 0x02 帧的时间(毫秒), 每次测量后清零并等待监控器看到清零"""
+    results = []
+    for _ in range(changes):
+        received = len(board.timestamp_frames)
+        changed_at = time.perf_counter()
+        board.registers[0x26] = 1 << 8
+        deadline = changed_at + timeout
+        while len(board.timestamp_frames) == received and time.perf_counter() < deadline:
+            time.sleep(0.0005)
+        if len(board.timestamp_frames) > received:
+            results.append((board.timestamp_frames[received] - changed_at) * 1000)
+        board.registers[0x26] = 0
+        time.sleep(timeout / 2)
+    return results
+
+async def run(name: str, make_monitor, changes: int, timeout: float):
+    board = StandInFpga()
+    registry = DeviceRegistry.from_config({
+        "devices": [{
+            "id": "fpga", "transport": "udp", "local_ip": "127.0.0.1", "udp_receive_port": 0,
+            "arm_ip": "127.0.0.1", "arm_port": board.port
+        }]
+    })
+    device = registry.get()
+    await registry.start()
+    monitor = make_monitor(device)
+    monitor.start()
+
+    results = await asyncio.to_thread(reaction_times, board, changes, timeout)
+    monitor.stop()
+    registry.stop()
+    board.close()
+
+    line = f"{name:<16} 反应时间"
+    if results:
+        line += f" 平均 {statistics.mean(results):8.1f} ms  最大 {max(results):8.1f} ms  ({len(results)}/{changes})"
+    else:
+        line += " 无"
+    print(line)
+
+    if not isinstance(monitor, LegacyMonitor):
+        stats = monitor.get_stats()
+        latency, jitter = stats["response_latency_ms"], stats["start_jitter_ms"]
+        print(f"{'':<16} 实际 {stats['actual_rate_hz']:6.1f} Hz  读响应 p99 {latency.get('p99', 0):6.2f} ms  "
+              f"开始抖动 平均 {jitter.get('mean', 0):5.2f} ms / p99 {jitter.get('p99', 0):5.2f} ms  "
+              f"超时 {stats['timeouts']}  错过截止 {stats['missed_deadlines']}")
+
+def paced(rate: float):
+    def make(device):
+        return VirtualMonitor(device.sender, device.bus, name=f"bench-{rate}", rate=rate, transactions=device.transactions)
+    return make
+
+async def main():
+    changes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    current_mode["mode"] = SystemMode.VIRTUAL
+
+    await run("旧: 固定等待", lambda d: LegacyMonitor(d.sender, d.bus, name="bench-legacy"), 2, 4.0)
+    for rate in (10, 50, 100):
+        await run(f"目标 {rate} Hz", paced(rate), changes, 0.5)
+    # 0 与超出上限的频率都按最高频率轮询, 不能绕过频率上限
+    await run("设置 0 Hz", paced(0), changes, 0.5)
+    await run("设置 1000 Hz", paced(1000), changes, 0.5)
+
+    current_mode["mode"] = SystemMode.GROUND
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# benchmarks/ws_records.py - LoRa接收帧: SSE JSON/十六进制 vs WebSocket二进制记录; WebSocket发送命令
+#
+# 用法 (在 backend 目录下): python -m benchmarks.ws_records [帧数] [数据字节数]
+#
+# 1. 编码: 服务端编码 + 客户端解析的CPU开销与每帧字节数
+# 2. 回环: 发送命令(逐帧 / 多帧一条命令) → 发送队列 → 回环设备 → 二进制记录流 → 解码
+import sys
+import json
+import time
+import asyncio
+
+from config import SystemMode, current_mode
+from deframer import StreamDeframer
+from frame_schema import LORA_SEND, LORA_RECEIVE
+from frame_processor import process_lora_frame
+from device_registry import DeviceRegistry
+from event_stream import build_lora_event, format_sse, format_sse_batch
+from ws_stream import encode_lora_record, pack_records, decode_records, record_stream, execute_command
+
+def make_messages(frames: int, size: int) -> list:
+    deframer = StreamDeframer()
+    messages = []
+    for i in range(frames):
+        data = bytes(LORA_RECEIVE.encode(1000 + i, 1040 + i, i & 0xFF, payload=bytes((i + j) & 0xFF for j in range(size))))
+        messages.append(process_lora_frame(deframer.feed_datagram(data)[0], ("127.0.0.1", 0)))
+    return messages
+
+def cost(name: str, encode, decode, messages: list):
+    start = time.process_time()
+    wire = encode(messages)
+    encoded = time.process_time()
+    received = decode(wire)
+    decoded = time.process_time()
+    assert received == len(messages), (name, received)
+
+    frames = len(messages)
+    size = sum(len(chunk) for chunk in wire)
+    print(f"{name:<16} 服务端 {(encoded - start) * 1e6 / frames:6.2f} us/帧  客户端 {(decoded - encoded) * 1e6 / frames:6.2f} us/帧  "
+          f"{size / frames:7.1f} 字节/帧  消息数 {len(wire)}")
+
+def sse_per_frame(messages):
+    return [format_sse(build_lora_event(msg)).encode() for msg in messages]
+
+def sse_batched(messages, batch: int = 200):
+    events = [build_lora_event(msg) for msg in messages]
+    return [format_sse_batch(events[i:i + batch]).encode() for i in range(0, len(events), batch)]
+
+def decode_sse(wire):
+    """浏览器端: JSON.parse + 十六进制转字节"""
+    count = 0
+    for chunk in wire:
+        event = json.loads(chunk[6:])
+        items = event["data"] if event["type"].endswith("_batch") else [event["data"]]
+        for item in items:
+            bytes.fromhex(item["data_hex"])
+            count += 1
+    return count
+
+def ws_binary(messages):
+    return pack_records(encode_lora_record(msg) for msg in messages)
+
+def decode_ws(wire):
+    return sum(len(decode_records(message)) for message in wire)
+
+def lora_echo(deframer: StreamDeframer):
+    """回环设备: LoRa发送帧回送为LoRa接收帧"""
+    def responder(data: bytes) -> bytes:
+        frame = deframer.feed_datagram(data)[0]
+        _, _, frame_count = LORA_SEND.decode(frame)
+        payload = frame.content_view(LORA_SEND.payload_offset())
+        return bytes(LORA_RECEIVE.encode(0, 1, frame_count, payload=payload))
+    return responder
+
+async def round_trip(frames: int, size: int, per_command: int):
+    """经由WebSocket命令发送 frames 帧, 从二进制记录流收回"""
+    registry = DeviceRegistry.from_config({"devices": [{"id": "bench", "transport": "loopback"}]})
+    device = registry.get()
+    device.transport.responder = lora_echo(StreamDeframer())
+    await registry.start()
+
+    subscription = device.bus.subscribe(topics=(0x07,), maxlen=frames * 2)
+    received = []
+
+    async def consume():
+        async for message in record_stream(subscription):
+            received.extend(decode_records(message))
+            if len(received) >= frames:
+                return
+
+    consumer = asyncio.create_task(consume())
+    data_hex = bytes(range(size)).hex()
+    start = time.perf_counter()
+    acks = []
+    for i in range(0, frames, per_command):
+        batch = [{"data_content": data_hex, "frame_count": (i + j) & 0xFF} for j in range(min(per_command, frames - i))]
+        command = {"cmd": "lora_send", "id": i, "frames": batch} if per_command > 1 else {"cmd": "lora_send", "id": i, **batch[0]}
+        acks.append(await execute_command(device, json.dumps(command)))
+    await asyncio.wait_for(consumer, 5.0)
+    elapsed = time.perf_counter() - start
+
+    subscription.close()
+    registry.stop()
+
+    ok = all(ack["success"] for ack in acks) and [r[1] for r in received] == [i & 0xFF for i in range(frames)]
+    print(f"每条命令 {per_command:>3} 帧  {frames / elapsed:9,.0f} 帧/秒  命令 {len(acks):>5} 条  "
+          f"回收 {len(received)}/{frames}  {'数据一致' if ok else '数据错误'}")
+
+async def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    current_mode["mode"] = SystemMode.GROUND
+
+    messages = make_messages(frames, size)
+    print(f"{frames} 帧, 数据 {size} 字节")
+    cost("SSE 逐帧JSON", sse_per_frame, decode_sse, messages)
+    cost("SSE 批量JSON", sse_batched, decode_sse, messages)
+    cost("WebSocket二进制", ws_binary, decode_ws, messages)
+
+    print()
+    for per_command in (1, 64):
+        await round_trip(min(frames, 5000), size, per_command)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# clock_sync.py - 主机/FPGA时钟同步: 由读寄存器的请求/响应对估计FPGA计数器相对主机单调时钟的偏移和漂移
+#
+# 每次读取计数器寄存器得到一个样本 (请求发出时刻 t0, 响应到达时刻 t1, 计数器值 c),
+# 取 (t0 + t1) / 2 为计数器被读取的主机时刻; 在最近 window 个样本上做最小二乘直线拟合
+#   c = ticks0 + rate * (t - host0)
+# rate 为实测的计数频率(相对标称频率的偏差即漂移); 漂移的估计精度取决于窗口跨越的时长, 默认窗口 512 个样本.
+# 拟合用的各项和随样本加入/移出增量更新(每 window 个样本以窗口首个样本为原点重算一次, 避免累积误差),
+# 每个样本的开销与窗口大小无关.
+# 往返时间明显大于最近 RTT_HISTORY 次读取(含丢弃的样本)最小往返时间的样本丢弃;
+# 往返时间整体升高后, 旧的最小值在 RTT_HISTORY 次读取内移出, 之后的样本重新被采用.
+import time
+import math
+import logging
+from collections import deque
+from typing import Optional
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 主机单调时钟(perf_counter)到系统时间的偏移, 启动时取一次, 之后系统时间跳变不影响帧时间
+WALL_OFFSET = time.time() - time.perf_counter()
+
+# FPGA计数器寄存器(为空时不同步)、标称计数频率(Hz)、拟合窗口(样本数)
+CLOCK_SYNC_REGISTER = CONFIG.get("clock_sync_register")
+FPGA_CLOCK_HZ = CONFIG.get("fpga_clock_hz", 1000000)
+CLOCK_SYNC_WINDOW = CONFIG.get("clock_sync_window", 512)
+
+# 锁定所需的最少样本数
+MIN_SYNC_SAMPLES = 8
+
+# 往返时间超过 最近读取的最小往返时间 * RTT_FACTOR + RTT_SLACK 的样本丢弃(调度或网络排队造成的大延迟)
+RTT_FACTOR = 2.0
+RTT_SLACK = 0.001
+
+# 往返时间过滤参考的最近读取次数
+RTT_HISTORY = 64
+
+# 计数器宽度(寄存器为32位)
+COUNTER_MODULUS = 1 << 32
+
+# 时钟同步已配置但尚未锁定时 0x02/0x03 帧时间字段的取值(不是有效的计数器时间)
+UNSYNCED_COUNTER = 0xFFFFFFFF
+
+class ClockSync:
+    """
+    单个设备的时钟同步状态
+
+    监控线程调用 add_sample, 接收线程调用 to_counter; 拟合结果整体替换(一次引用赋值), 读取无需加锁
+    """
+
+    def __init__(
+        self,
+        register: Optional[int] = CLOCK_SYNC_REGISTER,
+        clock_hz: float = FPGA_CLOCK_HZ,
+        window: int = CLOCK_SYNC_WINDOW
+    ):
+        self.register = None if register is None else (register if isinstance(register, int) else int(str(register), 0))
+        self.clock_hz = float(clock_hz)
+        self.samples = deque(maxlen=max(window, MIN_SYNC_SAMPLES))   # (主机时刻, 展开后的计数, 往返时间)
+        self._recent_rtts = deque(maxlen=min(self.samples.maxlen, RTT_HISTORY))   # 最近各次读取的往返时间(含丢弃的样本)
+
+        # 拟合的增量和: 相对原点 (_host_origin, _ticks_origin) 的 x / y / xx / xy / yy
+        self._host_origin = 0.0
+        self._ticks_origin = 0
+        self._sums = [0.0] * 5
+        self._since_rebase = 0
+
+        # 32位计数器回绕展开
+        self._last_raw: Optional[int] = None
+        self._wraps = 0
+
+        # 拟合结果 (host0, ticks0, rate, residual), 未锁定时为None
+        self.fit = None
+
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.register is not None
+
+    @property
+    def locked(self) -> bool:
+        return self.fit is not None
+
+    def add_sample(self, sent_at: float, received_at: float, counter: int) -> bool:
+        """
+        加入一个请求/响应样本(主机时刻为 perf_counter 秒), 返回是否被采用
+        """
+        rtt = received_at - sent_at
+        if rtt < 0:
+            return False
+
+        # 🔧 展开32位回绕(相邻样本间计数器不会前进超过半圈)
+        counter &= COUNTER_MODULUS - 1
+        if self._last_raw is not None and counter < self._last_raw and self._last_raw - counter > COUNTER_MODULUS // 2:
+            self._wraps += 1
+        self._last_raw = counter
+        ticks = counter + self._wraps * COUNTER_MODULUS
+
+        # 🔧 丢弃往返时间异常大的样本(参考值取最近各次读取的最小值, 往返时间整体升高后随之升高)
+        min_rtt = min(self._recent_rtts) if self._recent_rtts else None
+        self._recent_rtts.append(rtt)
+        if min_rtt is not None and rtt > min_rtt * RTT_FACTOR + RTT_SLACK:
+            self.rejected += 1
+            return False
+
+        sample = ((sent_at + received_at) / 2, ticks, rtt)
+        if len(self.samples) == self.samples.maxlen:
+            self._accumulate(self.samples[0], -1)
+        self.samples.append(sample)
+        self.accepted += 1
+
+        self._since_rebase += 1
+        if self._since_rebase >= self.samples.maxlen or len(self.samples) == 1:
+            self._rebase()
+        else:
+            self._accumulate(sample, 1)
+        self._refit()
+        return True
+
+    def _accumulate(self, sample: tuple, sign: int):
+        """样本加入(sign=1)或移出(sign=-1)拟合的增量和"""
+        x = sample[0] - self._host_origin
+        y = sample[1] - self._ticks_origin
+        sums = self._sums
+        sums[0] += sign * x
+        sums[1] += sign * y
+        sums[2] += sign * x * x
+        sums[3] += sign * x * y
+        sums[4] += sign * y * y
+
+    def _rebase(self):
+        """以窗口首个样本为原点重算增量和(限制和的量级, 清除累积的舍入误差)"""
+        self._host_origin, self._ticks_origin, _ = self.samples[0]
+        self._sums = [0.0] * 5
+        for sample in self.samples:
+            self._accumulate(sample, 1)
+        self._since_rebase = 0
+
+    def _refit(self):
+        """由增量和求窗口内样本的最小二乘直线拟合(拟合原点为样本均值)"""
+        count = len(self.samples)
+        if count < MIN_SYNC_SAMPLES:
+            return
+
+        sx, sy, sxx, sxy, syy = self._sums
+        mean_x = sx / count
+        mean_y = sy / count
+        sxx -= sx * mean_x
+        sxy -= sx * mean_y
+        syy -= sy * mean_y
+        if sxx <= 0 or sxy <= 0:
+            return
+
+        rate = sxy / sxx
+        residual = math.sqrt(max(syy - rate * sxy, 0.0) / count)
+
+        if self.fit is None:
+            logger.info(f"✅ 时钟同步已锁定 (计数频率 {rate:.1f}Hz, 漂移 {(rate / self.clock_hz - 1) * 1e6:+.1f}ppm)")
+        self.fit = (self._host_origin + mean_x, self._ticks_origin + mean_y, rate, residual)
+
+    def to_counter(self, host_time: float) -> Optional[int]:
+        """主机时刻 → FPGA计数器值(32位), 未锁定时返回None"""
+        fit = self.fit
+        if fit is None:
+            return None
+        host0, ticks0, rate, _ = fit
+        return int(round(ticks0 + rate * (host_time - host0))) % COUNTER_MODULUS
+
+    def to_host(self, counter: int) -> Optional[float]:
+        """
+        FPGA计数器值(32位) → 主机时刻, 未锁定时返回None
+
+        回绕取离拟合原点最近的一圈
+        """
+        fit = self.fit
+        if fit is None:
+            return None
+        host0, ticks0, rate, _ = fit
+        delta = (counter - ticks0) % COUNTER_MODULUS
+        if delta >= COUNTER_MODULUS / 2:
+            delta -= COUNTER_MODULUS
+        return host0 + delta / rate
+
+    def reset(self):
+        """清除样本和拟合结果(计数器复位或切换板卡后)"""
+        self.samples.clear()
+        self._recent_rtts.clear()
+        self._sums = [0.0] * 5
+        self._since_rebase = 0
+        self._last_raw = None
+        self._wraps = 0
+        self.fit = None
+
+    def get_status(self) -> dict:
+        status = {
+            "enabled": self.enabled,
+            "register": None if self.register is None else f"0x{self.register:02X}",
+            "locked": self.locked,
+            "nominal_hz": self.clock_hz,
+            "samples": len(self.samples),
+            "accepted": self.accepted,
+            "rejected": self.rejected
+        }
+        if self.samples:
+            rtts = [sample[2] for sample in self.samples]
+            status["rtt_ms"] = {
+                "min": round(min(rtts) * 1000, 3),
+                "mean": round(sum(rtts) / len(rtts) * 1000, 3),
+                "filter_min": round(min(self._recent_rtts) * 1000, 3)
+            }
+        fit = self.fit
+        if fit is not None:
+            _, _, rate, residual = fit
+            status.update({
+                "measured_hz": round(rate, 3),
+                "drift_ppm": round((rate / self.clock_hz - 1) * 1e6, 3),
+                "residual_us": round(residual / rate * 1e6, 3)
+            })
+        return status
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 # config.py - 配置管理
+import os
 import json
 import logging
 from pathlib import Path
@@ -33,6 +34,10 @@ def load_config():
 # 全局配置
 CONFIG = load_config()
 
+# 传输方式可由环境变量覆盖 (start_serial.bat 使用串口)
+if os.environ.get("TD_WEB_TRANSPORT"):
+    CONFIG["transport"] = os.environ["TD_WEB_TRANSPORT"].strip()
+
 # 🔧 新增：当前系统模式
 current_mode = {
     "mode": SystemMode.GROUND,  # 默认地面检测模式
@@ -57,8 +62,10 @@ FRAME_TYPE_NODE_SETTINGS = 0x08 # 节点参数设置帧
 # 帧同步头常量
 FRAME_SYNC_HEADER = 0x1ACFFC1D
 
-# 响应超时时间(秒)
-RESPONSE_TIMEOUT = 10
+# FPGA请求等待响应的超时时间(秒, 每次发送), 超时后重发的次数, 同时在途的请求数上限
+RESPONSE_TIMEOUT = CONFIG.get("fpga_response_timeout_ms", 1000) / 1000
+RESPONSE_RETRIES = CONFIG.get("fpga_retries", 2)
+MAX_IN_FLIGHT = CONFIG.get("fpga_max_in_flight", 8)
 
 # 存储所有通道参数
 current_parameters = {
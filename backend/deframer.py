@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# deframer.py - 流式拆帧器(UDP/串口共用)
+import time
+import struct
+import logging
+from typing import List, Tuple
+
+from frame_parser import Frame, SYNC_BYTES, calculate_crc16, parse_stats
+
+logger = logging.getLogger(__name__)
+
+_CRC_STRUCT = struct.Struct('>H')
+
+class StreamDeframer:
+    """
+    流式拆帧器
+
+    - 输入任意切分的字节块, 输出完整且CRC正确的帧
+    - 固定容量的线性缓冲区: 读写指针只向后推进, 写到末尾空间不足时把未读数据整体移到缓冲区开头(不回绕)
+    - 用 find 搜索同步头; CRC错误说明长度字节不可信, 从同步头后1字节重新同步
+    - 不完整帧等待超过 stale_timeout 秒视为伪同步头, 跳过后重新同步
+    """
+
+    def __init__(self, capacity: int = 65536, stale_timeout: float = 0.5):
+        self.capacity = capacity
+        self.stale_timeout = stale_timeout
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._read = 0
+        self._write = 0
+        self._base = 0              # 缓冲区起点对应的流偏移
+        self._pending_key = None    # 等待中的不完整帧(流偏移)
+        self._pending_since = 0.0
+
+        self.stats = {
+            "frames": 0,
+            "crc_errors": 0,
+            "discarded_bytes": 0,
+            "stale_resyncs": 0,
+            "overflows": 0
+        }
+
+    def _scan(self, buf, pos: int, end: int) -> Tuple[List[Tuple[int, int]], int, bool]:
+        """
+        扫描 buf[pos:end] 中的帧
+
+        Returns:
+            (帧区间列表[(起始, 总长度)], 扫描停止位置, 是否停在不完整帧上)
+        """
+        spans = []
+        crc_errors = 0
+        discarded = 0
+        waiting = False
+
+        while True:
+            sync = buf.find(SYNC_BYTES, pos, end)
+            if sync < 0:
+                # 保留末尾3字节, 同步头可能跨块
+                keep = max(pos, end - 3)
+                discarded += keep - pos
+                pos = keep
+                break
+
+            discarded += sync - pos
+            pos = sync
+            if end - pos < 8:
+                waiting = True
+                break
+
+            message_length = buf[pos + 5]
+            total_length = message_length + 8
+            if end - pos < total_length:
+                waiting = True
+                break
+
+            crc_end = pos + 6 + message_length
+            if calculate_crc16(buf, 0xFFFF, pos + 4, crc_end) == _CRC_STRUCT.unpack_from(buf, crc_end)[0]:
+                spans.append((pos, total_length))
+                pos += total_length
+            else:
+                crc_errors += 1
+                discarded += 1
+                pos += 1
+
+        self.stats["frames"] += len(spans)
+        self.stats["crc_errors"] += crc_errors
+        self.stats["discarded_bytes"] += discarded
+        parse_stats["accepted"] += len(spans)
+        parse_stats["crc_errors"] += crc_errors
+
+        return spans, pos, waiting
+
+    def _append(self, data):
+        """写入缓冲区(尾部空间不足时先把未读数据移到开头, 仍不足时丢弃最旧的数据)"""
+        size = len(data)
+        if self._write + size > self.capacity:
+            unread = self._write - self._read
+
+            # 容量不足: 丢弃最旧的数据
+            if unread + size > self.capacity:
+                self.stats["overflows"] += 1
+                if size >= self.capacity:
+                    self.stats["discarded_bytes"] += unread + size - self.capacity
+                    data = data[size - self.capacity:]
+                    size = self.capacity
+                    self._read = self._write
+                    unread = 0
+                else:
+                    drop = unread + size - self.capacity
+                    self.stats["discarded_bytes"] += drop
+                    self._read += drop
+                    unread -= drop
+
+            # 未读数据前移
+            self._buffer[0:unread] = self._buffer[self._read:self._write]
+            self._base += self._read
+            self._read = 0
+            self._write = unread
+
+        self._buffer[self._write:self._write + size] = data
+        self._write += size
+
+    def feed(self, data) -> List[Frame]:
+        """
+        输入一段字节流, 返回其中完整的帧
+
+        返回的帧持有独立的bytes副本, 不引用内部缓冲区
+        """
+        now = time.monotonic()
+
+        # 不完整帧等待超时: 跳过该同步头
+        if self._pending_key is not None and now - self._pending_since > self.stale_timeout:
+            if self._pending_key == self._base + self._read:
+                self._read += 1
+                self.stats["stale_resyncs"] += 1
+                self.stats["discarded_bytes"] += 1
+            self._pending_key = None
+
+        if data:
+            self._append(data)
+
+        spans, pos, waiting = self._scan(self._buffer, self._read, self._write)
+        self._read = pos
+        if self._read == self._write:
+            self._base += self._read
+            self._read = self._write = 0
+
+        if waiting:
+            key = self._base + self._read
+            if key != self._pending_key:
+                self._pending_key = key
+                self._pending_since = now
+        else:
+            self._pending_key = None
+
+        buf = self._buffer
+        view = self._view
+        return [
+            Frame(buf[start + 4], buf[start + 5], bytes(view[start:start + total_length]), 0)
+            for start, total_length in spans
+        ]
+
+    def feed_datagram(self, data: bytes) -> List[Frame]:
+        """
+        拆分一个UDP数据报(可包含多个连续帧)
+
+        数据报自成一体: 不经过内部缓冲区, 返回的帧直接引用该数据报(零拷贝),
+        尾部不完整的数据丢弃
+        """
+        spans, pos, waiting = self._scan(data, 0, len(data))
+        self.stats["discarded_bytes"] += len(data) - pos
+        return [
+            Frame(data[start + 4], data[start + 5], data, start)
+            for start, _ in spans
+        ]
+
+    def reset(self):
+        """清空缓冲区"""
+        self._base += self._write
+        self._read = self._write = 0
+        self._pending_key = None
+
+    def buffered(self) -> int:
+        """缓冲区中未处理的字节数"""
+        return self._write - self._read
+
+    def get_stats(self) -> dict:
+        """获取拆帧统计"""
+        stats = dict(self.stats)
+        stats["buffered_bytes"] = self.buffered()
+        return stats
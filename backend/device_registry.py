@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# device_registry.py - 多设备注册表: 每个ARM/FPGA设备独立的传输层、参数、监控器和接收管线
+import copy
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from config import CONFIG, current_parameters
+from message_bus import MessageBus, message_bus
+from frame_processor import ReceivePipeline, default_pipeline
+from transport import Transport, UDPMultiplexer, create_transport
+from frame_sender import FrameSender
+from transmit_queue import TransmitQueue
+from fpga_transactions import FpgaTransactions
+from config import RESPONSE_TIMEOUT, RESPONSE_RETRIES, MAX_IN_FLIGHT
+from virtual_monitor import VirtualMonitor, DEFAULT_POLL_RATE, DEFAULT_RESPONSE_TIMEOUT
+from register_watch import RegisterWatch
+from clock_sync import ClockSync, CLOCK_SYNC_REGISTER, FPGA_CLOCK_HZ, CLOCK_SYNC_WINDOW
+from register_history import RegisterHistory, REGISTER_HISTORY_CAPACITY
+from event_stream import SSE_REPLAY_CAPACITY, SSE_REPLAY_MAX_BYTES, lora_message_size
+
+logger = logging.getLogger(__name__)
+
+# 未配置 devices 时唯一设备的ID
+DEFAULT_DEVICE_ID = "default"
+
+class DeviceNotFound(KeyError):
+    """设备不存在"""
+
+class Device:
+    """
+    单个设备
+
+    - transport / sender / transmit_queue: 该设备的收发通道(一个写线程)
+    - transactions: 该设备的FPGA事务层, 读写请求等待对应的 0x05 响应(超时重发, 限制在途请求数)
+    - bus / pipeline: 该设备的消息总线和接收管线, 设备间消息互不可见
+    - parameters: 该设备的通道参数缓存
+    - monitor: 该设备的虚实融合寄存器监控器
+    - clock: 该设备的主机/FPGA时钟同步, 由监控器的读响应更新, 接收管线按其给接收帧打FPGA时间
+    - history: 该设备监控器读取的寄存器历史(每个寄存器固定容量的环形缓冲区)
+    - lora_replay: 该设备最近的LoRa接收帧(带事件ID), SSE断线重连时补发
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        name: str,
+        settings: dict,
+        bus: MessageBus,
+        pipeline: ReceivePipeline,
+        parameters: dict,
+        multiplexers: Dict[Tuple[str, int], UDPMultiplexer]
+    ):
+        self.device_id = device_id
+        self.name = name
+        self.settings = settings
+        self.bus = bus
+        self.pipeline = pipeline
+        self.parameters = parameters
+
+        self.transport: Transport = create_transport(settings, pipeline, multiplexers)
+        self.sender = FrameSender(self.transport)
+        self.transmit_queue = TransmitQueue(f"{device_id}-{self.transport.kind}")
+        self.pipeline.relay = self.sender   # 信号发送帧透传回本设备
+        self.transactions = FpgaTransactions(
+            self.sender, self.transmit_queue,
+            timeout=settings.get("fpga_response_timeout_ms", RESPONSE_TIMEOUT * 1000) / 1000,
+            retries=settings.get("fpga_retries", RESPONSE_RETRIES),
+            max_in_flight=settings.get("fpga_max_in_flight", MAX_IN_FLIGHT),
+            name=device_id
+        )
+        self.pipeline.transactions = self.transactions
+        self.clock = ClockSync(
+            register=settings.get("clock_sync_register", CLOCK_SYNC_REGISTER),
+            clock_hz=settings.get("fpga_clock_hz", FPGA_CLOCK_HZ),
+            window=settings.get("clock_sync_window", CLOCK_SYNC_WINDOW)
+        )
+        self.pipeline.clock = self.clock
+        self.history = RegisterHistory(settings.get("register_history_capacity", REGISTER_HISTORY_CAPACITY))
+        self.monitor = VirtualMonitor(
+            self.sender, bus,
+            name=f"virtual-monitor-{device_id}",
+            rate=settings.get("virtual_monitor_rate", DEFAULT_POLL_RATE),
+            response_timeout=settings.get("virtual_monitor_timeout_ms", DEFAULT_RESPONSE_TIMEOUT * 1000) / 1000,
+            watch=RegisterWatch.from_config(settings if "watch_rules" in settings else None),
+            clock=self.clock,
+            history=self.history,
+            transactions=self.transactions
+        )
+        self.lora_replay = bus.replay_buffer(
+            topics=(0x07,),
+            capacity=settings.get("sse_replay_capacity", SSE_REPLAY_CAPACITY),
+            max_bytes=settings.get("sse_replay_max_bytes", SSE_REPLAY_MAX_BYTES),
+            size=lora_message_size,
+            name=f"replay-lora-{device_id}"
+        )
+        self.started = False
+
+    async def start(self) -> bool:
+        """启动传输层、发送队列和FPGA事务层"""
+        success = await self.transport.start()
+        self.transmit_queue.start()
+        self.transactions.start()
+        self.started = True
+
+        if success:
+            logger.info(f"✓ 设备 {self.device_id} 传输层启动成功 ({self.transport.kind})")
+        else:
+            logger.error(f"✗ 设备 {self.device_id} 传输层启动失败 ({self.transport.kind})")
+        return success
+
+    def stop(self):
+        """停止监控器、FPGA事务层、发送队列和传输层"""
+        self.monitor.stop()
+        self.transactions.stop()
+        self.transmit_queue.stop()
+        self.transport.stop()
+        self.started = False
+
+    def get_status(self) -> dict:
+        return {
+            "id": self.device_id,
+            "name": self.name,
+            "transport_status": self.transport.get_status(),
+            "transmit_queue": self.transmit_queue.get_status(),
+            "fpga_transactions": self.transactions.get_status(),
+            "virtual_monitor_status": self.monitor.get_status(),
+            "message_bus": self.bus.get_stats()
+        }
+
+class DeviceRegistry:
+    """
+    设备注册表
+
+    - 第一个设备(默认设备)使用全局消息总线和全局参数缓存, 未指定设备ID的API即操作该设备
+    - 本地端口相同的UDP设备共用一个接收socket, 所有设备的接收在一个线程(或事件循环)中复用
+    """
+
+    def __init__(self):
+        self.devices: Dict[str, Device] = {}
+        self.default_id: Optional[str] = None
+        self.multiplexers: Dict[Tuple[str, int], UDPMultiplexer] = {}
+
+    @classmethod
+    def from_config(cls, config: dict = CONFIG) -> "DeviceRegistry":
+        """
+        按配置创建设备
+
+        config["devices"] 为空时只有一个 default 设备(使用全局 arm_ip / transport 等配置)
+        """
+        registry = cls()
+        devices = config.get("devices") or [{"id": DEFAULT_DEVICE_ID}]
+        for settings in devices:
+            registry.add(dict(settings))
+        return registry
+
+    def add(self, settings: dict) -> Device:
+        """添加设备, settings 中未给出的项取全局配置"""
+        device_id = str(settings.pop("id", None) or f"device{len(self.devices) + 1}")
+        if device_id in self.devices:
+            raise ValueError(f"设备ID重复: {device_id}")
+
+        name = settings.pop("name", device_id)
+        if self.default_id is None:
+            bus, pipeline, parameters = message_bus, default_pipeline, current_parameters
+        else:
+            bus = MessageBus()
+            pipeline = ReceivePipeline(bus, name=device_id)
+            parameters = copy.deepcopy(current_parameters)
+
+        device = Device(device_id, name, settings, bus, pipeline, parameters, self.multiplexers)
+        self.devices[device_id] = device
+        if self.default_id is None:
+            self.default_id = device_id
+
+        logger.info(f"✅ 设备已注册: {device_id} ({device.transport.kind})")
+        return device
+
+    def get(self, device_id: Optional[str] = None) -> Device:
+        """按ID获取设备, 未指定时返回默认设备"""
+        device = self.devices.get(device_id or self.default_id)
+        if device is None:
+            raise DeviceNotFound(device_id)
+        return device
+
+    def __iter__(self):
+        return iter(list(self.devices.values()))
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    async def start(self) -> bool:
+        """启动所有设备, 全部成功时返回True"""
+        results = [await device.start() for device in self]
+        return all(results)
+
+    def stop(self):
+        """停止所有设备"""
+        for device in self:
+            device.stop()
+
+    def clear_messages(self) -> int:
+        """清空所有设备的消息总线, 返回清除的消息数"""
+        return sum(device.bus.clear() for device in self)
+
+    def list_devices(self) -> List[dict]:
+        """设备列表(ID/名称/传输方式)"""
+        return [
+            {
+                "id": device.device_id,
+                "name": device.name,
+                "transport": device.transport.kind,
+                "default": device.device_id == self.default_id
+            }
+            for device in self
+        ]
+
+    def get_status(self) -> dict:
+        return {
+            "default": self.default_id,
+            "devices": {device.device_id: device.get_status() for device in self},
+            "udp_multiplexers": [mux.get_status() for mux in self.multiplexers.values()]
+        }
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# event_stream.py - SSE事件流: 消息到达即唤醒, 每次唤醒取完全部积压消息
+import json
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, List, Optional, Tuple, Union
+
+from config import CONFIG
+from message_bus import Subscription, ReplayCursor
+from register_watch import WATCH_EVENT_TOPIC
+
+logger = logging.getLogger(__name__)
+
+# 批量推送默认参数(客户端可用查询参数覆盖)
+SSE_MAX_BATCH = CONFIG.get("sse_max_batch", 1)
+SSE_FLUSH_MS = CONFIG.get("sse_flush_ms", 50)
+
+# LoRa重放缓冲区: 断线重连时按 Last-Event-ID 补发期间的帧
+SSE_REPLAY_CAPACITY = CONFIG.get("sse_replay_capacity", 10000)
+SSE_REPLAY_MAX_BYTES = CONFIG.get("sse_replay_max_bytes", 8 * 1024 * 1024)
+
+# 一条LoRa接收结果除数据以外的内存开销估算(字典、整数、数据报帧头等, 字节)
+LORA_MESSAGE_OVERHEAD = 900
+
+# 事件来源: 订阅者(无事件ID) 或 重放缓冲区读取位置(带事件ID)
+EventSource = Union[Subscription, ReplayCursor]
+
+def lora_message_size(msg: dict) -> int:
+    """估算一条LoRa接收结果占用的内存(重放缓冲区按此限制总字节数)"""
+    lora_info = msg.get("lora_receive_info")
+    return LORA_MESSAGE_OVERHEAD + (len(lora_info["data"]) if lora_info else 0)
+
+def format_sse(data: dict, event_id: Optional[int] = None) -> str:
+    """编码为一条SSE事件(带事件ID时浏览器断线重连会在 Last-Event-ID 中带回)"""
+    if event_id is None:
+        return f"data: {json.dumps(data)}\n\n"
+    return f"id: {event_id}\ndata: {json.dumps(data)}\n\n"
+
+def format_sse_batch(events: List[dict], event_id: Optional[int] = None) -> str:
+    """
+    多条事件合并为一条SSE事件: {"type": "<type>_batch", "data": [data, ...]}
+
+    只有一条时保持原格式, 不包成数组; event_id 为其中最后一条的事件ID
+    """
+    if len(events) == 1:
+        return format_sse(events[0], event_id)
+    return format_sse({"type": f"{events[0]['type']}_batch", "data": [event["data"] for event in events]}, event_id)
+
+def format_gap(missed: int) -> str:
+    """重放缓冲区已淘汰、无法补发的帧数"""
+    return format_sse({"type": "replay_gap", "data": {"missed": missed}})
+
+def drain_events(
+    source: EventSource,
+    build_event: Callable[[dict], Optional[dict]]
+) -> List[Tuple[Optional[int], dict]]:
+    """取出全部积压消息并转换为 [(事件ID, 事件数据), ...], 订阅者的事件ID为None"""
+    if isinstance(source, ReplayCursor):
+        items = source.drain()
+    else:
+        items = [(None, msg) for msg in source.drain()]
+
+    events = []
+    for event_id, msg in items:
+        event_data = build_event(msg)
+        if event_data is not None:
+            events.append((event_id, event_data))
+    return events
+
+def pending_gap(source: EventSource, reported: int) -> int:
+    """读取位置新增的无法补发帧数(订阅者恒为0)"""
+    return source.missed - reported if isinstance(source, ReplayCursor) else 0
+
+def build_lora_event(msg: dict):
+    """将LoRa接收结果转换为SSE事件数据, 非LoRa消息返回None"""
+    if msg.get("message_type") != 0x07 or "lora_receive_info" not in msg:
+        return None
+
+    lora_info = msg["lora_receive_info"]
+    return {
+        "type": "lora_receive",
+        "data": {
+            "frame_count": lora_info.get("frame_count", 0),
+            "duration_ms": lora_info["duration_ms"],
+            "host_time": msg.get("host_time"),
+            "data_hex": lora_info["data"].hex().upper()
+        }
+    }
+
+# 通用帧流: 各帧类型处理结果中的信息字段
+FRAME_INFO_KEYS = {
+    0x00: "virtual_send_info",
+    0x01: "virtual_receive_info",
+    0x05: "fpga_operation_info",
+    0x07: "lora_receive_info",
+    WATCH_EVENT_TOPIC: "watch_event_info"   # 寄存器监视事件(非接收帧)
+}
+
+class FrameFilter:
+    """
+    通用帧流的服务端过滤, 作为 build_event 使用(在JSON编码之前执行)
+
+    - 帧类型: 由订阅的主题过滤, 其他类型的帧不进入该连接的队列
+    - frame_count 范围: 只作用于带 frame_count 的帧(LoRa 0x07), 其他帧不受限
+    - 抽样: 每种帧类型每 sample_every 帧推送1帧
+    - 数据截断: 数据部分只推送前 payload_bytes 字节(0为不推送数据, None为全部)
+    """
+
+    def __init__(
+        self,
+        frame_count_min: Optional[int] = None,
+        frame_count_max: Optional[int] = None,
+        sample_every: int = 1,
+        payload_bytes: Optional[int] = None
+    ):
+        self.frame_count_min = frame_count_min
+        self.frame_count_max = frame_count_max
+        self.sample_every = max(1, sample_every)
+        self.payload_bytes = payload_bytes
+        self._counters: dict = {}
+
+        # 统计
+        self.accepted = 0
+        self.filtered = 0
+
+    def __call__(self, msg: dict) -> Optional[dict]:
+        message_type = msg.get("message_type")
+        info = msg.get(FRAME_INFO_KEYS.get(message_type))
+
+        if info is not None and (self.frame_count_min is not None or self.frame_count_max is not None):
+            frame_count = info.get("frame_count")
+            if frame_count is not None and not (
+                (self.frame_count_min is None or frame_count >= self.frame_count_min) and
+                (self.frame_count_max is None or frame_count <= self.frame_count_max)
+            ):
+                self.filtered += 1
+                return None
+
+        if self.sample_every > 1:
+            count = self._counters.get(message_type, 0)
+            self._counters[message_type] = count + 1
+            if count % self.sample_every:
+                self.filtered += 1
+                return None
+
+        self.accepted += 1
+        return build_frame_event(msg, self.payload_bytes)
+
+def build_frame_event(msg: dict, payload_bytes: Optional[int] = None) -> dict:
+    """
+    任意帧类型的处理结果转换为SSE事件数据
+
+    信息字段原样输出, 数据部分(缓冲区视图)转为十六进制, 只在此处截断和编码
+    """
+    message_type = msg.get("message_type")
+    info = msg.get(FRAME_INFO_KEYS.get(message_type))
+    if info is None:
+        return {
+            "type": "frame",
+            "data": {"message_type": message_type, "error": msg.get("processing_result", "未知帧")}
+        }
+
+    event_data = {"message_type": message_type}
+    for key in ("host_time", "fpga_time"):
+        if key in msg:
+            event_data[key] = msg[key]
+    for key, value in info.items():
+        if key != "data":
+            event_data[key] = value
+
+    data = info.get("data")
+    if data is not None:
+        event_data["data_len"] = len(data)
+        if payload_bytes != 0:
+            shown = data if payload_bytes is None else data[:payload_bytes]
+            event_data["data_hex"] = shown.hex().upper()
+    return {"type": "frame", "data": event_data}
+
+async def subscription_events(
+    subscription: EventSource,
+    build_event: Callable[[dict], Optional[dict]],
+    threadsafe: bool = True
+) -> AsyncIterator[str]:
+    """
+    订阅者的SSE事件流
+
+    无消息时挂起等待唤醒(不轮询), 唤醒后取完队列中的全部消息,
+    编码后合并为一个数据块输出, 一次写出多条事件
+
+    Args:
+        subscription: 消息总线订阅者, 或重放缓冲区读取位置(事件带ID, 可断线续传)
+        build_event: 消息 → 事件数据, 返回None的消息不推送
+        threadsafe: 发布方是否在事件循环以外的线程(接收线程/串口线程)
+    """
+    wakeup = subscription.async_wakeup(threadsafe)
+    reported = 0
+
+    while True:
+        if subscription.lag == 0:
+            await wakeup.wait()
+            continue
+
+        chunk = []
+        events = drain_events(subscription, build_event)
+        gap = pending_gap(subscription, reported)
+        if gap:
+            reported += gap
+            chunk.append(format_gap(gap))
+        chunk.extend(format_sse(event_data, event_id) for event_id, event_data in events)
+
+        if chunk:
+            logger.debug(f"SSE推送 {len(chunk)} 条事件 ({subscription.name})")
+            yield "".join(chunk)
+
+async def batched_subscription_events(
+    subscription: EventSource,
+    build_event: Callable[[dict], Optional[dict]],
+    max_batch: int = SSE_MAX_BATCH,
+    flush_interval: float = SSE_FLUSH_MS / 1000,
+    threadsafe: bool = True
+) -> AsyncIterator[str]:
+    """
+    自适应批量的SSE事件流
+
+    - 攒满 max_batch 条立即发送
+    - 距上次发送已超过 flush_interval(流量小): 到达即发送, 退化为单条事件, 不增加延迟
+    - 否则(流量大)等到上次发送后 flush_interval 时刻再把积攒的事件一次发出,
+      每秒最多约 1/flush_interval 条SSE事件, 延迟不超过 flush_interval
+
+    max_batch <= 1 时与 subscription_events 相同(每次唤醒逐条编码)
+    """
+    if max_batch <= 1:
+        async for chunk in subscription_events(subscription, build_event, threadsafe):
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    wakeup = subscription.async_wakeup(threadsafe)
+    pending: List[Tuple[Optional[int], dict]] = []
+    last_flush = float("-inf")
+    reported = 0
+
+    while True:
+        pending.extend(drain_events(subscription, build_event))
+
+        # 落后超过重放缓冲区容量: 先告知客户端丢失的帧数
+        gap = pending_gap(subscription, reported)
+        if gap:
+            reported += gap
+            yield format_gap(gap)
+
+        if not pending:
+            await wakeup.wait()
+            continue
+
+        now = loop.time()
+        if len(pending) >= max_batch or now - last_flush >= flush_interval:
+            chunk = []
+            for start in range(0, len(pending), max_batch):
+                batch = pending[start:start + max_batch]
+                chunk.append(format_sse_batch([event_data for _, event_data in batch], batch[-1][0]))
+            pending.clear()
+            last_flush = now
+            logger.debug(f"SSE批量推送 {len(chunk)} 条事件 ({subscription.name})")
+            yield "".join(chunk)
+            continue
+
+        # 流量大: 等到刷新时刻或有新消息到达(可能攒满一批)
+        await wakeup.wait(last_flush + flush_interval - now)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# fpga_transactions.py - FPGA请求/响应关联: 每个读写请求一个待定结果, 按操作类型和地址集合匹配 0x05 响应
+#
+# - 请求经设备的发送队列发出, 同时在途的请求数不超过 max_in_flight, 超出的请求排队, 有请求完成时依次发出
+# - 接收管线收到 0x05 帧(任何模式)即调用 resolve; 每次发送记为一次尝试, 响应按发送顺序对应键相同的最早一次尝试,
+#   已结束的请求(重发前的尝试已被应答、超时或取消)的尝试在 STALE_ATTEMPT_FACTOR * timeout 内吸收迟到的响应并丢弃,
+#   不会误把迟到的响应当作之后键相同的新请求的响应
+# - 每次发送等待 timeout 秒, 超时后重发, 重发 retries 次后仍无响应以 FpgaTimeout 结束
+# - 等待方取消(如 request() 所在协程被取消)时请求移出在途表或等待队列, 不再重发
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from config import RESPONSE_TIMEOUT, RESPONSE_RETRIES, MAX_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+# 等待发出(在途请求已满)的请求数上限
+MAX_WAITING_REQUESTS = 1024
+
+# 已结束请求的尝试保留的时长(相对该次发送, 单位为请求的 timeout), 期间到达的对应响应视为迟到并丢弃
+STALE_ATTEMPT_FACTOR = 2
+
+class FpgaTimeout(TimeoutError):
+    """FPGA请求在全部重试后仍未收到响应"""
+
+class FpgaBusy(Exception):
+    """等待发出的FPGA请求过多"""
+
+class FpgaRequest:
+    """单个在途或等待中的FPGA请求"""
+
+    def __init__(self, operation_type: int, operations: List[Tuple[int, int]], timeout: float, retries: int):
+        self.operation_type = operation_type
+        self.operations = operations
+        self.key: Tuple[int, FrozenSet[int]] = (operation_type, frozenset(address for address, _ in operations))
+        self.timeout = timeout
+        self.retries = retries
+        self.future: Future = Future()
+
+        self.attempts = 0
+        self.created_at = time.perf_counter()
+        self.sent_at = 0.0       # 最近一次发送的时刻
+        self.deadline = 0.0
+        self.finished = False    # 已应答、超时、失败或取消(持锁修改)
+
+    def describe(self) -> str:
+        kind = "读" if self.operation_type == 0 else "写"
+        return f"{kind} {', '.join(f'0x{address:02X}' for address in sorted(self.key[1]))}"
+
+class FpgaAttempt:
+    """请求的一次发送, 响应按发送顺序与键相同的尝试对应"""
+    __slots__ = ("request", "number", "sent_at", "expires_at")
+
+    def __init__(self, request: FpgaRequest, number: int, sent_at: float):
+        self.request = request
+        self.number = number
+        self.sent_at = sent_at
+        self.expires_at = sent_at + request.timeout * STALE_ATTEMPT_FACTOR
+
+class FpgaTransactions:
+    """
+    设备的FPGA事务层
+
+    线程安全: API(事件循环)与其他线程都可提交, resolve 在接收线程中调用, 超时与重发在事务线程中处理;
+    持锁时只修改状态, 交给发送队列和设置请求结果都在释放锁之后进行
+    """
+
+    def __init__(
+        self,
+        sender,
+        transmit_queue,
+        timeout: float = RESPONSE_TIMEOUT,
+        retries: int = RESPONSE_RETRIES,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        name: str = "fpga"
+    ):
+        self.sender = sender
+        self.transmit_queue = transmit_queue
+        self.timeout = timeout
+        self.retries = max(int(retries), 0)
+        self.max_in_flight = max(int(max_in_flight), 1)
+        self.name = name
+
+        self._in_flight: Dict[Tuple[int, FrozenSet[int]], deque] = {}   # 键 → 按发出顺序的在途请求
+        self._in_flight_count = 0
+        self._attempts: Dict[Tuple[int, FrozenSet[int]], deque] = {}    # 键 → 按发送顺序的尝试(含已结束请求的)
+        self._waiting: deque = deque()
+        self._condition = threading.Condition()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        # 统计
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "retried": 0,       # 重发次数
+            "timed_out": 0,
+            "failed": 0,        # 发送失败
+            "cancelled": 0,     # 等待方已取消
+            "stale": 0,         # 已结束请求的迟到响应(重发前的尝试、超时后才到达等), 已丢弃
+            "unmatched": 0,     # 没有对应尝试的响应(其他程序的请求等)
+            "max_in_flight": 0,
+            "max_latency_ms": 0.0,
+            "total_latency_ms": 0.0
+        }
+
+    def start(self):
+        """启动超时处理线程"""
+        with self._condition:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._timeout_loop, name=f"fpga-{self.name}", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """停止超时处理线程, 在途和等待中的请求以 FpgaTimeout 结束"""
+        with self._condition:
+            if not self.running:
+                return
+            self.running = False
+            requests = [request for queue in self._in_flight.values() for request in queue] + list(self._waiting)
+            for request in requests:
+                request.finished = True
+            self._in_flight.clear()
+            self._in_flight_count = 0
+            self._attempts.clear()
+            self._waiting.clear()
+            self._condition.notify_all()
+
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+        for request in requests:
+            self._finish(request, error=FpgaTimeout(f"FPGA事务层已停止 ({request.describe()})"))
+
+    def submit(
+        self,
+        operation_type: int,
+        batch_operations: List[Tuple[int, int]],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> Future:
+        """
+        提交FPGA读写请求, 返回 concurrent.futures.Future, 结果为对应的 0x05 响应消息
+
+        Raises:
+            FpgaBusy: 等待发出的请求过多
+        """
+        request = FpgaRequest(
+            operation_type,
+            [(address, data) for address, data in batch_operations],
+            self.timeout if timeout is None else timeout,
+            self.retries if retries is None else retries
+        )
+        if not self.running:
+            self.start()
+        request.future.add_done_callback(lambda future: self._on_cancelled(request) if future.cancelled() else None)
+
+        attempts = []
+        with self._condition:
+            if self._in_flight_count >= self.max_in_flight:
+                if len(self._waiting) >= MAX_WAITING_REQUESTS:
+                    raise FpgaBusy(f"等待发出的FPGA请求过多: {len(self._waiting)}")
+                self._waiting.append(request)
+            else:
+                attempts.append(self._begin_attempt(request))
+            self.stats["submitted"] += 1
+        self._dispatch(attempts)
+        return request.future
+
+    async def request(
+        self,
+        operation_type: int,
+        batch_operations: List[Tuple[int, int]],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> dict:
+        """在事件循环中提交请求并等待响应, 超时抛出 FpgaTimeout"""
+        return await asyncio.wrap_future(self.submit(operation_type, batch_operations, timeout, retries))
+
+    def _begin_attempt(self, request: FpgaRequest) -> FpgaAttempt:
+        """记录一次发送(持锁调用): 首次发送时记入在途表, 返回的尝试在释放锁后由 _dispatch 交给发送队列"""
+        if request.attempts == 0:
+            self._in_flight.setdefault(request.key, deque()).append(request)
+            self._in_flight_count += 1
+            if self._in_flight_count > self.stats["max_in_flight"]:
+                self.stats["max_in_flight"] = self._in_flight_count
+        request.attempts += 1
+        request.sent_at = time.perf_counter()
+        request.deadline = request.sent_at + request.timeout
+        attempt = FpgaAttempt(request, request.attempts, request.sent_at)
+        self._attempts.setdefault(request.key, deque()).append(attempt)
+        self._condition.notify()
+        return attempt
+
+    def _dispatch(self, attempts: List[FpgaAttempt]):
+        """把尝试交给发送队列(不持锁调用); 立即失败的尝试结束其请求, 由此发出的等待中请求依次处理(不递归)"""
+        pending = deque(attempts)
+        while pending:
+            attempt = pending.popleft()
+            request = attempt.request
+            try:
+                sent = self.transmit_queue.submit_nowait(
+                    self.sender.send_fpga_operation,
+                    operation_type=request.operation_type,
+                    batch_operations=request.operations
+                )
+            except Exception as e:
+                pending.extend(self._fail(attempt, e))
+                continue
+
+            if sent.done():
+                error = sent.exception()
+                if error is not None or not sent.result():
+                    pending.extend(self._fail(attempt, error))
+                continue
+            sent.add_done_callback(lambda future, attempt=attempt: self._on_sent(attempt, future))
+
+    def _on_sent(self, attempt: FpgaAttempt, sent: Future):
+        """发送完成(写线程中调用): 发送失败时立即结束请求, 不等待超时"""
+        error = sent.exception()
+        if error is None and sent.result():
+            return
+        self._dispatch(self._fail(attempt, error))
+
+    def _fail(self, attempt: FpgaAttempt, error: Optional[Exception]) -> List[FpgaAttempt]:
+        """尝试未能发出: 撤销该尝试并以 ConnectionError 结束请求, 返回因此发出的等待中请求的尝试"""
+        request = attempt.request
+        with self._condition:
+            attempts = self._attempts.get(request.key)
+            if attempts and attempt in attempts:
+                attempts.remove(attempt)
+                if not attempts:
+                    del self._attempts[request.key]
+            if not self._remove(request):
+                return []
+            self.stats["failed"] += 1
+            promoted = self._promote()
+        self._finish(request, error=ConnectionError(f"FPGA请求发送失败 ({request.describe()}): {error or '传输层发送失败'}"))
+        return promoted
+
+    def _on_cancelled(self, request: FpgaRequest):
+        """等待方取消了请求: 从在途表或等待队列移除, 不再重发"""
+        promoted = []
+        with self._condition:
+            if self._remove(request):
+                promoted = self._promote()
+            else:
+                try:
+                    self._waiting.remove(request)
+                except ValueError:
+                    return
+                request.finished = True
+            self.stats["cancelled"] += 1
+        self._dispatch(promoted)
+
+    def _remove(self, request: FpgaRequest) -> bool:
+        """从在途表移除并标记为已结束(持锁调用), 请求已结束时返回False"""
+        queue = self._in_flight.get(request.key)
+        if not queue or request not in queue:
+            return False
+        queue.remove(request)
+        if not queue:
+            del self._in_flight[request.key]
+        self._in_flight_count -= 1
+        request.finished = True
+        return True
+
+    def _promote(self) -> List[FpgaAttempt]:
+        """在途请求有空位时发出等待中的请求(持锁调用), 返回待交给发送队列的尝试"""
+        attempts = []
+        while self._waiting and self._in_flight_count < self.max_in_flight:
+            attempts.append(self._begin_attempt(self._waiting.popleft()))
+        return attempts
+
+    def resolve(self, msg: dict) -> bool:
+        """
+        收到 0x05 响应(接收线程中调用), 按操作类型和地址集合对应最早发送的尝试
+
+        尝试所属的请求已结束时响应为迟到的响应, 丢弃; 已过保留时长的尝试视为响应丢失, 跳过
+
+        Returns:
+            是否结束了一个在途请求
+        """
+        info = msg.get("fpga_operation_info")
+        if not info:
+            return False
+        key = (info.get("operation_type_code"), frozenset(op.get("address") for op in info.get("operations", [])))
+
+        with self._condition:
+            attempts = self._attempts.get(key)
+            request = None
+            stale = False
+            now = time.perf_counter()
+            while attempts:
+                attempt = attempts.popleft()
+                if not attempt.request.finished:
+                    request = attempt.request
+                    break
+                if attempt.expires_at > now:
+                    stale = True
+                    break
+            if attempts is not None and not attempts:
+                del self._attempts[key]
+
+            if request is None:
+                self.stats["stale" if stale else "unmatched"] += 1
+                if stale:
+                    logger.debug(f"丢弃迟到的FPGA响应 (第{attempt.number}次发送, {attempt.request.describe()})")
+                return False
+
+            self._remove(request)
+            promoted = self._promote()
+            latency = (time.perf_counter() - request.created_at) * 1000
+            self.stats["completed"] += 1
+            self.stats["total_latency_ms"] += latency
+            if latency > self.stats["max_latency_ms"]:
+                self.stats["max_latency_ms"] = latency
+
+        self._dispatch(promoted)
+        self._finish(request, result=msg)
+        return True
+
+    @staticmethod
+    def _finish(request: FpgaRequest, result=None, error: Optional[Exception] = None):
+        """设置请求结果(不持锁调用, 等待方已取消时忽略)"""
+        if not request.future.set_running_or_notify_cancel():
+            return
+        if error is None:
+            request.future.set_result(result)
+        else:
+            request.future.set_exception(error)
+
+    def _prune_attempts(self, now: float) -> Optional[float]:
+        """删除已结束请求的过期尝试(持锁调用), 返回最早的下一个过期时刻"""
+        nearest = None
+        for key in list(self._attempts):
+            attempts = self._attempts[key]
+            kept = deque(
+                attempt for attempt in attempts
+                if not attempt.request.finished or attempt.expires_at > now
+            )
+            if not kept:
+                del self._attempts[key]
+                continue
+            if len(kept) != len(attempts):
+                self._attempts[key] = kept
+            for attempt in kept:
+                if attempt.request.finished:
+                    nearest = attempt.expires_at if nearest is None else min(nearest, attempt.expires_at)
+        return nearest
+
+    def _timeout_loop(self):
+        """超时处理: 到期的在途请求重发, 重发次数用完时以 FpgaTimeout 结束"""
+        while True:
+            expired = []
+            attempts = []
+            with self._condition:
+                if not self.running:
+                    break
+                now = time.perf_counter()
+                nearest = None
+                for queue in list(self._in_flight.values()):
+                    for request in list(queue):
+                        if request.deadline > now:
+                            nearest = request.deadline if nearest is None else min(nearest, request.deadline)
+                        elif request.attempts <= request.retries:
+                            self.stats["retried"] += 1
+                            logger.warning(f"⏱️ FPGA请求超时, 第{request.attempts}次重发 ({request.describe()})")
+                            attempts.append(self._begin_attempt(request))
+                            nearest = request.deadline if nearest is None else min(nearest, request.deadline)
+                        else:
+                            self._remove(request)
+                            self.stats["timed_out"] += 1
+                            expired.append(request)
+                if expired:
+                    attempts.extend(self._promote())
+
+                stale = self._prune_attempts(now)
+                if stale is not None:
+                    nearest = stale if nearest is None else min(nearest, stale)
+
+                if not expired and not attempts:
+                    self._condition.wait(None if nearest is None else nearest - now)
+
+            self._dispatch(attempts)
+            for request in expired:
+                logger.error(f"❌ FPGA请求无响应 ({request.describe()}, 共发送{request.attempts}次)")
+                self._finish(request, error=FpgaTimeout(
+                    f"FPGA请求无响应 ({request.describe()}, 每次等待 {request.timeout * 1000:.0f}ms, 共发送{request.attempts}次)"
+                ))
+
+    def get_status(self) -> dict:
+        with self._condition:
+            status = dict(self.stats)
+            status.update({
+                "in_flight": self._in_flight_count,
+                "waiting": len(self._waiting),
+                "timeout_ms": self.timeout * 1000,
+                "retries": self.retries,
+                "max_in_flight_limit": self.max_in_flight
+            })
+        completed = status["completed"]
+        status["mean_latency_ms"] = round(status.pop("total_latency_ms") / completed, 3) if completed else 0.0
+        status["max_latency_ms"] = round(status["max_latency_ms"], 3)
+        return status
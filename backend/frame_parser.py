@@ -2,9 +2,9 @@
 # frame_parser.py - 帧解析和CRC计算
 import struct
 import logging
-from typing import Optional
+from typing import Optional, List, Tuple
 
-from config import FRAME_SYNC_HEADER
+from config import CONFIG, FRAME_SYNC_HEADER
 
 logger = logging.getLogger(__name__)
 
@@ -44,71 +44,215 @@ CRC16_TABLE = [
         0x8201, 0x42C0, 0x4380, 0x8341, 0x4100, 0x81C1, 0x8081, 0x4040
     ]
     
-@staticmethod
-def calculate_crc16(data: bytes) -> int:
-    """计算CRC16校验码"""
-    crc = 0xFFFF  # CRC初始值
-        
-    for byte in data:
-        crc = (crc << 8) ^ CRC16_TABLE[(crc >> 8) ^ byte]
-        crc &= 0xFFFF  # 保持16位
-        
+# 双字节查表: 由CRC16_TABLE推导, 每步处理2字节 (索引 = crc ^ 大端16位字)
+def _build_crc16_table2() -> list:
+    """构建65536项的双字节CRC16查找表"""
+    table = []
+    for hi in range(256):
+        entry = CRC16_TABLE[hi]
+        high = (entry << 8) & 0xFFFF
+        carry = entry >> 8
+        for lo in range(256):
+            table.append(high ^ CRC16_TABLE[lo ^ carry])
+    return table
+
+CRC16_TABLE2 = _build_crc16_table2()
+
+# 预编译按字数拆分的解包器 (CRC输入最长 1 + 1 + 255 = 257 字节)
+_WORD_UNPACKERS = [struct.Struct(f'>{n}H') for n in range(129)]
+
+# 帧同步头字节 / CRC字段解包器
+SYNC_BYTES = struct.pack('>I', FRAME_SYNC_HEADER)
+_CRC_STRUCT = struct.Struct('>H')
+_HEADER_STRUCT = struct.Struct('>IBB')
+
+# 是否校验CRC (默认开启)
+CRC_CHECK_ENABLED = CONFIG.get("crc_check", True)
+
+# 解析统计 (拒收计数)
+parse_stats = {
+    "accepted": 0,
+    "sync_errors": 0,
+    "length_errors": 0,
+    "crc_errors": 0
+}
+
+def calculate_crc16(data: bytes, crc: int = 0xFFFF, start: int = 0, end: Optional[int] = None) -> int:
+    """
+    计算CRC16校验码
+    
+    每步查表处理2字节, 结果与逐字节算法完全一致;
+    crc 参数可传入上一段的结果以分段计算, start/end 指定缓冲区内的区间(不拷贝)
+    """
+    if end is None:
+        end = len(data)
+    length = end - start
+    words = length >> 1
+    if words < len(_WORD_UNPACKERS):
+        values = _WORD_UNPACKERS[words].unpack_from(data, start)
+    else:
+        values = struct.unpack_from(f'>{words}H', data, start)
+    
+    table2 = CRC16_TABLE2
+    for word in values:
+        crc = table2[crc ^ word]
+    
+    # 奇数长度: 最后1字节按单字节查表
+    if length & 1:
+        crc = ((crc << 8) ^ CRC16_TABLE[(crc >> 8) ^ data[end - 1]]) & 0xFFFF
+    
     return crc
 
-def parse_message(data: bytes) -> Optional[dict]:
+class Frame:
     """
-    解析消息帧
-    格式: 帧同步头(4) + 消息类型(1) + 消息长度(1) + 消息内容(N) + CRC(2)
-    最小长度: 4 + 1 + 1 + 0 + 2 = 8字节
+    解码后的帧记录
+    
+    不拷贝接收缓冲区, 字段通过偏移读取, 消息内容在访问时才以 memoryview 引用
+    """
+    __slots__ = ("message_type", "message_length", "buffer", "offset")
+    
+    def __init__(self, message_type: int, message_length: int, buffer, offset: int = 0):
+        self.message_type = message_type
+        self.message_length = message_length
+        self.buffer = buffer    # 接收缓冲区 (bytes / memoryview)
+        self.offset = offset    # 帧同步头在缓冲区中的偏移
+    
+    @property
+    def content_offset(self) -> int:
+        """消息内容在缓冲区中的偏移"""
+        return self.offset + 6
+    
+    @property
+    def content(self) -> memoryview:
+        """消息内容视图(零拷贝)"""
+        start = self.offset + 6
+        return memoryview(self.buffer)[start:start + self.message_length]
+    
+    def content_view(self, skip: int) -> memoryview:
+        """跳过消息内容前 skip 字节后的视图(零拷贝)"""
+        start = self.offset + 6
+        return memoryview(self.buffer)[start + skip:start + self.message_length]
+    
+    @property
+    def raw(self) -> memoryview:
+        """整帧视图(同步头到CRC)"""
+        return memoryview(self.buffer)[self.offset:self.offset + self.message_length + 8]
+    
+    def content_bytes(self) -> bytes:
+        """拷贝出消息内容"""
+        start = self.offset + 6
+        return bytes(self.buffer[start:start + self.message_length])
+    
+    def to_dict(self) -> dict:
+        """转换为 parse_message 的字典格式"""
+        return {
+            "message_type": self.message_type,
+            "message_length": self.message_length,
+            "message_content": self.content_bytes()
+        }
+
+def decode_frame(data, offset: int = 0, check_crc: bool = CRC_CHECK_ENABLED) -> Optional[Frame]:
+    """
+    零拷贝解码一帧
+    
+    Args:
+        data: 接收缓冲区 (bytes / memoryview), 解码后不应再被修改
+        offset: 帧同步头所在偏移
+        check_crc: 是否校验CRC
     """
     try:
-        if len(data) < 8:
-            logger.error(f"消息长度不足,需要至少8字节,实际{len(data)}字节")
+        available = len(data) - offset
+        if available < 8:
+            parse_stats["length_errors"] += 1
+            logger.error(f"消息长度不足,需要至少8字节,实际{available}字节")
             return None
         
-        # 1. 解析帧同步头(4字节,大端序)
-        sync_header = struct.unpack('>I', data[0:4])[0]
+        # 帧同步头(4字节,大端序) / 消息类型(1字节) / 消息长度(1字节)
+        sync_header, message_type, message_length = _HEADER_STRUCT.unpack_from(data, offset)
         if sync_header != FRAME_SYNC_HEADER:
+            parse_stats["sync_errors"] += 1
             logger.error(f"帧同步头错误: 0x{sync_header:08X}")
             return None
         
-        # 2. 解析消息类型(1字节)
-        message_type = data[4]
-        
-        # 3. 解析消息长度(1字节)
-        message_length = data[5]
-        
-        # 4. 检查实际数据长度
-        expected_total_length = 4 + 1 + 1 + message_length + 2
-        if len(data) < expected_total_length:
-            logger.error(f"消息长度不匹配: 期望{expected_total_length}字节, 实际{len(data)}字节")
+        if available < message_length + 8:
+            parse_stats["length_errors"] += 1
+            logger.error(f"消息长度不匹配: 期望{message_length + 8}字节, 实际{available}字节")
             return None
         
-        # 5. 提取消息内容
-        message_content = data[6:6+message_length]
-        
-        # 6. 提取CRC(2字节,大端序)
-        received_crc = struct.unpack('>H', data[6+message_length:6+message_length+2])[0]
-        
-        # 7. 计算CRC(从消息类型到消息内容结束)
-        crc_data = data[4:6+message_length]
-        calculated_crc = calculate_crc16(crc_data)
+        # 校验CRC(从消息类型到消息内容结束)
+        if check_crc:
+            crc_end = offset + 6 + message_length
+            received_crc = _CRC_STRUCT.unpack_from(data, crc_end)[0]
+            calculated_crc = calculate_crc16(data, 0xFFFF, offset + 4, crc_end)
+            if received_crc != calculated_crc:
+                parse_stats["crc_errors"] += 1
+                logger.warning(f"CRC校验失败: 接收0x{received_crc:04X}, 计算0x{calculated_crc:04X}")
+                return None
         
-        # 8. 校验CRC
-        # crc_valid = (received_crc == calculated_crc)
-        # if not crc_valid:
-        #     logger.warning(f"CRC校验失败: 接收0x{received_crc:04X}, 计算0x{calculated_crc:04X}")
-        
-        return {
-            "message_type": message_type,
-            "message_length": message_length,
-            "message_content": message_content
-        }
+        parse_stats["accepted"] += 1
+        return Frame(message_type, message_length, data, offset)
         
     except Exception as e:
         logger.error(f"解析消息失败: {e}")
         return None
 
+def parse_message(data: bytes, check_crc: bool = CRC_CHECK_ENABLED) -> Optional[dict]:
+    """
+    解析消息帧
+    格式: 帧同步头(4) + 消息类型(1) + 消息长度(1) + 消息内容(N) + CRC(2)
+    最小长度: 4 + 1 + 1 + 0 + 2 = 8字节
+    """
+    frame = decode_frame(data, check_crc=check_crc)
+    if frame is None:
+        return None
+    return frame.to_dict()
+
+def validate_frames(buffer: bytes) -> List[Tuple[int, int, bool]]:
+    """
+    批量校验缓冲区中连续排列的多个帧
+    
+    Returns:
+        [(帧起始偏移, 帧总长度, CRC是否正确), ...]
+        不完整的尾部帧不计入结果
+    """
+    results = []
+    buffer_length = len(buffer)
+    crc_errors = 0
+    pos = buffer.find(SYNC_BYTES)
+    
+    while 0 <= pos and pos + 8 <= buffer_length:
+        message_length = buffer[pos + 5]
+        total_length = 4 + 1 + 1 + message_length + 2
+        end = pos + total_length
+        if end > buffer_length:
+            break
+        
+        received_crc = _CRC_STRUCT.unpack_from(buffer, end - 2)[0]
+        crc_ok = calculate_crc16(buffer, 0xFFFF, pos + 4, end - 2) == received_crc
+        results.append((pos, total_length, crc_ok))
+        
+        if crc_ok:
+            pos = buffer.find(SYNC_BYTES, end)
+        else:
+            # CRC错误时长度字节不可信, 从下一字节重新搜索同步头
+            crc_errors += 1
+            pos = buffer.find(SYNC_BYTES, pos + 1)
+    
+    parse_stats["accepted"] += len(results) - crc_errors
+    parse_stats["crc_errors"] += crc_errors
+    return results
+
+def get_parse_stats() -> dict:
+    """获取解析统计"""
+    stats = dict(parse_stats)
+    stats["total"] = sum(parse_stats.values())
+    return stats
+
+def reset_parse_stats():
+    """清零解析统计"""
+    for key in parse_stats:
+        parse_stats[key] = 0
+
 def build_message(message_type: int, message_content: bytes) -> bytes:
     """
     构建新格式的消息
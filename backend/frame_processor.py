@@ -1,55 +1,53 @@
 #!/usr/bin/env python3
 # frame_processor.py - 帧处理逻辑
-import struct
+import time
 import logging
+from typing import Optional
+from frame_parser import Frame
+from frame_schema import VIRTUAL_SEND, VIRTUAL_RECEIVE, FPGA, LORA_RECEIVE
 from config import (
     FRAME_TYPE_VIRTUAL_SEND, FRAME_TYPE_VIRTUAL_RECEIVE, 
-    FRAME_TYPE_FPGA, FRAME_TYPE_LORA, get_frame_type_name, CONFIG
+    FRAME_TYPE_FPGA, FRAME_TYPE_LORA, get_frame_type_name,
+    SystemMode, current_mode
 )
+from message_bus import MessageBus, message_bus
+from clock_sync import WALL_OFFSET
 
 logger = logging.getLogger(__name__)
 
-udp_sender = None
+# FPGA读写帧的固定字段与重复项解析(预编译 Struct 的 unpack_from)
+_FPGA_HEAD_UNPACK = FPGA.head.unpack_from
+_FPGA_ITEM_UNPACK = FPGA.item.unpack_from
 
-def init_sender(sender):
-    """初始化发送器引用"""
-    global udp_sender
-    udp_sender = sender
+# 各模式下发布到消息总线的帧类型
+MODE_TOPICS = {
+    SystemMode.GROUND: frozenset({0x07}),               # 地面检测模式：只发布LoRa接收消息
+    SystemMode.VIRTUAL: frozenset({0x00, 0x01, 0x05})   # 虚实融合模式：发布信号帧和FPGA响应
+}
 
-def process_virtual_send_frame(parsed_msg: dict, addr: tuple) -> dict:
+def process_virtual_send_frame(frame: Frame, addr: tuple, relay=None) -> dict:
     """
     信号发送帧 0x00
     直接透传到ARM
     """
     try:
-        message_content = parsed_msg.get("message_content", b"")
-        
-        if len(message_content) < 8:
+        if frame.message_length < 8:
             raise ValueError("信号发送帧数据长度不足")
         
         # 解析: 发送时间(4) + 信号传播参数(4) + 数据包(N)
-        send_time = struct.unpack('>I', message_content[0:4])[0]
-        propagation_param = struct.unpack('>I', message_content[4:8])[0]
-        data_packet = message_content[8:]
-        
-        # 🔧 透传到ARM
-        if udp_sender:
-            # 重新构建完整消息并发送
-            from frame_parser import build_message
-            full_message = build_message(FRAME_TYPE_VIRTUAL_SEND, message_content)
-            
-            success = udp_sender.send_raw_data(
-                full_message,
-                target_ip=CONFIG["arm_ip"],
-                target_port=CONFIG["arm_port"]
-            )
+        send_time, propagation_param = VIRTUAL_SEND.decode(frame)
+        data_packet = frame.content_view(VIRTUAL_SEND.payload_offset())
+        
+        # 🔧 透传到ARM (类型与内容不变, 直接转发原始帧)
+        if relay:
+            success = relay.send_raw_data(frame.raw)
         
         return {
             "message_type": FRAME_TYPE_VIRTUAL_SEND,
             "virtual_send_info": {
                 "send_time": send_time,
                 "propagation_param": propagation_param,
-                "data_hex": data_packet.hex().upper()
+                "data": data_packet
             }
         }
         
@@ -62,38 +60,28 @@ def process_virtual_send_frame(parsed_msg: dict, addr: tuple) -> dict:
             "error": "processing_error"
         }
 
-def process_virtual_receive_frame(parsed_msg: dict, addr: tuple) -> dict:
+def process_virtual_receive_frame(frame: Frame, addr: tuple, relay=None) -> dict:
     """
     处理虚实节点信号接收帧 0x01
     直接透传到ARM
     """
     try:
-        message_content = parsed_msg.get("message_content", b"")
-        
-        if len(message_content) < 8:
+        if frame.message_length < 8:
             raise ValueError("信号接收帧数据长度不足")
         
         # 解析: 接收时间(4) + 接收时间戳(4) + 数据包(N)
-        receive_time = struct.unpack('>I', message_content[0:4])[0]
-        receive_timestamp = struct.unpack('>I', message_content[4:8])[0]
-        data_packet = message_content[8:]
+        receive_time, receive_timestamp = VIRTUAL_RECEIVE.decode(frame)
+        data_packet = frame.content_view(VIRTUAL_RECEIVE.payload_offset())
         
-        if udp_sender:
-            from frame_parser import build_message
-            full_message = build_message(FRAME_TYPE_VIRTUAL_RECEIVE, message_content)
-            
-            success = udp_sender.send_raw_data(
-                full_message,
-                target_ip=CONFIG["arm_ip"],
-                target_port=CONFIG["arm_port"]
-            )
+        if relay:
+            success = relay.send_raw_data(frame.raw)
         
         return {
             "message_type": FRAME_TYPE_VIRTUAL_RECEIVE,
             "virtual_receive_info": {
                 "receive_time": receive_time,
                 "receive_timestamp": receive_timestamp,
-                "data_hex": data_packet.hex().upper()
+                "data": data_packet
             }
         }
         
@@ -106,7 +94,7 @@ def process_virtual_receive_frame(parsed_msg: dict, addr: tuple) -> dict:
             "error": "processing_error"
         }
 
-def process_fpga_frame(parsed_msg: dict, addr: tuple) -> dict:
+def process_fpga_frame(frame: Frame, addr: tuple) -> dict:
     """
     处理FPGA读写帧 0x05
     
@@ -116,38 +104,33 @@ def process_fpga_frame(parsed_msg: dict, addr: tuple) -> dict:
     - 操作数据: [address(4字节) + data(4字节)] * N
     """
     try:
-        message_content = parsed_msg.get("message_content", b"")
-        
-        if len(message_content) < 2:
+        message_length = frame.message_length
+        if message_length < 2:
             raise ValueError("FPGA数据长度不足（至少需要2字节）")
         
         # 🔧 解析操作类型和操作次数
-        operation_type = message_content[0]
-        operation_count = message_content[1]
+        buffer = frame.buffer
+        offset = frame.offset + 6
+        operation_type, operation_count = _FPGA_HEAD_UNPACK(buffer, offset)
+        offset += 2
         
-        # 🔧 解析每个操作
-        operations = []
-        offset = 2  # 跳过前2个字节
+        # 🔧 解析每个操作: [address(4) + data(4)] * N, 不足8字节的尾部忽略
+        # (热路径: 直接用预编译的 Struct 原位解析, 不经过通用的 FrameSchema.iter_items 生成器)
+        count = (message_length - 2) >> 3
+        if count < operation_count:
+            logger.warning(f"⚠️ FPGA操作#{count+1} 数据不足，跳过")
+        else:
+            count = operation_count
         
-        for i in range(operation_count):
-            # 检查剩余数据是否足够
-            if offset + 8 > len(message_content):
-                logger.warning(f"⚠️ FPGA操作#{i+1} 数据不足，跳过")
-                break
-            
-            # 解析地址（4字节大端序）
-            address = struct.unpack('>I', message_content[offset:offset+4])[0]
-            
-            # 解析数据（4字节大端序）
-            data = struct.unpack('>I', message_content[offset+4:offset+8])[0]
-            
+        operations = []
+        for index in range(1, count + 1):
+            address, data = _FPGA_ITEM_UNPACK(buffer, offset)
             operations.append({
-                "index": i + 1,
+                "index": index,
                 "address": address,
                 "value": data
             })
-            
-            offset += 8  # 下一个操作
+            offset += 8
         
         # 🔧 构建返回结果（会被加入到消息队列）
         result = {
@@ -170,21 +153,19 @@ def process_fpga_frame(parsed_msg: dict, addr: tuple) -> dict:
             "error": "processing_error"
         }
 
-def process_lora_frame(parsed_msg: dict, addr: tuple) -> dict:
-    """处理LoRa收发帧 0x07"""
+def process_lora_frame(frame: Frame, addr: tuple) -> dict:
+    """
+    处理LoRa收发帧 0x07
+    
+    数据部分保留为缓冲区视图, 推送时才转换为十六进制
+    """
     try:
-        message_content = parsed_msg.get("message_content", b"")
-        
-        if len(message_content) < 9:
+        if frame.message_length < 9:
             raise ValueError("LoRa数据长度不足")
         
         # receive_timestamp(4) + complete_timestamp(4) + frame_count(1) + data(n)
-            
-        receive_timestamp = struct.unpack('>I', message_content[0:4])[0]
-        complete_timestamp = struct.unpack('>I', message_content[4:8])[0]
-        frame_count = message_content[8]  # 帧计数
-        data_bytes = message_content[9:]
-        data_hex = data_bytes.hex().upper()
+        receive_timestamp, complete_timestamp, frame_count = LORA_RECEIVE.decode(frame)
+        data_bytes = frame.content_view(LORA_RECEIVE.payload_offset())
             
         duration = complete_timestamp - receive_timestamp
             
@@ -194,7 +175,9 @@ def process_lora_frame(parsed_msg: dict, addr: tuple) -> dict:
             "lora_receive_info": {
                 "frame_count": frame_count,
                 "duration_ms": duration,
-                "data_content": data_hex
+                "receive_timestamp": receive_timestamp,
+                "complete_timestamp": complete_timestamp,
+                "data": data_bytes
             }
         }
         
@@ -208,19 +191,73 @@ def process_lora_frame(parsed_msg: dict, addr: tuple) -> dict:
             "error": "processing_error"
         }
 
-def process_frame_by_type(parsed_msg: dict, addr: tuple) -> dict:
-    """根据消息类型处理消息"""
-    message_type = parsed_msg.get("message_type", 0)
+def process_frame_by_type(frame: Frame, addr: tuple, relay=None) -> dict:
+    """根据消息类型处理消息(relay: 信号帧透传使用的发送器)"""
+    message_type = frame.message_type
     
     try:
         if message_type == FRAME_TYPE_VIRTUAL_SEND:
-            return process_virtual_send_frame(parsed_msg, addr)
+            return process_virtual_send_frame(frame, addr, relay)
         elif message_type == FRAME_TYPE_VIRTUAL_RECEIVE:
-            return process_virtual_receive_frame(parsed_msg, addr)
+            return process_virtual_receive_frame(frame, addr, relay)
         elif message_type == FRAME_TYPE_FPGA:
-            return process_fpga_frame(parsed_msg, addr)
+            return process_fpga_frame(frame, addr)
         elif message_type == FRAME_TYPE_LORA:
-            return process_lora_frame(parsed_msg, addr)
+            return process_lora_frame(frame, addr)
         
     except Exception as e:
-        logger.error(f"处理消息类型 0x{message_type:02X} 时发生错误: {e}")
\ No newline at end of file
+        logger.error(f"处理消息类型 0x{message_type:02X} 时发生错误: {e}")
+
+class ReceivePipeline:
+    """
+    设备接收管线
+    
+    处理单帧, 信号帧经由 relay 透传回该设备, 按模式发布到该设备的消息总线(主题为帧类型)
+    
+    发布的结果带接收时刻: host_time 为系统时间(秒, 由单调时钟换算, 亚毫秒精度),
+    时钟同步锁定时另有 fpga_time 为该时刻对应的FPGA计数器值;
+    FPGA响应(0x05)在任何模式下都先交给事务层匹配在途请求
+    """
+    
+    def __init__(self, bus: MessageBus, relay=None, name: str = "default", clock=None, transactions=None):
+        self.bus = bus
+        self.relay = relay    # 发送器(FrameSender), 透传帧发往ARM
+        self.name = name
+        self.clock = clock    # 设备的时钟同步(ClockSync)
+        self.transactions = transactions  # 设备的FPGA事务层(FpgaTransactions)
+    
+    def dispatch(self, frame: Frame, addr: tuple) -> Optional[dict]:
+        """
+        处理单帧并发布, 各传输层接收后统一调用
+        
+        Returns:
+            已发布的处理结果，未发布时返回None
+        """
+        received_at = time.perf_counter()
+        msg_type = frame.message_type
+        
+        result = process_frame_by_type(frame, addr, self.relay)
+        if result is None:
+            return None
+        result["host_time"] = received_at + WALL_OFFSET
+        
+        if msg_type == FRAME_TYPE_FPGA and self.transactions is not None:
+            self.transactions.resolve(result)
+        
+        if msg_type not in MODE_TOPICS[current_mode["mode"]]:
+            return None
+        
+        if self.clock is not None:
+            fpga_time = self.clock.to_counter(received_at)
+            if fpga_time is not None:
+                result["fpga_time"] = fpga_time
+        
+        self.bus.publish(msg_type, result)
+        return result
+
+# 默认管线: 全局消息总线(单设备及未指定管线的传输层使用)
+default_pipeline = ReceivePipeline(message_bus)
+
+def dispatch_frame(frame: Frame, addr: tuple) -> Optional[dict]:
+    """经由默认管线处理单帧"""
+    return default_pipeline.dispatch(frame, addr)
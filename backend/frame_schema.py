@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# frame_schema.py - 帧结构注册表与预编译编解码器
+import struct
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import (
+    FRAME_SYNC_HEADER,
+    FRAME_TYPE_VIRTUAL_SEND, FRAME_TYPE_VIRTUAL_RECEIVE,
+    FRAME_TYPE_VIRTUAL_TIMESTAMP, FRAME_TYPE_VIRTUAL_LINK,
+    FRAME_TYPE_FPGA, FRAME_TYPE_LORA, FRAME_TYPE_NODE_SETTINGS
+)
+from frame_parser import Frame, calculate_crc16
+
+logger = logging.getLogger(__name__)
+
+# 帧头: 帧同步头(4) + 消息类型(1) + 消息长度(1); 帧尾: CRC(2)
+FRAME_HEADER_STRUCT = struct.Struct('>IBB')
+FRAME_CRC_STRUCT = struct.Struct('>H')
+FRAME_OVERHEAD = FRAME_HEADER_STRUCT.size + FRAME_CRC_STRUCT.size
+
+class FrameSchema:
+    """
+    帧结构定义
+
+    消息内容 = 固定字段(head) + 重复项(item) * N + 变长数据(payload)
+    字段格式均为大端序, 构造时预编译为 struct.Struct
+    """
+    __slots__ = ("name", "frame_type", "fields", "item_fields", "head", "item", "has_payload")
+
+    def __init__(
+        self,
+        name: str,
+        frame_type: int,
+        fields: Sequence[Tuple[str, str]],
+        item_fields: Sequence[Tuple[str, str]] = (),
+        has_payload: bool = False
+    ):
+        self.name = name
+        self.frame_type = frame_type
+        self.fields = tuple(field for field, _ in fields)
+        self.item_fields = tuple(field for field, _ in item_fields)
+        self.head = struct.Struct('>' + ''.join(fmt for _, fmt in fields))
+        self.item = struct.Struct('>' + ''.join(fmt for _, fmt in item_fields)) if item_fields else None
+        self.has_payload = has_payload
+
+    def encode(self, *values, items: Sequence[tuple] = (), payload=b"") -> bytearray:
+        """
+        编码完整帧(含同步头和CRC)
+
+        一次性分配缓冲区, 各字段 pack_into 到固定偏移
+        """
+        content_length = self.head.size + len(payload)
+        if items:
+            content_length += self.item.size * len(items)
+        total_length = content_length + FRAME_OVERHEAD
+
+        buffer = bytearray(total_length)
+        FRAME_HEADER_STRUCT.pack_into(buffer, 0, FRAME_SYNC_HEADER, self.frame_type, content_length)
+        self.head.pack_into(buffer, 6, *values)
+
+        offset = 6 + self.head.size
+        if items:
+            pack_item = self.item.pack_into
+            item_size = self.item.size
+            for item in items:
+                pack_item(buffer, offset, *item)
+                offset += item_size
+
+        if payload:
+            buffer[offset:offset + len(payload)] = payload
+
+        crc = calculate_crc16(buffer, 0xFFFF, 4, total_length - 2)
+        FRAME_CRC_STRUCT.pack_into(buffer, total_length - 2, crc)
+        return buffer
+
+    def decode(self, frame: Frame) -> tuple:
+        """解码固定字段"""
+        return self.head.unpack_from(frame.buffer, frame.content_offset)
+
+    def iter_items(self, frame: Frame, count: int) -> Iterator[tuple]:
+        """解码重复项, 数据不足的尾部忽略"""
+        offset = frame.content_offset + self.head.size
+        available = (frame.message_length - self.head.size) // self.item.size
+        unpack_item = self.item.unpack_from
+        item_size = self.item.size
+        for _ in range(min(count, available)):
+            yield unpack_item(frame.buffer, offset)
+            offset += item_size
+
+    def item_capacity(self, frame: Frame) -> int:
+        """帧中实际包含的完整重复项数"""
+        return (frame.message_length - self.head.size) // self.item.size
+
+    def payload_offset(self, count: int = 0) -> int:
+        """变长数据在消息内容中的偏移"""
+        offset = self.head.size
+        if count:
+            offset += self.item.size * count
+        return offset
+
+# 帧结构注册表
+FRAME_SCHEMAS: Dict[str, FrameSchema] = {}
+
+def register_schema(schema: FrameSchema) -> FrameSchema:
+    """注册帧结构"""
+    FRAME_SCHEMAS[schema.name] = schema
+    return schema
+
+def get_schema(name: str) -> FrameSchema:
+    """获取帧结构"""
+    return FRAME_SCHEMAS[name]
+
+# ========== 帧结构定义 ==========
+
+# 0x00 虚实节点信号发送帧: 发送时间(4) + 信号传播参数(4) + 数据包(N)
+VIRTUAL_SEND = register_schema(FrameSchema(
+    "virtual_send", FRAME_TYPE_VIRTUAL_SEND,
+    [("send_time", "I"), ("propagation_param", "I")],
+    has_payload=True
+))
+
+# 0x01 虚实节点信号接收帧: 接收时间(4) + 接收时间戳(4) + 数据包(N)
+VIRTUAL_RECEIVE = register_schema(FrameSchema(
+    "virtual_receive", FRAME_TYPE_VIRTUAL_RECEIVE,
+    [("receive_time", "I"), ("receive_timestamp", "I")],
+    has_payload=True
+))
+
+# 0x02 虚实节点发送时间戳回传帧: 发送完成时间(4) + 链路时间戳(4) + 数据包(8)
+VIRTUAL_TIMESTAMP = register_schema(FrameSchema(
+    "virtual_timestamp", FRAME_TYPE_VIRTUAL_TIMESTAMP,
+    [("send_complete_time", "I"), ("link_timestamp", "I"), ("data_packet", "Q")]
+))
+
+# 0x03 虚实节点链路状态帧: 接收起始时间(4) + 链路时间戳(4) + 备份(8)
+VIRTUAL_LINK = register_schema(FrameSchema(
+    "virtual_link", FRAME_TYPE_VIRTUAL_LINK,
+    [("receive_start_time", "I"), ("link_timestamp", "I"), ("backup", "Q")]
+))
+
+# 0x05 FPGA读写帧: operation_type(1) + operation_count(1) + [address(4) + data(4)] * N
+FPGA = register_schema(FrameSchema(
+    "fpga", FRAME_TYPE_FPGA,
+    [("operation_type", "B"), ("operation_count", "B")],
+    item_fields=[("address", "I"), ("data", "I")]
+))
+
+# 0x05 FPGA单地址读请求: operation_type(1) + operation_count(1) + address(4)
+FPGA_READ = register_schema(FrameSchema(
+    "fpga_read", FRAME_TYPE_FPGA,
+    [("operation_type", "B"), ("operation_count", "B")],
+    item_fields=[("address", "I")]
+))
+
+# 0x07 LoRa发送帧: timing_enable(1) + timing_time(4) + frame_count(1) + 数据(N)
+LORA_SEND = register_schema(FrameSchema(
+    "lora_send", FRAME_TYPE_LORA,
+    [("timing_enable", "B"), ("timing_time", "I"), ("frame_count", "B")],
+    has_payload=True
+))
+
+# 0x07 LoRa接收帧: receive_timestamp(4) + complete_timestamp(4) + frame_count(1) + 数据(N)
+LORA_RECEIVE = register_schema(FrameSchema(
+    "lora_receive", FRAME_TYPE_LORA,
+    [("receive_timestamp", "I"), ("complete_timestamp", "I"), ("frame_count", "B")],
+    has_payload=True
+))
+
+# 0x08 节点参数设置帧
+NODE_SETTINGS = register_schema(FrameSchema(
+    "node_settings", FRAME_TYPE_NODE_SETTINGS,
+    [
+        ("node_id", "B"),
+        ("node_mode", "B"),              # 0=单机, 1=组网, 2=虚实融合
+        ("total_nodes", "B"),
+        ("node_type", "B"),              # 0=普通, 1=母星
+        ("frequency", "I"),              # kHz
+        ("attenuation", "B"),            # dB
+        ("forward_bandwidth", "I"),      # kHz
+        ("forward_spreading_factor", "B"),
+        ("forward_coding", "B"),         # 1=4/5, 2=4/6, 3=4/7, 4=4/8
+        ("backward_bandwidth", "I"),     # kHz
+        ("backward_spreading_factor", "B"),
+        ("backward_coding", "B"),        # 1=4/5, 2=4/6, 3=4/7, 4=4/8
+        ("backward_spreading_factor2", "B")
+    ]
+))
+
+# ========== 帧构建 ==========
+
+# 节点参数映射
+NODE_MODE_MAP = {'standalone': 0, 'network': 1, 'virtual': 2}
+NODE_TYPE_MAP = {'normal': 0, 'mother': 1}
+NODE_CODING_MAP = {'4/5': 1, '4/6': 2, '4/7': 3, '4/8': 4}
+
+def build_fpga_frame(
+    operation_type: int,
+    address: Optional[int] = None,
+    data: Optional[int] = None,
+    batch_operations: Optional[List[Tuple[int, int]]] = None
+) -> bytearray:
+    """
+    构建FPGA操作帧 (0x05)
+
+    批量: [(address, data), ...]; 单次读只携带地址, 单次写携带地址和数据
+
+    Raises:
+        ValueError: 操作类型不是 0(读) / 1(写), 或单次操作缺少地址、单次写缺少数据
+    """
+    if operation_type not in (0, 1):
+        raise ValueError(f"操作类型只能为 0(读) / 1(写): {operation_type}")
+
+    if batch_operations:
+        return FPGA.encode(operation_type, len(batch_operations), items=batch_operations)
+
+    if address is None:
+        raise ValueError("单次操作需要提供address参数")
+
+    if operation_type == 0:
+        return FPGA_READ.encode(operation_type, 1, items=((address,),))
+
+    if data is None:
+        raise ValueError("写操作需要提供data参数")
+    return FPGA.encode(operation_type, 1, items=((address, data),))
+
+def build_lora_frame(timing_enable: int, timing_time: int, frame_count: int, data) -> bytearray:
+    """构建LoRa发送帧 (0x07)"""
+    return LORA_SEND.encode(timing_enable, timing_time, frame_count, payload=data)
+
+def build_node_settings_frame(node_settings: dict) -> bytearray:
+    """构建节点参数设置帧 (0x08)"""
+    forward = node_settings.get('forward', {})
+    backward = node_settings.get('backward', {})
+
+    return NODE_SETTINGS.encode(
+        node_settings.get('nodeId', 1),
+        NODE_MODE_MAP.get(node_settings.get('nodeMode', 'virtual'), 2),
+        node_settings.get('totalNodes', 1),
+        NODE_TYPE_MAP.get(node_settings.get('nodeType', 'normal'), 0),
+        node_settings.get('frequency', 900000),
+        node_settings.get('attenuation', 10),
+        forward.get('bandwidth', 125),
+        forward.get('spreadingFactor', 7),
+        NODE_CODING_MAP.get(forward.get('coding', '4/5'), 1),
+        backward.get('bandwidth', 125),
+        backward.get('spreadingFactor', 7),
+        NODE_CODING_MAP.get(backward.get('coding', '4/5'), 1),
+        backward.get('spreadingFactor2', 7)
+    )
+
+# ========== LoRa发送帧模板缓存 ==========
+
+# frame_count 在整帧中的偏移: 帧头(6) + timing_enable(1) + timing_time(4)
+LORA_FRAME_COUNT_OFFSET = FRAME_HEADER_STRUCT.size + LORA_SEND.head.size - 1
+
+class LoraFrameTemplate:
+    """
+    LoRa发送帧模板
+
+    除 frame_count 外帧内容固定; 发送时只修补 frame_count 字节,
+    CRC 按线性性质查表修正, 每帧开销与数据长度无关
+    """
+    __slots__ = ("frame", "base_crc", "crc_deltas")
+
+    def __init__(self, timing_enable: int, timing_time: int, data: bytes):
+        # frame_count=0 的基准帧
+        self.frame = bytes(LORA_SEND.encode(timing_enable, timing_time, 0, payload=data))
+        total_length = len(self.frame)
+        self.base_crc = FRAME_CRC_STRUCT.unpack_from(self.frame, total_length - 2)[0]
+
+        # CRC(a ^ b) = CRC(a) ^ CRC0(b): 只需 frame_count 每一位(后接若干0字节)的 CRC0
+        trailing_zeros = bytes(total_length - 2 - (LORA_FRAME_COUNT_OFFSET + 1))
+        basis = [calculate_crc16(bytes((1 << bit,)) + trailing_zeros, 0) for bit in range(8)]
+
+        deltas = [0] * 256
+        for value in range(1, 256):
+            low_bit = value & -value
+            deltas[value] = deltas[value ^ low_bit] ^ basis[low_bit.bit_length() - 1]
+        self.crc_deltas = deltas
+
+    def encode(self, frame_count: int) -> bytearray:
+        """生成指定 frame_count 的完整帧"""
+        buffer = bytearray(self.frame)
+        buffer[LORA_FRAME_COUNT_OFFSET] = frame_count
+        FRAME_CRC_STRUCT.pack_into(buffer, len(buffer) - 2, self.base_crc ^ self.crc_deltas[frame_count])
+        return buffer
+
+class LoraFrameEncoder:
+    """
+    LoRa发送帧编码器
+
+    按 (timing_enable, timing_time, data_content) 缓存帧模板(LRU),
+    相同数据只在首次发送时解析十六进制并构建模板
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, timing_enable: int, timing_time: int, frame_count: int, data_content: str) -> bytearray:
+        """编码LoRa发送帧, data_content 为十六进制字符串"""
+        key = (timing_enable, timing_time, data_content)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+
+        if template is None:
+            template = LoraFrameTemplate(timing_enable, timing_time, bytes.fromhex(data_content))
+            with self._lock:
+                self.misses += 1
+                self._templates[key] = template
+                if len(self._templates) > self.capacity:
+                    self._templates.popitem(last=False)
+
+        return template.encode(frame_count)
+
+    def clear(self):
+        """清空模板缓存"""
+        with self._lock:
+            self._templates.clear()
+
+    def get_stats(self) -> dict:
+        """获取缓存统计"""
+        return {
+            "templates": len(self._templates),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+# 全局LoRa编码器
+lora_frame_encoder = LoraFrameEncoder()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# frame_sender.py - 按协议构建帧并经由传输层发送(与传输方式无关)
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from frame_schema import build_fpga_frame, build_node_settings_frame, lora_frame_encoder
+from transport import Transport
+
+logger = logging.getLogger(__name__)
+
+class FrameSender:
+    """帧发送器: UDP / 串口 / 回环共用"""
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+
+    def send_fpga_operation(
+        self,
+        operation_type: int,
+        address: Optional[int] = None,
+        data: Optional[int] = None,
+        batch_operations: Optional[List[Tuple[int, int]]] = None
+    ) -> bool:
+        """
+        发送FPGA操作消息 (0x05)
+
+        Args:
+            operation_type: 操作类型 (0=读, 1=写)
+            address: 单个操作的地址 (单次读写时使用)
+            data: 单个操作的数据 (写操作时使用)
+            batch_operations: 批量操作列表 [(address, data), ...]
+        """
+        try:
+            # 批量: [address(4) + data(4)] * N; 单次读只带地址
+            full_message = build_fpga_frame(operation_type, address, data, batch_operations)
+            return self.transport.send(full_message)
+
+        except Exception as e:
+            logger.error(f"FPGA操作发送失败: {e}")
+            return False
+
+    def send_lora_message(
+        self,
+        timing_enable: int,
+        timing_time: int,
+        data_content: str,
+        frame_count: int = 0
+    ) -> bool:
+        """发送LoRa消息帧 (0x07)"""
+        try:
+            # timing_enable(1) + timing_time(4) + frame_count(1) + 实际数据
+            # 相同数据复用缓存的帧模板, 只修补 frame_count 和 CRC
+            full_message = lora_frame_encoder.encode(timing_enable, timing_time, frame_count, data_content)
+            return self.transport.send(full_message)
+
+        except Exception as e:
+            logger.error(f"发送LoRa消息失败: {e}")
+            return False
+
+    def send_lora_messages(self, messages: Iterable[dict]) -> int:
+        """
+        批量发送LoRa消息帧 (0x07), 一次交给传输层(UDP下为一次 sendmmsg)
+
+        Args:
+            messages: [{timing_enable, timing_time, data_content, frame_count}, ...]
+
+        Returns:
+            成功发送的帧数
+        """
+        try:
+            frames = [
+                lora_frame_encoder.encode(
+                    int(msg.get("timing_enable", 0)),
+                    int(msg.get("timing_time", 0)),
+                    int(msg.get("frame_count", 0)),
+                    msg["data_content"]
+                )
+                for msg in messages
+            ]
+            return self.transport.send_batch(frames)
+
+        except Exception as e:
+            logger.error(f"批量发送LoRa消息失败: {e}")
+            return 0
+
+    def send_node_operation(self, node_settings: dict) -> bool:
+        """
+        发送节点配置消息 (0x08)
+
+        node_settings 中的 target(ip/port) 可覆盖UDP目标地址, 串口忽略
+        """
+        try:
+            full_message = build_node_settings_frame(node_settings)
+
+            target = node_settings.get('target') or {}
+            address = (target["ip"], target["port"]) if target.get("ip") and target.get("port") else None
+
+            success = self.transport.send(full_message, address)
+            if success:
+                logger.info(f"✅ 节点配置已发送 ({self.transport.kind})")
+            return success
+
+        except Exception as e:
+            logger.error(f"❌ 发送节点配置失败: {e}")
+            return False
+
+    def send_raw_data(self, data: bytes) -> bool:
+        """发送原始字节数据（用于透传）"""
+        try:
+            return self.transport.send(data)
+        except Exception as e:
+            logger.error(f"❌ 发送原始数据失败: {e}")
+            return False
+
+    def send_batch(self, frames: Iterable[bytes]) -> int:
+        """批量发送已构建的帧, 返回成功发送的帧数"""
+        return self.transport.send_batch(frames)
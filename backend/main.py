@@ -13,17 +13,15 @@ logger = setup_logger(__name__)
 # 导入配置
 from config import CONFIG, SystemMode, current_mode
 
-# 导入UDP类
-from udp_receiver import UDPReceiver
-from udp_sender import UDPSender
+# 导入设备注册表
+from device_registry import DeviceRegistry
 
 # 导入API路由
-from api import parameter_routes, lora_routes, mode_routes, virtual_routes
+from api import parameter_routes, lora_routes, mode_routes, virtual_routes, device_routes, frame_routes
 
 
-# 创建全局实例
-udp_receiver = UDPReceiver()
-udp_sender = UDPSender()
+# 创建全局实例: 每个设备独立的传输层(udp / serial / loopback)、发送队列、参数和监控器
+registry = DeviceRegistry.from_config(CONFIG)
 
 # 定义 lifespan 事件处理器
 @asynccontextmanager
@@ -35,20 +33,20 @@ async def lifespan(app: FastAPI):
     logger.info(f"配置信息: {CONFIG}")
     logger.info("=" * 60)
     
-    # 启动默认接收端口
-    success = udp_receiver.start(CONFIG["local_ip"], CONFIG["udp_receive_port"])
+    # 启动所有设备 (UDP asyncio模式在当前事件循环中创建数据报端点)
+    success = await registry.start()
 
     if success:
-        logger.info("✓ UDP接收服务启动成功")
+        logger.info(f"✓ 传输层启动成功 ({len(registry)} 个设备)")
     else:
-        logger.error("✗ UDP接收服务启动失败")
+        logger.error("✗ 部分设备传输层启动失败")
     
     logger.info("=" * 60)
     
     yield  # 应用运行中
     
-    udp_receiver.stop()
-    logger.info("✓ UDP接收服务已关闭")
+    registry.stop()
+    logger.info("✓ 传输层已关闭")
     logger.info("=" * 60)
 
 # FastAPI应用 - 使用 lifespan 参数
@@ -69,20 +67,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-from frame_processor import init_sender as init_frame_processor_sender
 # 注入依赖到路由模块
-parameter_routes.init_sender(udp_sender)
-virtual_routes.init_sender(udp_sender)
-lora_routes.init_sender(udp_sender)
-mode_routes.init_receiver(udp_receiver)  
-init_frame_processor_sender(udp_sender)
+device_routes.init_registry(registry)
 
 
-# 注册路由
+# 注册路由 (device_router: /api/devices/{device_id}/... 按设备访问)
 app.include_router(parameter_routes.router)
 app.include_router(lora_routes.router)
 app.include_router(mode_routes.router)  
 app.include_router(virtual_routes.router)
+app.include_router(device_routes.router)
+app.include_router(frame_routes.router)
+app.include_router(parameter_routes.device_router)
+app.include_router(lora_routes.device_router)
+app.include_router(virtual_routes.device_router)
+app.include_router(frame_routes.device_router)
 
 # 根路由
 @app.get("/")
@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+# message_bus.py - 进程内发布/订阅消息总线
+import asyncio
+import itertools
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 溢出策略
+OVERFLOW_DROP_OLDEST = "drop_oldest"   # 丢弃最旧的消息(保留最新数据)
+OVERFLOW_DROP_NEWEST = "drop_newest"   # 丢弃新到的消息(保留积压数据)
+
+DEFAULT_QUEUE_SIZE = CONFIG.get("bus_queue_size", 4096)
+DEFAULT_OVERFLOW = CONFIG.get("bus_overflow_policy", OVERFLOW_DROP_OLDEST)
+
+class AsyncWakeup:
+    """
+    订阅者的事件循环唤醒器
+
+    - 发布方在事件循环内(asyncio接收器): 直接 set 事件
+    - 发布方在其他线程(接收线程/串口线程): call_soon_threadsafe 切回事件循环再 set,
+      已安排但尚未执行时不重复安排, 突发到达的多条消息只唤醒一次
+
+    threadsafe=False 只是快速路径: 发布方不在事件循环线程时(如监控线程发布的监视事件)仍切回事件循环
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threadsafe: bool = True):
+        self.loop = loop
+        self.threadsafe = threadsafe
+        self.event = asyncio.Event()
+        self._scheduled = False
+        self._loop_thread = threading.get_ident()   # 在协程中创建, 即事件循环所在线程
+        self.wakeups = 0
+
+    def __call__(self):
+        """通知回调(发布方调用)"""
+        if not self.threadsafe and threading.get_ident() == self._loop_thread:
+            self.event.set()
+            return
+        if self._scheduled:
+            return
+        self._scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._set)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    def _set(self):
+        self._scheduled = False
+        self.event.set()
+
+    async def wait(self, timeout: Optional[float] = None):
+        """
+        等待新消息到达(返回后应取完队列中的全部消息)
+
+        timeout: 最长等待秒数, 超时后同样返回(由调用方检查队列);
+        用 call_later 实现而不是 asyncio.wait_for, 后者在超时与取消同时发生时可能吞掉取消
+        """
+        handle = self.loop.call_later(timeout, self.event.set) if timeout is not None else None
+        try:
+            await self.event.wait()
+        finally:
+            if handle is not None:
+                handle.cancel()
+        self.event.clear()
+        self.wakeups += 1
+
+class Subscription:
+    """
+    订阅者
+
+    每个订阅者拥有独立的有界队列, 消费互不影响
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        name: str,
+        topics: Optional[Iterable[int]],
+        maxlen: int,
+        overflow: str
+    ):
+        self.bus = bus
+        self.name = name
+        self.topics = frozenset(topics) if topics is not None else None
+        self.maxlen = maxlen
+        self.overflow = overflow
+        self.notify: Optional[Callable[[], None]] = None  # 有新消息时的回调
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+
+        # 统计
+        self.published = 0   # 投递给该订阅者的消息数
+        self.consumed = 0    # 已取出的消息数
+        self.dropped = 0     # 因队列满丢弃的消息数
+
+    def put(self, message) -> bool:
+        """投递消息, 队列满时按溢出策略处理"""
+        with self._lock:
+            self.published += 1
+            if len(self._queue) >= self.maxlen:
+                self.dropped += 1
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(message)
+
+        if self.notify is not None:
+            self.notify()
+        return True
+
+    def get_nowait(self):
+        """取出一条消息, 队列为空时返回None"""
+        with self._lock:
+            if not self._queue:
+                return None
+            self.consumed += 1
+            return self._queue.popleft()
+
+    def drain(self, max_items: Optional[int] = None) -> list:
+        """取出全部(或最多 max_items 条)消息"""
+        with self._lock:
+            if max_items is None or max_items >= len(self._queue):
+                items = list(self._queue)
+                self._queue.clear()
+            else:
+                items = [self._queue.popleft() for _ in range(max_items)]
+            self.consumed += len(items)
+            return items
+
+    def clear(self) -> int:
+        """清空队列, 返回清除的消息数"""
+        with self._lock:
+            count = len(self._queue)
+            self._queue.clear()
+            return count
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def lag(self) -> int:
+        """积压(未消费)的消息数"""
+        return len(self._queue)
+
+    def async_wakeup(self, threadsafe: bool = True) -> AsyncWakeup:
+        """
+        创建绑定当前事件循环的唤醒器并设为通知回调(需在协程中调用)
+
+        Args:
+            threadsafe: 发布方是否可能在事件循环以外的线程
+        """
+        wakeup = AsyncWakeup(asyncio.get_running_loop(), threadsafe)
+        self.notify = wakeup
+        return wakeup
+
+    def close(self):
+        """取消订阅"""
+        self.notify = None
+        self.bus.unsubscribe(self)
+
+    def get_stats(self) -> dict:
+        """获取订阅者统计"""
+        return {
+            "name": self.name,
+            "topics": sorted(self.topics) if self.topics is not None else "*",
+            "maxlen": self.maxlen,
+            "overflow": self.overflow,
+            "lag": self.lag,
+            "published": self.published,
+            "consumed": self.consumed,
+            "dropped": self.dropped
+        }
+
+class Mailbox:
+    """
+    键控邮箱
+
+    每个键只保留最新一条消息, 新消息直接覆盖旧消息;
+    查找与取出都是 O(1), 与总线上的消息量无关
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        name: str,
+        topics: Optional[Iterable[int]],
+        key: Callable[[dict], Hashable]
+    ):
+        self.bus = bus
+        self.name = name
+        self.topics = frozenset(topics) if topics is not None else None
+        self.key = key
+        self.notify: Optional[Callable[[], None]] = None  # 有新消息时的回调
+
+        self._slots: Dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+
+        # 统计
+        self.published = 0   # 投递给该邮箱的消息数
+        self.consumed = 0    # 已取出的消息数
+        self.replaced = 0    # 未被取出即被覆盖的消息数
+        self.ignored = 0     # 键为None而忽略的消息数
+
+    def put(self, message) -> bool:
+        """投递消息, 覆盖同键的旧消息"""
+        key = self.key(message)
+        with self._lock:
+            self.published += 1
+            if key is None:
+                self.ignored += 1
+                return False
+            if key in self._slots:
+                self.replaced += 1
+            self._slots[key] = message
+
+        if self.notify is not None:
+            self.notify()
+        return True
+
+    def get(self, key: Hashable):
+        """查看某键的最新消息(不取出), 不存在时返回None"""
+        return self._slots.get(key)
+
+    def take(self, key: Hashable):
+        """取出某键的最新消息, 不存在时返回None"""
+        with self._lock:
+            message = self._slots.pop(key, None)
+            if message is not None:
+                self.consumed += 1
+            return message
+
+    def clear(self) -> int:
+        """清空邮箱, 返回清除的消息数"""
+        with self._lock:
+            count = len(self._slots)
+            self._slots.clear()
+            return count
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def lag(self) -> int:
+        """未取出的消息数"""
+        return len(self._slots)
+
+    def close(self):
+        """取消订阅"""
+        self.bus.unsubscribe(self)
+
+    def get_stats(self) -> dict:
+        """获取邮箱统计"""
+        return {
+            "name": self.name,
+            "topics": sorted(self.topics) if self.topics is not None else "*",
+            "mailbox": True,
+            "lag": self.lag,
+            "published": self.published,
+            "consumed": self.consumed,
+            "replaced": self.replaced,
+            "ignored": self.ignored
+        }
+
+class ReplayBuffer:
+    """
+    重放环形缓冲区
+
+    为每条消息分配单调递增的事件ID, 保留最近的消息(按条数和估算字节数限制);
+    各读取方持有自己的读取位置(ReplayCursor), 断线重连后从上次的事件ID继续读取,
+    断线期间到达的消息不丢失. 即使没有读取方也持续记录.
+    """
+
+    def __init__(
+        self,
+        bus: "MessageBus",
+        name: str,
+        topics: Optional[Iterable[int]],
+        capacity: int,
+        max_bytes: int,
+        size: Callable[[object], int]
+    ):
+        self.bus = bus
+        self.name = name
+        self.topics = frozenset(topics) if topics is not None else None
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.size = size
+
+        self._entries = deque()   # (事件ID, 消息, 估算字节数)
+        self._lock = threading.Lock()
+        self._listeners: Tuple[Callable[[], None], ...] = ()   # 读取方的通知回调(写时复制)
+        self.last_id = 0          # 最新消息的事件ID
+        self.bytes = 0            # 保留消息的估算字节数
+
+        # 统计
+        self.published = 0   # 记录的消息数
+        self.evicted = 0     # 超出容量被淘汰的消息数
+
+    def put(self, message) -> bool:
+        """记录消息, 超出条数或字节数上限时淘汰最旧的消息(至少保留最新一条)"""
+        size = self.size(message)
+        with self._lock:
+            self.published += 1
+            self.last_id += 1
+            self._entries.append((self.last_id, message, size))
+            self.bytes += size
+            while len(self._entries) > self.capacity or (self.bytes > self.max_bytes and len(self._entries) > 1):
+                self.bytes -= self._entries.popleft()[2]
+                self.evicted += 1
+
+        for listener in self._listeners:
+            listener()
+        return True
+
+    @property
+    def first_id(self) -> int:
+        """保留的最旧消息的事件ID(为空时为下一条消息的ID)"""
+        entries = self._entries
+        return entries[0][0] if entries else self.last_id + 1
+
+    def read(self, after_id: int, max_items: Optional[int] = None) -> Tuple[List[Tuple[int, object]], int]:
+        """
+        读取事件ID大于 after_id 的消息
+
+        Returns:
+            ([(事件ID, 消息), ...], 已被淘汰而读不到的消息数)
+        """
+        with self._lock:
+            first_id = self._entries[0][0] if self._entries else self.last_id + 1
+            missed = max(0, first_id - 1 - after_id)
+            count = self.last_id - max(after_id, first_id - 1)
+            if max_items is not None:
+                count = min(count, max_items)
+            if count <= 0:
+                return [], missed
+
+            # 读取方通常只落后少量消息: 从尾部向前取, 开销与读取条数成正比
+            skip = self.last_id - max(after_id, first_id - 1) - count
+            tail = list(itertools.islice(reversed(self._entries), skip, skip + count))
+
+        tail.reverse()
+        return [(event_id, message) for event_id, message, _ in tail], missed
+
+    def cursor(self, after_id: Optional[int] = None, name: str = "") -> "ReplayCursor":
+        """
+        创建读取位置
+
+        Args:
+            after_id: 客户端已收到的最后一个事件ID, None 表示只读取之后的新消息;
+                      大于当前最新ID(服务端重启, ID重新计数)时从保留的最旧消息开始
+        """
+        if after_id is None:
+            position = self.last_id
+        elif after_id > self.last_id:
+            logger.warning(f"{self.name}: 事件ID {after_id} 超出当前最新ID {self.last_id}, 从头重放")
+            position = 0
+        else:
+            position = after_id
+        return ReplayCursor(self, name or f"{self.name}-cursor-{next(self.bus._ids)}", position)
+
+    def add_listener(self, listener: Callable[[], None]):
+        with self._lock:
+            self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        with self._lock:
+            self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    def clear(self) -> int:
+        """清空保留的消息(事件ID继续递增), 返回清除的消息数"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+            return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def lag(self) -> int:
+        """保留的消息数"""
+        return len(self._entries)
+
+    def close(self):
+        """取消订阅"""
+        self.bus.unsubscribe(self)
+
+    def get_stats(self) -> dict:
+        """获取重放缓冲区统计"""
+        return {
+            "name": self.name,
+            "topics": sorted(self.topics) if self.topics is not None else "*",
+            "replay": True,
+            "capacity": self.capacity,
+            "max_bytes": self.max_bytes,
+            "retained": len(self._entries),
+            "bytes": self.bytes,
+            "first_id": self.first_id,
+            "last_id": self.last_id,
+            "published": self.published,
+            "evicted": self.evicted,
+            "readers": len(self._listeners)
+        }
+
+class ReplayCursor:
+    """
+    重放缓冲区的读取位置(每个SSE连接一个)
+
+    接口与 Subscription 相同, 但 drain 返回 (事件ID, 消息);
+    读取方落后超过缓冲区容量时, 读不到的消息计入 missed
+    """
+
+    def __init__(self, buffer: ReplayBuffer, name: str, position: int):
+        self.buffer = buffer
+        self.name = name
+        self.position = position   # 已读取的最后一个事件ID
+        self.notify: Optional[Callable[[], None]] = None
+        self.consumed = 0
+        self.missed = 0
+
+    def drain(self, max_items: Optional[int] = None) -> List[Tuple[int, object]]:
+        """取出全部(或最多 max_items 条)未读消息"""
+        items, missed = self.buffer.read(self.position, max_items)
+        self.missed += missed
+        if items:
+            self.position = items[-1][0]
+        elif missed:
+            self.position += missed
+        self.consumed += len(items)
+        return items
+
+    def __len__(self) -> int:
+        return self.lag
+
+    @property
+    def lag(self) -> int:
+        """未读取的消息数"""
+        return max(0, self.buffer.last_id - self.position)
+
+    def async_wakeup(self, threadsafe: bool = True) -> AsyncWakeup:
+        """创建绑定当前事件循环的唤醒器, 缓冲区有新消息时唤醒(需在协程中调用)"""
+        if self.notify is not None:
+            self.buffer.remove_listener(self.notify)
+        wakeup = AsyncWakeup(asyncio.get_running_loop(), threadsafe)
+        self.notify = wakeup
+        self.buffer.add_listener(wakeup)
+        return wakeup
+
+    def close(self):
+        """停止接收通知"""
+        if self.notify is not None:
+            self.buffer.remove_listener(self.notify)
+            self.notify = None
+
+# 总线上的订阅端: 队列订阅者、键控邮箱或重放缓冲区
+Endpoint = Union[Subscription, Mailbox, ReplayBuffer]
+
+class MessageBus:
+    """
+    进程内消息总线
+
+    - 主题为帧类型(int), 订阅时可指定关注的主题, None 表示全部
+    - 发布时只投递给关注该主题的订阅者(队列或键控邮箱)
+    - 订阅列表写时复制, 发布路径无需全局锁
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, overflow: str = DEFAULT_OVERFLOW):
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self._lock = threading.Lock()
+        self._subscriptions: Tuple[Endpoint, ...] = ()
+        self._routes: Dict[int, Tuple[Endpoint, ...]] = {}
+        self._wildcard: Tuple[Endpoint, ...] = ()
+        self.published = 0
+        self.unrouted = 0
+        self._ids = itertools.count(1)
+
+    def subscribe(
+        self,
+        topics: Optional[Iterable[int]] = None,
+        name: str = "",
+        maxlen: Optional[int] = None,
+        overflow: Optional[str] = None
+    ) -> Subscription:
+        """创建订阅"""
+        subscription = Subscription(
+            self,
+            name or f"subscriber-{next(self._ids)}",
+            topics,
+            maxlen or self.queue_size,
+            overflow or self.overflow
+        )
+        self._attach(subscription)
+        return subscription
+
+    def mailbox(
+        self,
+        topics: Optional[Iterable[int]],
+        key: Callable[[dict], Hashable],
+        name: str = ""
+    ) -> Mailbox:
+        """
+        创建键控邮箱(每个键只保留最新消息)
+
+        Args:
+            topics: 关注的主题, None 表示全部
+            key: 从消息中提取键的函数, 返回None的消息被忽略
+            name: 名称
+        """
+        mailbox = Mailbox(self, name or f"mailbox-{next(self._ids)}", topics, key)
+        self._attach(mailbox)
+        return mailbox
+
+    def replay_buffer(
+        self,
+        topics: Optional[Iterable[int]],
+        capacity: int,
+        max_bytes: int,
+        size: Callable[[object], int] = lambda message: 0,
+        name: str = ""
+    ) -> ReplayBuffer:
+        """
+        创建重放环形缓冲区(保留最近消息, 供断线重连后补发)
+
+        Args:
+            topics: 关注的主题, None 表示全部
+            capacity: 最多保留的消息数
+            max_bytes: 最多保留的估算字节数
+            size: 估算单条消息占用字节数的函数
+            name: 名称
+        """
+        buffer = ReplayBuffer(self, name or f"replay-{next(self._ids)}", topics, capacity, max_bytes, size)
+        self._attach(buffer)
+        return buffer
+
+    def _attach(self, subscription: Endpoint):
+        """加入路由表"""
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+            self._rebuild_routes()
+        logger.debug(f"消息总线新增订阅: {subscription.name}")
+
+    def unsubscribe(self, subscription: Endpoint):
+        """取消订阅"""
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+            self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        """重建主题路由表(持有锁时调用)"""
+        routes: Dict[int, List[Endpoint]] = {}
+        wildcard = []
+        for subscription in self._subscriptions:
+            if subscription.topics is None:
+                wildcard.append(subscription)
+            else:
+                for topic in subscription.topics:
+                    routes.setdefault(topic, []).append(subscription)
+
+        self._wildcard = tuple(wildcard)
+        self._routes = {topic: tuple(subs) + self._wildcard for topic, subs in routes.items()}
+
+    def publish(self, topic: int, message) -> int:
+        """发布消息, 返回投递的订阅者数"""
+        self.published += 1
+        subscribers = self._routes.get(topic, self._wildcard)
+        if not subscribers:
+            self.unrouted += 1
+            return 0
+
+        for subscription in subscribers:
+            subscription.put(message)
+        return len(subscribers)
+
+    def clear(self) -> int:
+        """清空所有订阅者的队列, 返回清除的消息总数"""
+        return sum(subscription.clear() for subscription in self._subscriptions)
+
+    def get_stats(self) -> dict:
+        """获取总线统计"""
+        return {
+            "published": self.published,
+            "unrouted": self.unrouted,
+            "subscribers": [s.get_stats() for s in self._subscriptions]
+        }
+
+# 全局消息总线
+message_bus = MessageBus()
+
+def get_message_bus() -> MessageBus:
+    """获取消息总线"""
+    return message_bus
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 # UDP配置模型
 class UDPConfig(BaseModel):
@@ -92,4 +92,9 @@ class NodeSettings(BaseModel):
     
     forward: ForwardLink
     backward: BackwardLink
-    target: Target
\ No newline at end of file
+    target: Target
+
+# 寄存器监视规则(格式见 register_watch.py)
+class WatchRulesUpdate(BaseModel):
+    """替换监视规则"""
+    rules: List[dict]
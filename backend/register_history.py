@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# register_history.py - 寄存器历史: 每个寄存器一个固定容量的环形缓冲区(NumPy), 按时间范围查询并降采样
+#
+# 监控器每次读响应的每个寄存器值追加一条 (时间, 值), 写满后覆盖最旧的记录, 内存固定为 容量 * 12 字节/寄存器;
+# 查询时把 [start, end] 等分为 points 个时间桶, 每桶输出 最小值 / 最大值 / 最后一个值,
+# 长时间范围只返回固定数量的点, 同时不丢失桶内的尖峰.
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 每个寄存器保留的记录数(默认 10Hz 下约10小时, 每个寄存器约4MB)
+REGISTER_HISTORY_CAPACITY = CONFIG.get("register_history_capacity", 360000)
+
+# 查询默认与最多返回的点数
+DEFAULT_HISTORY_POINTS = CONFIG.get("register_history_points", 1000)
+MAX_HISTORY_POINTS = 10000
+
+class RegisterSeries:
+    """单个寄存器的环形缓冲区: 时间(系统时间秒, float64) + 值(uint32), 时间按写入顺序单调递增"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.uint32)
+        self.head = 0     # 下一条写入的位置
+        self.count = 0
+
+    def append(self, timestamp: float, value: int):
+        head = self.head
+        self.times[head] = timestamp
+        self.values[head] = value
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _segments(self):
+        """按时间顺序排列的有效区间(写满后分为两段)"""
+        if self.count < self.capacity:
+            return ((0, self.count),)
+        return ((self.head, self.capacity), (0, self.head))
+
+    def select(self, start: Optional[float], end: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """复制时间在 [start, end] 内的记录(按时间顺序), 每段内二分查找边界"""
+        times, values = [], []
+        for low, high in self._segments():
+            segment = self.times[low:high]
+            first = 0 if start is None else int(np.searchsorted(segment, start, "left"))
+            last = len(segment) if end is None else int(np.searchsorted(segment, end, "right"))
+            if first < last:
+                times.append(segment[first:last])
+                values.append(self.values[low + first:low + last])
+        if not times:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.uint32)
+        return np.concatenate(times), np.concatenate(values)
+
+    def bounds(self) -> Tuple[Optional[float], Optional[float]]:
+        """最早 / 最新记录的时间"""
+        if self.count == 0:
+            return None, None
+        oldest = 0 if self.count < self.capacity else self.head
+        return float(self.times[oldest]), float(self.times[self.head - 1])
+
+def downsample(times: np.ndarray, values: np.ndarray, start: float, end: float, points: int) -> dict:
+    """
+    等分 [start, end] 为 points 个时间桶, 每个有记录的桶输出 桶起始时间 / 最小值 / 最大值 / 最后一个值 / 记录数
+
+    记录数不超过 points 时原样输出(每条记录一个点)
+    """
+    if len(times) <= points or end <= start:
+        listed = values.tolist()
+        return {
+            "t": times.tolist(),
+            "min": listed,
+            "max": listed,
+            "last": listed,
+            "count": [1] * len(listed)
+        }
+
+    width = (end - start) / points
+    buckets = ((times - start) / width).astype(np.int64)
+    np.clip(buckets, 0, points - 1, out=buckets)
+
+    # 时间有序, 桶号单调不减: 桶号变化处即各桶的起点
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(values))
+    return {
+        "t": (start + buckets[starts] * width).tolist(),
+        "min": np.minimum.reduceat(values, starts).tolist(),
+        "max": np.maximum.reduceat(values, starts).tolist(),
+        "last": values[ends - 1].tolist(),
+        "count": (ends - starts).tolist()
+    }
+
+class RegisterHistory:
+    """
+    设备的寄存器历史
+
+    监控线程调用 record, API 调用 query; 查询只在复制所选区间时持锁, 降采样在锁外进行
+    """
+
+    def __init__(self, capacity: int = REGISTER_HISTORY_CAPACITY):
+        self.capacity = max(int(capacity), 1)
+        self.series: Dict[int, RegisterSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timestamp: float, registers: Dict[int, int]):
+        """追加一次读取的全部寄存器值(首次出现的寄存器分配缓冲区)"""
+        with self._lock:
+            for address, value in registers.items():
+                series = self.series.get(address)
+                if series is None:
+                    series = self.series[address] = RegisterSeries(self.capacity)
+                series.append(timestamp, value & 0xFFFFFFFF)
+
+    def query(
+        self,
+        address: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        points: int = DEFAULT_HISTORY_POINTS,
+        bits: Optional[Tuple[int, int]] = None
+    ) -> Optional[dict]:
+        """
+        查询 [start, end](系统时间秒, 省略时为最早 / 最新记录)内的历史, 降采样到最多 points 个点
+
+        bits 为 (高位, 低位) 时先取出位段再降采样; 寄存器无历史时返回None
+        """
+        with self._lock:
+            series = self.series.get(address)
+            if series is None:
+                return None
+            times, values = series.select(start, end)
+            oldest, newest = series.bounds()
+
+        if bits is not None:
+            high, low = bits
+            values = (values >> np.uint32(low)) & np.uint32((1 << (high - low + 1)) - 1)
+
+        points = min(max(int(points), 1), MAX_HISTORY_POINTS)
+        range_start = start if start is not None else (float(times[0]) if len(times) else 0.0)
+        range_end = end if end is not None else (float(times[-1]) if len(times) else 0.0)
+
+        result = {
+            "register": f"0x{address:02X}",
+            "start": range_start,
+            "end": range_end,
+            "oldest": oldest,
+            "newest": newest,
+            "samples": len(times),
+            "downsampled": len(times) > points
+        }
+        result.update(downsample(times, values, range_start, range_end, points))
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.series.clear()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            registers = {}
+            for address, series in sorted(self.series.items()):
+                oldest, newest = series.bounds()
+                registers[f"0x{address:02X}"] = {"count": series.count, "oldest": oldest, "newest": newest}
+            memory = sum(series.times.nbytes + series.values.nbytes for series in self.series.values())
+
+        return {
+            "capacity": self.capacity,
+            "memory_bytes": memory,
+            "registers": registers
+        }
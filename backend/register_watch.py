@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# register_watch.py - 寄存器监视规则: 声明式的寄存器位段条件 → 动作(发送帧 / 发布事件)
+#
+# 规则格式(config.json 的 watch_rules, 或 PUT /api/virtual/watch):
+#   {
+#     "name": "data_process",        # 规则名
+#     "register": "0x26",            # 寄存器地址(整数或十六进制字符串)
+#     "bits": [11, 8],               # 位段 [高位, 低位](含), 省略时为整个32位
+#     "condition": ">", "value": 0,  # 条件: > >= < <= == != changed(与上次读取值不同)
+#     "trigger": "edge",             # edge: 条件由假变真时触发一次 / level: 条件为真时每次读取都触发
+#     "debounce": 1,                 # 去抖: 连续N次读取结果一致才认为状态改变
+#     "action": "send_frame",        # send_frame: 发送帧 / event: 在设备消息总线上发布监视事件
+#     "frame_type": "0x02",          # send_frame: 0x02 信号发送时间戳回传帧 / 0x03 链路状态帧
+#     "timestamp_register": "0x25"   # send_frame: 帧中链路时间戳取该寄存器的值
+#   }
+import operator
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 监视事件在消息总线上的主题(帧类型为1字节, 不会与之冲突)
+WATCH_EVENT_TOPIC = 0x100
+
+# 一次批量读取的寄存器数上限(帧内容长度为1字节: 2 + 8 * 31 = 250)
+MAX_WATCH_REGISTERS = 31
+
+# 可发送的帧类型: 0x02 信号发送时间戳回传帧 / 0x03 链路状态帧
+WATCH_FRAME_TYPES = (0x02, 0x03)
+
+CONDITIONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "changed": None     # 与上次读取值不同
+}
+
+TRIGGERS = ("edge", "level")
+ACTIONS = ("send_frame", "event")
+
+# 默认规则(与原监控逻辑相同的两个位段检查)
+DEFAULT_WATCH_RULES = [
+    {
+        "name": "data_process",
+        "register": "0x26", "bits": [11, 8],
+        "condition": ">", "value": 0,
+        "trigger": "edge",
+        "action": "send_frame", "frame_type": "0x02", "timestamp_register": "0x25"
+    },
+    {
+        "name": "link_receive",
+        "register": "0x46", "bits": [19, 16],
+        "condition": ">", "value": 1,
+        "trigger": "edge",
+        "action": "send_frame", "frame_type": "0x03", "timestamp_register": "0x45"
+    }
+]
+
+def parse_int(value, field: str) -> int:
+    """整数或十六进制/十进制字符串"""
+    try:
+        return value if isinstance(value, int) else int(str(value), 0)
+    except ValueError:
+        raise ValueError(f"{field} 不是整数: {value}")
+
+class WatchRule:
+    """单条监视规则及其去抖状态"""
+
+    def __init__(self, settings: dict, index: int = 0):
+        self.name = str(settings.get("name") or f"rule{index + 1}")
+        self.register = parse_int(settings.get("register"), f"{self.name}.register")
+
+        high, low = settings.get("bits") or (31, 0)
+        self.high, self.low = parse_int(high, f"{self.name}.bits"), parse_int(low, f"{self.name}.bits")
+        if not 0 <= self.low <= self.high <= 31:
+            raise ValueError(f"{self.name}.bits 超出范围: [{self.high}, {self.low}]")
+        self.mask = (1 << (self.high - self.low + 1)) - 1
+
+        self.condition = settings.get("condition", "!=")
+        if self.condition not in CONDITIONS:
+            raise ValueError(f"{self.name}.condition 不支持: {self.condition}")
+        self.value = parse_int(settings.get("value", 0), f"{self.name}.value")
+
+        self.trigger = settings.get("trigger", "edge")
+        if self.trigger not in TRIGGERS:
+            raise ValueError(f"{self.name}.trigger 不支持: {self.trigger}")
+        self.debounce = max(1, parse_int(settings.get("debounce", 1), f"{self.name}.debounce"))
+
+        self.action = settings.get("action", "event")
+        if self.action not in ACTIONS:
+            raise ValueError(f"{self.name}.action 不支持: {self.action}")
+        self.frame_type = None
+        self.timestamp_register = None
+        if self.action == "send_frame":
+            self.frame_type = parse_int(settings.get("frame_type"), f"{self.name}.frame_type")
+            if self.frame_type not in WATCH_FRAME_TYPES:
+                raise ValueError(f"{self.name}.frame_type 只能为 0x02 / 0x03: {settings.get('frame_type')}")
+            self.timestamp_register = parse_int(settings.get("timestamp_register"), f"{self.name}.timestamp_register")
+
+        self.settings = dict(settings)
+
+        # 去抖状态
+        self.active = False        # 去抖后的条件状态
+        self.streak = 0            # 连续与 active 不一致的读取次数
+        self.previous = None       # 上次读取的位段值(changed 条件使用)
+        self.field = None          # 最近读取的位段值
+        self.fired = 0
+
+    @property
+    def registers(self) -> Tuple[int, ...]:
+        """该规则需要读取的寄存器"""
+        if self.timestamp_register is None:
+            return (self.register,)
+        return (self.register, self.timestamp_register)
+
+    def extract(self, value: int) -> int:
+        """取出位段"""
+        return (value >> self.low) & self.mask
+
+    def sample(self, value: int) -> bool:
+        """
+        输入一次读取值, 返回是否触发动作
+
+        条件结果连续 debounce 次与当前状态不一致时才切换状态;
+        edge 在切换为真时触发, level 在状态为真的每次读取都触发
+        """
+        field = self.extract(value)
+        if self.condition == "changed":
+            matched = self.previous is not None and field != self.previous
+        else:
+            matched = CONDITIONS[self.condition](field, self.value)
+        self.previous = self.field = field
+
+        rising = False
+        if matched != self.active:
+            self.streak += 1
+            if self.streak >= self.debounce:
+                self.active = matched
+                self.streak = 0
+                rising = matched
+        else:
+            self.streak = 0
+
+        fire = rising if self.trigger == "edge" else self.active
+        if fire:
+            self.fired += 1
+        return fire
+
+    def get_status(self) -> dict:
+        status = dict(self.settings)
+        status.update({
+            "name": self.name,
+            "field": self.field,
+            "active": self.active,
+            "fired": self.fired
+        })
+        return status
+
+class RegisterWatch:
+    """
+    监视规则集
+
+    所有规则用到的寄存器合并为一次批量读取(addresses), 增加规则不增加轮询往返
+    """
+
+    def __init__(self, rules: Iterable[dict]):
+        self.rules: List[WatchRule] = [WatchRule(settings, i) for i, settings in enumerate(rules)]
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"规则名重复: {names}")
+
+        self.addresses: Tuple[int, ...] = tuple(sorted({
+            address for rule in self.rules for address in rule.registers
+        }))
+        if len(self.addresses) > MAX_WATCH_REGISTERS:
+            raise ValueError(f"监视的寄存器共 {len(self.addresses)} 个, 超过一次批量读取的上限 {MAX_WATCH_REGISTERS}")
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "RegisterWatch":
+        """按配置的 watch_rules 创建, 未配置时使用默认规则"""
+        config = CONFIG if config is None else config
+        rules = config.get("watch_rules")
+        return cls(DEFAULT_WATCH_RULES if rules is None else rules)
+
+    def evaluate(self, registers: Dict[int, int]) -> List[WatchRule]:
+        """输入一次批量读取结果, 返回需要执行动作的规则(按规则顺序)"""
+        fired = []
+        for rule in self.rules:
+            value = registers.get(rule.register)
+            if value is not None and rule.sample(value):
+                fired.append(rule)
+        return fired
+
+    def get_status(self) -> dict:
+        return {
+            "addresses": [f"0x{address:02X}" for address in self.addresses],
+            "rules": [rule.get_status() for rule in self.rules]
+        }
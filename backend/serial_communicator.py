@@ -0,0 +1,333 @@
+import time
+import queue
+import serial
+import logging
+import threading
+from typing import Optional
+from frame_parser import get_parse_stats
+from deframer import StreamDeframer
+from frame_processor import ReceivePipeline, default_pipeline
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 串口读超时(秒): 无数据时阻塞等待的最长时间, 也决定停止接收的响应时间
+SERIAL_READ_TIMEOUT = CONFIG.get("serial_read_timeout", 0.1)
+
+# 单次读取的最大字节数
+SERIAL_READ_CHUNK = CONFIG.get("serial_read_chunk", 4096)
+
+# 发送队列长度(帧)
+SERIAL_WRITE_QUEUE = CONFIG.get("serial_write_queue", 4096)
+
+# 合并写入的最大字节数: 排队的帧拼接后一次 write
+SERIAL_WRITE_COALESCE = CONFIG.get("serial_write_coalesce", 4096)
+
+# 线路利用率统计窗口(秒)
+UTILIZATION_WINDOW = 1.0
+
+class SerialWriter:
+    """
+    串口写线程
+
+    - send_* 只把帧放入队列即返回, 帧在写线程中流水发送
+    - 队列中已积压的帧拼接成一次 write, 不再逐帧 flush, 连续发送时线路不留空隙
+    - 按波特率统计线路利用率(每帧 10 位/字节)
+    """
+
+    def __init__(self, ser: serial.Serial, baudrate: int, maxsize: int = SERIAL_WRITE_QUEUE):
+        self.serial = ser
+        self.baudrate = baudrate
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self._pending = 0    # 已入队尚未写出的帧数
+        self._drained = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+
+        self.stats = {"frames": 0, "bytes": 0, "writes": 0, "max_write": 0, "rejected": 0, "errors": 0}
+        self._started_at = 0.0
+        self._window_start = 0.0
+        self._window_bytes = 0
+        self._last_utilization = 0.0
+
+    def start(self):
+        """启动写线程"""
+        if self.running:
+            return
+        self.running = True
+        self._started_at = self._window_start = time.monotonic()
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """等待队列发送完毕后停止写线程"""
+        if not self.running:
+            return
+        self.flush(timeout)
+        self.running = False
+        self._queue.put(None)
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+
+    def put(self, frame) -> bool:
+        """帧入队, 队列满时返回False"""
+        with self._drained:
+            try:
+                self._queue.put_nowait(bytes(frame))
+            except queue.Full:
+                self.stats["rejected"] += 1
+                return False
+            self._pending += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中的帧全部写出"""
+        with self._drained:
+            if not self._drained.wait_for(lambda: self._pending == 0, timeout):
+                return False
+        try:
+            self.serial.flush()
+        except Exception:
+            pass
+        return True
+
+    def _write_loop(self):
+        """写循环: 合并队列中已有的帧后一次写出"""
+        stats = self.stats
+        while self.running:
+            frame = self._queue.get()
+            if frame is None:
+                continue
+
+            batch = [frame]
+            size = len(frame)
+            while size < SERIAL_WRITE_COALESCE:
+                try:
+                    frame = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is None:
+                    break
+                batch.append(frame)
+                size += len(frame)
+
+            data = batch[0] if len(batch) == 1 else b"".join(batch)
+            try:
+                written = self.serial.write(data)
+                stats["frames"] += len(batch)
+                stats["bytes"] += written
+                stats["writes"] += 1
+                if written > stats["max_write"]:
+                    stats["max_write"] = written
+                self._account(written)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"❌ 串口写入失败: {e}")
+
+            with self._drained:
+                self._pending -= len(batch)
+                if self._pending == 0:
+                    self._drained.notify_all()
+
+    def _account(self, nbytes: int):
+        """累计利用率统计窗口"""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= UTILIZATION_WINDOW:
+            self._last_utilization = self._line_time(self._window_bytes) / elapsed
+            self._window_start = now
+            self._window_bytes = 0
+        self._window_bytes += nbytes
+
+    def _line_time(self, nbytes: int) -> float:
+        """nbytes 字节在线路上的传输时间(秒)"""
+        return nbytes * 10 / self.baudrate
+
+    def get_status(self) -> dict:
+        """获取写线程状态"""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        recent = self._last_utilization
+        if elapsed >= UTILIZATION_WINDOW:
+            recent = self._line_time(self._window_bytes) / elapsed
+        uptime = now - self._started_at if self.running else 0.0
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "stats": dict(self.stats),
+            "line_utilization": round(min(recent, 1.0), 4),
+            "avg_line_utilization": round(min(self._line_time(self.stats["bytes"]) / uptime, 1.0), 4) if uptime else 0.0,
+            "avg_frames_per_write": round(self.stats["frames"] / self.stats["writes"], 2) if self.stats["writes"] else 0.0
+        }
+
+class SerialCommunicator:
+    """
+    串口通信类 
+    """
+    
+    def __init__(self, port: str = "COM1", baudrate: int = 115200, pipeline: ReceivePipeline = default_pipeline):
+        """
+        初始化串口通信
+        
+        Args:
+            port: 串口设备名称 (Linux: /dev/ttyUSB0, Windows: COM1)
+            baudrate: 波特率 (默认115200)
+            pipeline: 接收管线(设备的消息总线)
+        """
+        self.pipeline = pipeline
+        self.port = port
+        self.baudrate = baudrate
+        self.serial = None
+        self.writer: Optional[SerialWriter] = None
+        self.receive_thread = None
+        self.running = False
+        self.deframer = StreamDeframer()
+        self.recv_stats = {"wakeups": 0, "bytes": 0, "max_chunk": 0}
+        self._connect()
+    
+    def _connect(self):
+        """连接串口"""
+        try:
+            self.serial = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=SERIAL_READ_TIMEOUT,
+                write_timeout=1.0
+            )
+            self.writer = SerialWriter(self.serial, self.baudrate)
+            self.writer.start()
+            logger.info(f"✅ 串口已连接: {self.port} @ {self.baudrate} baud")
+        except Exception as e:
+            logger.error(f"❌ 串口连接失败: {e}")
+            self.serial = None
+    
+    def start_receiving(self):
+        """启动接收线程"""
+        if self.running:
+            logger.warning("⚠️ 串口接收器已在运行")
+            return False
+        
+        if not self.is_connected():
+            logger.error("❌ 串口未连接，无法启动接收")
+            return False
+        
+        self.pipeline.bus.clear()
+        
+        self.running = True
+        self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.receive_thread.start()
+        logger.info("✅ 串口接收线程已启动")
+        return True
+    
+    def stop(self):
+        """停止串口通信"""
+        if self.running:
+            self.running = False
+            
+            if self.receive_thread and self.receive_thread.is_alive():
+                self.receive_thread.join(timeout=2)
+        
+        if self.writer:
+            self.writer.stop()
+        
+        if self.serial and self.serial.is_open:
+            self.serial.close()
+        
+        self.pipeline.bus.clear()
+        logger.info("⏹️ 串口通信已停止")
+    
+    def is_connected(self) -> bool:
+        """检查串口是否连接"""
+        return self.serial is not None and self.serial.is_open
+    
+    def _receive_loop(self):
+        """
+        串口接收循环
+        
+        阻塞读取(带超时)等待第一个字节, 唤醒后一次取走驱动缓冲区中已到达的数据,
+        空闲时线程挂起不占CPU
+        """
+        ser = self.serial
+        deframer = self.deframer
+        deframer.reset()
+        stats = self.recv_stats
+        
+        while self.running and ser.is_open:
+            try:
+                # 阻塞等待数据(超时返回空)
+                data = ser.read(1)
+                if not data:
+                    continue
+                
+                waiting = ser.in_waiting
+                if waiting:
+                    data += ser.read(min(waiting, SERIAL_READ_CHUNK))
+                
+                stats["wakeups"] += 1
+                stats["bytes"] += len(data)
+                if len(data) > stats["max_chunk"]:
+                    stats["max_chunk"] = len(data)
+                
+                # 流式拆帧(CRC确认后才输出)
+                for frame in deframer.feed(data):
+                    self._handle_frame(frame)
+            
+            except serial.SerialException as e:
+                if self.running:
+                    logger.error(f"❌ 串口接收错误: {e}")
+                break
+            except Exception as e:
+                if self.running:
+                    logger.error(f"❌ 串口接收异常: {e}", exc_info=True)
+    
+    def _handle_frame(self, frame):
+        """处理单帧并按模式发布到消息总线(主题为帧类型)"""
+        self.pipeline.dispatch(frame, ('serial', self.port))
+        logger.debug(f"📥 收到消息类型: 0x{frame.message_type:02X}")
+    
+    # ========== 发送方法==========
+    
+    def _write(self, frame) -> bool:
+        """帧交给写线程流水发送, 返回是否成功入队"""
+        if self.writer is None or not self.is_connected():
+            logger.error("❌ 串口未连接")
+            return False
+        
+        if not self.writer.put(frame):
+            logger.error("❌ 串口发送队列已满")
+            return False
+        return True
+    
+    def send_raw_data(self, data: bytes) -> bool:
+        """发送一帧原始字节数据"""
+        try:
+            return self._write(data)
+        except Exception as e:
+            logger.error(f"❌ 发送原始数据失败: {e}")
+            return False
+    
+    def send_batch(self, frames) -> int:
+        """批量发送多帧(写线程合并写出), 返回成功入队的帧数"""
+        sent = 0
+        for frame in frames:
+            if not self._write(frame):
+                break
+            sent += 1
+        return sent
+    
+    def get_status(self):
+        """获取串口状态"""
+        return {
+            "connected": self.is_connected(),
+            "port": self.port,
+            "baudrate": self.baudrate,
+            "receiving": self.running,
+            "thread_alive": self.receive_thread.is_alive() if self.receive_thread else False,
+            "recv_stats": dict(self.recv_stats),
+            "writer": self.writer.get_status() if self.writer else None,
+            "parse_stats": get_parse_stats(),
+            "deframer": self.deframer.get_stats()
+        }
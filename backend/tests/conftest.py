@@ -0,0 +1,19 @@
+# tests/conftest.py - 测试公共设置: backend 目录加入模块搜索路径, 按需切换系统模式
+#
+# 用法 (在 backend 目录下): python -m pytest tests
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SystemMode, current_mode
+
+@pytest.fixture
+def ground_mode():
+    """地面检测模式(LoRa接收帧发布到消息总线), 测试后恢复"""
+    previous = current_mode["mode"]
+    current_mode["mode"] = SystemMode.GROUND
+    yield
+    current_mode["mode"] = previous
@@ -0,0 +1,128 @@
+# tests/test_serial.py - 串口收发: 经 Linux pty 对校验帧完整送达, 空闲时接收线程不占CPU
+import os
+import time
+import select
+
+import pytest
+
+if not hasattr(os, "openpty"):
+    pytest.skip("需要 pty (Linux/macOS)", allow_module_level=True)
+
+import tty
+
+from frame_schema import LORA_RECEIVE, lora_frame_encoder, build_fpga_frame
+from frame_processor import ReceivePipeline
+from message_bus import MessageBus
+from serial_communicator import SerialCommunicator
+
+BAUDRATE = 921600
+
+@pytest.fixture
+def pty_pair():
+    """pty对: 主端模拟线路另一端, 从端设备名交给 SerialCommunicator"""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+@pytest.fixture
+def serial_device(pty_pair):
+    """连接从端的 SerialCommunicator(独立消息总线), 返回 (主端fd, 通信对象, 消息总线)"""
+    master, name = pty_pair
+    bus = MessageBus()
+    comm = SerialCommunicator(port=name, baudrate=BAUDRATE, pipeline=ReceivePipeline(bus, name="test-serial"))
+    assert comm.is_connected()
+    yield master, comm, bus
+    comm.stop()
+
+def read_exactly(fd: int, size: int, timeout: float = 5.0) -> bytes:
+    """从主端读出 size 字节, 超时返回已读到的部分"""
+    data = bytearray()
+    deadline = time.monotonic() + timeout
+    while len(data) < size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            break
+        data += os.read(fd, size - len(data))
+    return bytes(data)
+
+def wait_for(subscription, count: int, timeout: float = 5.0) -> list:
+    messages = []
+    deadline = time.monotonic() + timeout
+    while len(messages) < count and time.monotonic() < deadline:
+        messages.extend(subscription.drain())
+        time.sleep(0.01)
+    return messages
+
+def test_receive_frames_intact(serial_device, ground_mode):
+    master, comm, bus = serial_device
+    subscription = bus.subscribe(topics=(0x07,), name="test", maxlen=10000)
+    assert comm.start_receiving()
+
+    frames = [
+        bytes(LORA_RECEIVE.encode(1000 + i, 1040 + i, i & 0xFF, payload=bytes((i + j) & 0xFF for j in range(i % 200 + 1))))
+        for i in range(500)
+    ]
+    stream = b"".join(frames)
+    # 按不规则的块写入, 帧跨越多次读取
+    offset = 0
+    for size in (1, 7, 64, 333, 4096) * 1000:
+        if offset >= len(stream):
+            break
+        os.write(master, stream[offset:offset + size])
+        offset += size
+
+    messages = wait_for(subscription, len(frames))
+    subscription.close()
+
+    assert len(messages) == len(frames)
+    for i, msg in enumerate(messages):
+        info = msg["lora_receive_info"]
+        assert info["frame_count"] == i & 0xFF
+        assert info["receive_timestamp"] == 1000 + i
+        assert bytes(info["data"]) == bytes((i + j) & 0xFF for j in range(i % 200 + 1))
+
+def test_receive_skips_corrupted_frame(serial_device, ground_mode):
+    master, comm, bus = serial_device
+    subscription = bus.subscribe(topics=(0x07,), name="test", maxlen=100)
+    assert comm.start_receiving()
+
+    good = [bytes(LORA_RECEIVE.encode(0, 10, i, payload=bytes([i]) * 16)) for i in range(3)]
+    corrupted = bytearray(good[1])
+    corrupted[-3] ^= 0xFF
+    os.write(master, good[0] + bytes(corrupted) + good[2])
+
+    messages = wait_for(subscription, 2)
+    time.sleep(0.1)
+    messages.extend(subscription.drain())
+    subscription.close()
+    assert [msg["lora_receive_info"]["frame_count"] for msg in messages] == [0, 2]
+
+def test_idle_receive_cpu_is_low(serial_device):
+    master, comm, bus = serial_device
+    assert comm.start_receiving()
+    time.sleep(0.2)
+
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    time.sleep(1.0)
+    cpu = (time.process_time() - start_cpu) / (time.perf_counter() - start)
+
+    # 阻塞读取(带超时)时接收线程挂起, 整个进程空闲CPU应远低于一个核的5%
+    assert cpu < 0.05, f"空闲CPU占用 {cpu * 100:.1f}%"
+    assert comm.recv_stats["wakeups"] == 0
+
+def test_write_frames_intact(serial_device):
+    master, comm, bus = serial_device
+    frames = [bytes(lora_frame_encoder.encode(0, 0, i & 0xFF, "0123456789ABCDEF" * 2)) for i in range(300)]
+    frames += [bytes(build_fpga_frame(1, batch_operations=[(0x25 + i % 4, i)] * 4)) for i in range(300)]
+
+    for frame in frames[:300]:
+        assert comm.send_raw_data(frame)
+    assert comm.send_batch(frames[300:]) == 300
+
+    expected = b"".join(frames)
+    assert read_exactly(master, len(expected)) == expected
+    assert comm.writer.flush(timeout=5)
@@ -0,0 +1,43 @@
+# tests/test_transmit_queue.py - 发送队列: 停止后立即重新启动时只有一个写线程
+import threading
+
+from transmit_queue import TransmitQueue
+
+def writer_threads(name: str) -> list:
+    return [thread for thread in threading.enumerate() if thread.name == f"tx-{name}"]
+
+def test_restart_while_draining_keeps_one_writer():
+    tx = TransmitQueue("restart")
+    release = threading.Event()
+    writers = []
+
+    def send(index):
+        writers.append((index, threading.current_thread()))
+        release.wait(5)
+        return index
+
+    futures = [tx.submit_nowait(send, i) for i in range(3)]
+    # 写线程阻塞在第一个任务上, stop 等待超时返回, 随后立即重新启动并继续提交
+    tx.stop(timeout=0.05)
+    tx.start()
+    futures += [tx.submit_nowait(send, i) for i in range(3, 6)]
+    assert len(writer_threads("restart")) == 1
+
+    release.set()
+    assert [future.result(timeout=5) for future in futures] == list(range(6))
+    assert [index for index, _ in writers] == list(range(6))
+    assert len({thread for _, thread in writers}) == 1
+
+    tx.stop()
+    assert writer_threads("restart") == []
+
+def test_start_after_clean_stop_creates_new_writer():
+    tx = TransmitQueue("clean")
+    assert tx.submit_nowait(lambda: 1).result(timeout=5) == 1
+    tx.stop()
+    assert writer_threads("clean") == []
+
+    assert tx.submit_nowait(lambda: 2).result(timeout=5) == 2
+    assert len(writer_threads("clean")) == 1
+    tx.stop()
+    assert writer_threads("clean") == []
@@ -0,0 +1,134 @@
+# tests/test_udp_routing.py - 多设备共用UDP接收端口: 按数据报源地址分发到各设备的消息总线
+import time
+import socket
+import asyncio
+
+import pytest
+
+from frame_schema import LORA_RECEIVE
+from device_registry import DeviceRegistry
+
+RECEIVER_MODES = ("thread", "asyncio")
+
+def arm_socket(ip: str) -> socket.socket:
+    """模拟ARM: 绑定在 ip 的临时端口, 设备配置使用该地址"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((ip, 0))
+    return sock
+
+def lora_frame(tag: int) -> bytes:
+    return bytes(LORA_RECEIVE.encode(0, 1, tag, payload=bytes([tag]) * 8))
+
+async def route(mode: str, devices: list, senders: list) -> tuple:
+    """
+    按 devices 配置启动共用接收端口的UDP设备, 依次从 senders 的 (socket, tag) 发送一帧
+
+    Returns:
+        ({设备ID: 收到的 frame_count 列表}, 未匹配帧数)
+    """
+    registry = DeviceRegistry.from_config({
+        "devices": [
+            dict({"transport": "udp", "local_ip": "127.0.0.1", "udp_receive_port": 0, "udp_receiver_mode": mode}, **device)
+            for device in devices
+        ]
+    })
+    assert await registry.start()
+    subscriptions = {device.device_id: device.bus.subscribe(topics=(0x07,)) for device in registry}
+    multiplexer = registry.get_status()["udp_multiplexers"][0]
+    local_ip, local_port = multiplexer["local"].split(":")
+
+    try:
+        for sock, tag in senders:
+            sock.sendto(lora_frame(tag), (local_ip, int(local_port)))
+
+        # 等待全部帧被接收(分发或计入未匹配)
+        deadline = time.monotonic() + 2.0
+        received = {device_id: [] for device_id in subscriptions}
+        unrouted = 0
+        while time.monotonic() < deadline:
+            for device_id, subscription in subscriptions.items():
+                received[device_id].extend(msg["lora_receive_info"]["frame_count"] for msg in subscription.drain())
+            unrouted = registry.get_status()["udp_multiplexers"][0]["unrouted"]
+            if sum(map(len, received.values())) + unrouted >= len(senders):
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        for device_id, subscription in subscriptions.items():
+            received[device_id].extend(msg["lora_receive_info"]["frame_count"] for msg in subscription.drain())
+        return received, registry.get_status()["udp_multiplexers"][0]["unrouted"]
+    finally:
+        for subscription in subscriptions.values():
+            subscription.close()
+        registry.stop()
+
+@pytest.fixture
+def sockets():
+    opened = []
+
+    def make(ip: str) -> socket.socket:
+        sock = arm_socket(ip)
+        opened.append(sock)
+        return sock
+
+    yield make
+    for sock in opened:
+        sock.close()
+
+@pytest.mark.parametrize("mode", RECEIVER_MODES)
+def test_each_source_reaches_its_device(mode, sockets, ground_mode):
+    arm1, arm2a, arm2b = sockets("127.0.0.2"), sockets("127.0.0.3"), sockets("127.0.0.3")
+    arm3 = sockets("127.0.0.4")
+    devices = [
+        {"id": "arm1", "arm_ip": "127.0.0.2", "arm_port": arm1.getsockname()[1]},
+        # 同一IP的两个设备: 只能按 (ip, port) 精确匹配
+        {"id": "arm2a", "arm_ip": "127.0.0.3", "arm_port": arm2a.getsockname()[1]},
+        {"id": "arm2b", "arm_ip": "127.0.0.3", "arm_port": arm2b.getsockname()[1]},
+        # 应答端口与配置的目标端口不同: 该IP只对应一个设备, 按IP匹配
+        {"id": "arm3", "arm_ip": "127.0.0.4", "arm_port": 1}
+    ]
+    senders = [(arm1, 1), (arm2a, 2), (arm2b, 3), (arm3, 4), (arm1, 5), (arm2b, 6)]
+
+    received, unrouted = asyncio.run(route(mode, devices, senders))
+
+    assert received == {"arm1": [1, 5], "arm2a": [2], "arm2b": [3, 6], "arm3": [4]}
+    assert unrouted == 0
+
+@pytest.mark.parametrize("mode", RECEIVER_MODES)
+def test_unknown_source_goes_to_single_device(mode, sockets, ground_mode):
+    arm, stranger = sockets("127.0.0.2"), sockets("127.0.0.9")
+    devices = [{"id": "only", "arm_ip": "127.0.0.2", "arm_port": arm.getsockname()[1]}]
+
+    received, unrouted = asyncio.run(route(mode, devices, [(stranger, 7), (arm, 8)]))
+
+    assert received == {"only": [7, 8]}
+    assert unrouted == 0
+
+@pytest.mark.parametrize("mode", RECEIVER_MODES)
+def test_unknown_source_goes_to_catch_all_device(mode, sockets, ground_mode):
+    arm1, arm2, stranger = sockets("127.0.0.2"), sockets("127.0.0.3"), sockets("127.0.0.9")
+    same_ip_other_port = sockets("127.0.0.3")
+    devices = [
+        {"id": "arm1", "arm_ip": "127.0.0.2", "arm_port": arm1.getsockname()[1]},
+        {"id": "arm2", "arm_ip": "127.0.0.3", "arm_port": arm2.getsockname()[1], "udp_catch_all": True},
+        {"id": "arm2b", "arm_ip": "127.0.0.3", "arm_port": 1}
+    ]
+    senders = [(stranger, 1), (arm1, 2), (same_ip_other_port, 3), (arm2, 4)]
+
+    received, unrouted = asyncio.run(route(mode, devices, senders))
+
+    # 未知IP、以及对应多个设备的IP上的未知端口都交给 udp_catch_all 设备
+    assert received == {"arm1": [2], "arm2": [1, 3, 4], "arm2b": []}
+    assert unrouted == 0
+
+@pytest.mark.parametrize("mode", RECEIVER_MODES)
+def test_unknown_source_without_catch_all_is_counted(mode, sockets, ground_mode):
+    arm1, arm2, stranger = sockets("127.0.0.2"), sockets("127.0.0.3"), sockets("127.0.0.9")
+    devices = [
+        {"id": "arm1", "arm_ip": "127.0.0.2", "arm_port": arm1.getsockname()[1]},
+        {"id": "arm2", "arm_ip": "127.0.0.3", "arm_port": arm2.getsockname()[1]}
+    ]
+
+    received, unrouted = asyncio.run(route(mode, devices, [(stranger, 1), (arm2, 2)]))
+
+    assert received == {"arm1": [], "arm2": [2]}
+    assert unrouted == 1
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# transmit_queue.py - 异步发送队列(每个传输通道一个写线程)
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 发送队列长度
+TRANSMIT_QUEUE_SIZE = CONFIG.get("transmit_queue_size", 1024)
+
+class TransmitQueueFull(Exception):
+    """发送队列已满"""
+
+class TransmitQueue:
+    """
+    异步发送队列
+
+    - API处理函数提交发送任务后 await 完成, 阻塞的 sendto / serial.write 不在事件循环中执行
+    - 每个传输通道一个写线程, 按提交顺序串行执行, 发送器内部无需再跨线程争锁
+    - 队列满时立即拒绝, 不让请求无限堆积
+    """
+
+    def __init__(self, name: str, maxsize: int = TRANSMIT_QUEUE_SIZE):
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "max_depth": 0,
+            "max_wait_ms": 0.0,    # 排队等待的最长时间
+            "total_wait_ms": 0.0
+        }
+
+    def start(self):
+        """
+        启动写线程
+
+        上次 stop 等待超时、旧写线程仍在执行积压任务时继续使用该线程, 不再新建(保证同一时刻只有一个写线程);
+        写线程退出与否的判断和这里一样在锁内进行
+        """
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._writer_loop, name=f"tx-{self.name}", daemon=True)
+                self.thread.start()
+        logger.info(f"✅ 发送队列已启动: {self.name}")
+
+    def stop(self, timeout: float = 2.0):
+        """停止写线程(已入队的任务会先执行完)"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            thread = self.thread
+        self._queue.put(None)
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logger.warning(f"⚠️ 发送队列写线程未在 {timeout}s 内退出, 积压任务继续执行: {self.name}")
+        logger.info(f"⏹️ 发送队列已停止: {self.name}")
+
+    def _enqueue(self, item):
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["rejected"] += 1
+            raise TransmitQueueFull(f"发送队列已满: {self.name}")
+
+        self.stats["submitted"] += 1
+        depth = self._queue.qsize()
+        if depth > self.stats["max_depth"]:
+            self.stats["max_depth"] = depth
+
+    async def submit(self, func: Callable, *args, **kwargs):
+        """提交发送任务并等待完成, 返回发送函数的返回值"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._enqueue((func, args, kwargs, loop, future, time.perf_counter()))
+        return await future
+
+    def submit_nowait(self, func: Callable, *args, **kwargs) -> Future:
+        """从普通线程提交发送任务, 返回 concurrent.futures.Future"""
+        future = Future()
+        self._enqueue((func, args, kwargs, None, future, time.perf_counter()))
+        return future
+
+    def _writer_loop(self):
+        """写线程: 按顺序执行发送任务"""
+        stats = self.stats
+        while True:
+            item = self._queue.get()
+            if item is None:
+                # 停止后又重新启动时忽略这次停止
+                with self._lock:
+                    if not self.running:
+                        self.thread = None
+                        break
+                continue
+
+            func, args, kwargs, loop, future, queued_at = item
+            wait_ms = (time.perf_counter() - queued_at) * 1000
+            stats["total_wait_ms"] += wait_ms
+            if wait_ms > stats["max_wait_ms"]:
+                stats["max_wait_ms"] = wait_ms
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"❌ 发送任务异常({self.name}): {e}")
+                self._resolve(loop, future, None, e)
+                continue
+
+            stats["completed"] += 1
+            self._resolve(loop, future, result, None)
+
+    @staticmethod
+    def _resolve(loop, future, result, error):
+        """在提交方所在的线程/事件循环中设置结果"""
+        if loop is None:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            return
+
+        def _set():
+            if future.done():  # 等待方已取消
+                return
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+        try:
+            loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    def get_status(self) -> dict:
+        """获取发送队列状态"""
+        stats = dict(self.stats)
+        done = stats["completed"] + stats["failed"]
+        stats["avg_wait_ms"] = round(stats.pop("total_wait_ms") / done, 3) if done else 0.0
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 3)
+        return {
+            "name": self.name,
+            "running": self.running,
+            "depth": self._queue.qsize(),
+            "stats": stats
+        }
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# transport.py - 传输层: UDP / 串口 / 内存回环, 由 config.json 的 transport 选择
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import CONFIG
+from deframer import StreamDeframer
+from frame_parser import get_parse_stats
+from frame_processor import ReceivePipeline, default_pipeline
+
+logger = logging.getLogger(__name__)
+
+class Transport(ABC):
+    """
+    传输层接口
+
+    - 收: 传输层自行拆帧, 每个完整帧交给设备的接收管线处理并发布到该设备的消息总线
+    - 发: send/send_batch 发送已构建好的完整帧, 帧的构建由 FrameSender 负责
+
+    start / stop / send / get_status 为抽象方法, 未全部实现的传输层在构造时即报错
+    """
+
+    kind = ""
+
+    # 是否在事件循环内发布消息(订阅者可直接用事件唤醒)
+    async_delivery = False
+
+    @abstractmethod
+    async def start(self) -> bool:
+        """启动收发(在事件循环中调用)"""
+
+    @abstractmethod
+    def stop(self):
+        """停止收发"""
+
+    @abstractmethod
+    def send(self, data: bytes, target: Optional[Tuple[str, int]] = None) -> bool:
+        """
+        发送一帧
+
+        Args:
+            data: 完整帧
+            target: 目标地址(仅UDP有效), None 表示设备的默认地址
+        """
+
+    def send_batch(self, frames: Iterable[bytes]) -> int:
+        """批量发送多帧, 返回成功发送的帧数"""
+        sent = 0
+        for frame in frames:
+            if not self.send(frame):
+                break
+            sent += 1
+        return sent
+
+    @abstractmethod
+    def get_status(self) -> dict:
+        """获取传输层状态"""
+
+class UDPMultiplexer:
+    """
+    UDP接收复用: 多个设备共用一个接收socket(同一本地端口)和一个接收线程/数据报端点
+
+    按数据报源地址把帧分发到对应设备的接收管线:
+    先按 (ip, port) 精确匹配, 再按 ip 匹配(该ip只对应一个设备时), 都不匹配时交给兜底设备:
+    只有一个设备时即该设备(与单设备时处理端口上全部数据报一致), 多个设备时为设置了 udp_catch_all 的设备;
+    没有兜底设备时计入 unrouted
+    """
+
+    def __init__(self, local_ip: str, local_port: int, receiver_mode: str = "thread"):
+        from udp_receiver import create_receiver
+
+        self.local_ip = local_ip
+        self.local_port = local_port
+        self.receiver_mode = receiver_mode
+        self.receiver = create_receiver(receiver_mode, handler=self._route)
+        self.async_delivery = getattr(self.receiver, "async_delivery", False)
+
+        # 路由表: 写时复制, 接收线程读取无需加锁
+        self._pipelines: Dict[Tuple[str, int], ReceivePipeline] = {}
+        self._by_host: Dict[str, ReceivePipeline] = {}
+        self._catch_all_targets: List[Tuple[str, int]] = []
+        self._fallback: Optional[ReceivePipeline] = None
+        self._lock = threading.Lock()
+        self.unrouted = 0
+
+    def attach(self, target: Tuple[str, int], pipeline: ReceivePipeline, catch_all: bool = False):
+        """注册设备地址对应的接收管线, catch_all 为True时该设备接收无匹配的数据报"""
+        with self._lock:
+            pipelines = dict(self._pipelines)
+            pipelines[target] = pipeline
+            if catch_all and target not in self._catch_all_targets:
+                self._catch_all_targets.append(target)
+            self._rebuild(pipelines)
+
+    def detach(self, target: Tuple[str, int]):
+        """注销设备地址"""
+        with self._lock:
+            pipelines = dict(self._pipelines)
+            pipelines.pop(target, None)
+            if target in self._catch_all_targets:
+                self._catch_all_targets.remove(target)
+            self._rebuild(pipelines)
+
+    def _rebuild(self, pipelines: Dict[Tuple[str, int], ReceivePipeline]):
+        hosts: Dict[str, List[ReceivePipeline]] = {}
+        for (ip, _), pipeline in pipelines.items():
+            hosts.setdefault(ip, []).append(pipeline)
+
+        self._pipelines = pipelines
+        self._by_host = {ip: items[0] for ip, items in hosts.items() if len(items) == 1}
+
+        # 兜底: 唯一的设备, 或第一个设置了 udp_catch_all 的设备
+        distinct = {id(pipeline): pipeline for pipeline in pipelines.values()}
+        if len(distinct) == 1:
+            self._fallback = next(iter(distinct.values()))
+        elif self._catch_all_targets:
+            self._fallback = pipelines[self._catch_all_targets[0]]
+        else:
+            self._fallback = None
+
+    def _route(self, frame, addr: tuple):
+        """接收线程/事件循环中调用: 按源地址分发"""
+        pipeline = self._pipelines.get(addr) or self._by_host.get(addr[0]) or self._fallback
+        if pipeline is None:
+            self.unrouted += 1
+            return None
+        return pipeline.dispatch(frame, addr)
+
+    @property
+    def running(self) -> bool:
+        return self.receiver.running
+
+    async def start(self) -> bool:
+        """启动接收(已运行时直接返回)"""
+        if self.receiver.running:
+            return True
+        # asyncio模式在当前事件循环中创建数据报端点
+        if self.receiver_mode == "asyncio":
+            return await self.receiver.start(self.local_ip, self.local_port)
+        return self.receiver.start(self.local_ip, self.local_port)
+
+    def stop(self):
+        """没有设备使用时停止接收"""
+        if not self._pipelines:
+            self.receiver.stop()
+
+    def get_status(self) -> dict:
+        sock = self.receiver.get_socket()
+        local_ip, local_port = sock.getsockname() if sock is not None else (self.local_ip, self.local_port)
+        return {
+            "local": f"{local_ip}:{local_port}",
+            "devices": len(self._pipelines),
+            "unrouted": self.unrouted,
+            "receiver": self.receiver.get_status()
+        }
+
+class UDPTransport(Transport):
+    """UDP传输: 共用接收器(按源地址分发) + 复用接收socket的发送器"""
+
+    kind = "udp"
+
+    def __init__(
+        self,
+        multiplexer: UDPMultiplexer,
+        target_ip: str,
+        target_port: int,
+        pipeline: ReceivePipeline = default_pipeline,
+        catch_all: bool = False
+    ):
+        from udp_sender import UDPSender
+
+        self.multiplexer = multiplexer
+        self.target = (target_ip, target_port)
+        self.pipeline = pipeline
+        self.catch_all = catch_all   # 接收无匹配设备的数据报
+        self.receiver = multiplexer.receiver
+        self.sender = UDPSender(self.receiver, multiplexer.local_port)
+        self.async_delivery = multiplexer.async_delivery
+
+    async def start(self) -> bool:
+        self.pipeline.bus.clear()
+        self.multiplexer.attach(self.target, self.pipeline, self.catch_all)
+        return await self.multiplexer.start()
+
+    def stop(self):
+        self.multiplexer.detach(self.target)
+        self.multiplexer.stop()
+        self.sender.close()
+        self.pipeline.bus.clear()
+
+    def send(self, data: bytes, target: Optional[Tuple[str, int]] = None) -> bool:
+        target_ip, target_port = target or self.target
+        return self.sender.send_raw_data(data, target_ip, target_port)
+
+    def send_batch(self, frames: Iterable[bytes]) -> int:
+        return self.sender.send_batch(frames, *self.target)
+
+    def get_status(self) -> dict:
+        return {
+            "kind": self.kind,
+            "target": f"{self.target[0]}:{self.target[1]}",
+            "receiver": self.multiplexer.get_status(),
+            "sender": self.sender.get_status()
+        }
+
+class SerialTransport(Transport):
+    """串口传输: 阻塞读接收线程 + 合并写入的写线程"""
+
+    kind = "serial"
+
+    def __init__(self, port: str, baudrate: int, pipeline: ReceivePipeline = default_pipeline):
+        self.port = port
+        self.baudrate = baudrate
+        self.pipeline = pipeline
+        self.comm = None
+
+    async def start(self) -> bool:
+        from serial_communicator import SerialCommunicator
+
+        if self.comm is None or not self.comm.is_connected():
+            self.comm = SerialCommunicator(port=self.port, baudrate=self.baudrate, pipeline=self.pipeline)
+        if not self.comm.is_connected():
+            return False
+        return self.comm.start_receiving()
+
+    def stop(self):
+        if self.comm:
+            self.comm.stop()
+
+    def send(self, data: bytes, target: Optional[Tuple[str, int]] = None) -> bool:
+        if self.comm is None:
+            logger.error("❌ 串口未连接")
+            return False
+        return self.comm.send_raw_data(data)
+
+    def send_batch(self, frames: Iterable[bytes]) -> int:
+        return self.comm.send_batch(frames) if self.comm else 0
+
+    def get_status(self) -> dict:
+        status = self.comm.get_status() if self.comm else {"connected": False, "port": self.port, "baudrate": self.baudrate}
+        status["kind"] = self.kind
+        return status
+
+class LoopbackTransport(Transport):
+    """
+    内存回环传输 (测试与基准测试用, 无需硬件)
+
+    - 发送的帧记录在 sent 中; 设置了 responder 时, 其返回的字节作为设备应答注入接收路径
+    - inject() 把任意字节作为一个数据报送入接收路径(拆帧 → 处理 → 消息总线)
+    """
+
+    kind = "loopback"
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[bytes], Optional[bytes]]] = None,
+        history: int = 4096,
+        pipeline: ReceivePipeline = default_pipeline
+    ):
+        self.responder = responder
+        self.pipeline = pipeline
+        self.sent = deque(maxlen=history)
+        self.deframer = StreamDeframer()
+        self.running = False
+        self.stats = {"sent_frames": 0, "sent_bytes": 0, "injected_bytes": 0, "received_frames": 0}
+
+    async def start(self) -> bool:
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def send(self, data: bytes, target: Optional[Tuple[str, int]] = None) -> bool:
+        data = bytes(data)
+        self.sent.append(data)
+        self.stats["sent_frames"] += 1
+        self.stats["sent_bytes"] += len(data)
+
+        if self.responder is not None:
+            reply = self.responder(data)
+            if reply:
+                self.inject(reply)
+        return True
+
+    def inject(self, data: bytes) -> int:
+        """注入接收数据, 返回解析出的帧数"""
+        self.stats["injected_bytes"] += len(data)
+        frames = self.deframer.feed_datagram(bytes(data))
+        for frame in frames:
+            self.pipeline.dispatch(frame, ("loopback", 0))
+        self.stats["received_frames"] += len(frames)
+        return len(frames)
+
+    def get_status(self) -> dict:
+        return {
+            "kind": self.kind,
+            "running": self.running,
+            "stats": dict(self.stats),
+            "parse_stats": get_parse_stats(),
+            "deframer": self.deframer.get_stats()
+        }
+
+def create_transport(
+    settings: Optional[dict] = None,
+    pipeline: ReceivePipeline = default_pipeline,
+    multiplexers: Optional[Dict[Tuple[str, int], UDPMultiplexer]] = None
+) -> Transport:
+    """
+    按配置创建传输层: udp / serial / loopback
+
+    Args:
+        settings: 设备配置, 缺省项取全局配置
+        pipeline: 设备的接收管线
+        multiplexers: 按本地地址共用的UDP接收复用器, 同一本地端口的设备共用一个
+    """
+    settings = {**CONFIG, **(settings or {})}
+    kind = settings.get("transport", "udp")
+
+    if kind == "udp":
+        local = (settings["local_ip"], settings["udp_receive_port"])
+        multiplexer = multiplexers.get(local) if multiplexers is not None else None
+        if multiplexer is None:
+            multiplexer = UDPMultiplexer(*local, settings.get("udp_receiver_mode", "thread"))
+            if multiplexers is not None:
+                multiplexers[local] = multiplexer
+        return UDPTransport(
+            multiplexer, settings["arm_ip"], settings["arm_port"], pipeline,
+            catch_all=bool(settings.get("udp_catch_all", False))
+        )
+    if kind == "serial":
+        return SerialTransport(settings["serial_port"], settings["serial_baudrate"], pipeline)
+    if kind == "loopback":
+        return LoopbackTransport(pipeline=pipeline)
+
+    raise ValueError(f"未知的传输方式: {kind}")
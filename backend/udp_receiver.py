@@ -1,45 +1,97 @@
 #!/usr/bin/env python3
 # udp_receiver.py - UDP接收器类
+import os
 import socket
+import select
+import asyncio
 import threading
 import logging
 from datetime import datetime
-from collections import deque
+from typing import Callable, Optional
 
-from frame_parser import parse_message
-from frame_processor import process_frame_by_type
-from config import SystemMode, current_mode
+from frame_parser import get_parse_stats
+from deframer import StreamDeframer
+from frame_parser import Frame
+from frame_processor import dispatch_frame
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
-# 消息队列
-message_queue = deque(maxlen=4096)
+# 单个数据报最大长度 (UDP上限, 可容纳多个连续帧)
+RECV_BUFFER_SIZE = 65536
 
-queue_lock = threading.Lock()
+# 内核接收缓冲区大小 (SO_RCVBUF, 0表示使用系统默认)
+SOCKET_RCVBUF = CONFIG.get("udp_rcvbuf", 4 * 1024 * 1024)
+
+# 每次唤醒最多连续读取的数据报数
+RECV_BATCH_SIZE = CONFIG.get("udp_recv_batch", 64)
+
+# 帧处理函数: handler(frame, addr), 缺省经由默认管线发布到全局消息总线
+FrameHandler = Callable[[Frame, tuple], object]
+
+def create_udp_socket(local_ip: str, port: int, rcvbuf: int = SOCKET_RCVBUF) -> socket.socket:
+    """创建并绑定UDP接收socket"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        sock.bind((local_ip, port))
+    except Exception:
+        sock.close()
+        raise
+    
+    effective = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if rcvbuf and effective < rcvbuf:
+        logger.warning(f"⚠️ SO_RCVBUF 受系统上限限制: 请求{rcvbuf}字节, 实际{effective}字节")
+    return sock
+
+def read_kernel_socket_stats(sock: socket.socket) -> Optional[dict]:
+    """
+    从 /proc/net/udp 读取socket的内核统计 (仅Linux)
+    
+    Returns:
+        {"rx_queue": 接收队列字节数, "drops": 内核丢弃的数据报数}, 不可用时返回None
+    """
+    try:
+        inode = os.fstat(sock.fileno()).st_ino
+        with open('/proc/net/udp', 'r') as f:
+            next(f)  # 表头
+            for line in f:
+                fields = line.split()
+                # sl local rem st tx:rx tr:tm retrnsmt uid timeout inode ref pointer drops
+                if len(fields) >= 13 and int(fields[9]) == inode:
+                    return {
+                        "rx_queue": int(fields[4].split(':')[1], 16),
+                        "drops": int(fields[12])
+                    }
+    except (OSError, ValueError, StopIteration):
+        pass
+    return None
 
 class UDPReceiver:
     """UDP接收器类"""
     
-    def __init__(self):
+    def __init__(self, batch_size: int = RECV_BATCH_SIZE, handler: FrameHandler = dispatch_frame):
+        self.handler = handler
         self.socket = None
         self.thread = None
         self.running = False
         self.current_port = None
+        self.deframer = StreamDeframer()
+        self.batch_size = batch_size
+        self.recv_stats = {"wakeups": 0, "datagrams": 0, "max_batch": 0}
         
     def start(self, local_ip: str, port: int):
         """启动UDP接收"""
         # 如果已经在运行，先停止
         if self.running:
             self.stop()
-
-        message_queue.clear()
             
         try:
-            # 创建UDP socket
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((local_ip, port))
-            self.socket.settimeout(1.0)  # 1秒超时
+            # 创建UDP socket (非阻塞, 由select等待)
+            self.socket = create_udp_socket(local_ip, port)
+            self.socket.setblocking(False)
             
             self.running = True
             self.current_port = port
@@ -71,41 +123,56 @@ class UDPReceiver:
             if self.thread and self.thread.is_alive():
                 self.thread.join(timeout=2)
             
-            message_queue.clear()
             logger.info(f"UDP接收器已停止 (端口: {self.current_port})")
             self.current_port = None
     
+    def get_socket(self) -> Optional[socket.socket]:
+        """获取接收socket(供发送器复用同一本地端口), 未运行时返回None"""
+        return self.socket if self.running else None
+    
     def _receive_loop(self):
-        """UDP接收循环"""
+        """
+        UDP接收循环
+        
+        select等待可读(1秒超时), 每次唤醒连续读取直到内核队列为空或达到 batch_size
+        """
+        sock = self.socket
+        handler = self.handler
+        buffer = bytearray(RECV_BUFFER_SIZE)
+        view = memoryview(buffer)
+        stats = self.recv_stats
+        
         while self.running and self.socket:
             try:
-                data, addr = self.socket.recvfrom(1024)
-                
-                # 解析消息
-                parsed_msg = parse_message(data)
-                
-                if parsed_msg is None:
-                    logger.error(f"消息解析失败")
+                readable, _, _ = select.select([sock], [], [], 1.0)
+                if not readable:
                     continue
                 
-                # 处理消息
-                msg_type = parsed_msg.get("message_type", 0)
+                # 先取完一批再处理, 缩短内核队列占用时间
+                batch = []
+                for _ in range(self.batch_size):
+                    try:
+                        nbytes, addr = sock.recvfrom_into(buffer)
+                    except BlockingIOError:
+                        break
+                    batch.append((bytes(view[:nbytes]), addr))
                 
-                result = process_frame_by_type(parsed_msg, addr)
-
-                with queue_lock:
-                    # 🔧 根据模式决定是否加入队列
-                    if current_mode["mode"] == SystemMode.GROUND:
-                        # 地面检测模式：只添加LoRa接收消息
-                        if msg_type == 0x07:
-                            message_queue.append(result)
-                    else:
-                        # 虚实融合模式：添加广播消息
-                        if msg_type in  [0x00, 0x01, 0x05]:
-                            message_queue.append(result)
+                stats["wakeups"] += 1
+                stats["datagrams"] += len(batch)
+                if len(batch) > stats["max_batch"]:
+                    stats["max_batch"] = len(batch)
+                
+                for data, addr in batch:
+                    # 拆帧(一个数据报可包含多个连续帧, 零拷贝)
+                    frames = self.deframer.feed_datagram(data)
+                    
+                    if not frames:
+                        logger.error("消息解析失败")
+                        continue
+                    
+                    for frame in frames:
+                        handler(frame, addr)
  
-            except socket.timeout:
-                continue
             except Exception as e:
                 if self.running:
                     logger.error(f"UDP接收错误: {e}")
@@ -114,16 +181,130 @@ class UDPReceiver:
     def get_status(self):
         """获取接收器状态"""
         return {
+            "mode": "thread",
             "running": self.running,
             "port": self.current_port,
-            "thread_alive": self.thread.is_alive() if self.thread else False
+            "rcvbuf": self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) if self.socket else None,
+            "kernel": read_kernel_socket_stats(self.socket) if self.socket else None,
+            "recv_stats": dict(self.recv_stats),
+            "thread_alive": self.thread.is_alive() if self.thread else False,
+            "parse_stats": get_parse_stats(),
+            "deframer": self.deframer.get_stats()
         }
 
-# 导出消息队列供其他模块使用
-def get_message_queue():
-    """获取消息队列"""
-    return message_queue
+class UDPReceiverProtocol(asyncio.DatagramProtocol):
+    """asyncio数据报协议，数据报到达时在事件循环中直接处理"""
+    
+    def __init__(self, receiver: "AsyncUDPReceiver"):
+        self.receiver = receiver
+    
+    def datagram_received(self, data: bytes, addr: tuple):
+        self.receiver._on_datagram(data, addr)
+    
+    def error_received(self, exc: Exception):
+        logger.error(f"UDP接收错误: {exc}")
+
+class AsyncUDPReceiver:
+    """
+    asyncio UDP接收器
+    
+    运行在FastAPI(uvicorn)事件循环中，处理结果在事件循环内发布到消息总线，
+    订阅者的通知回调可直接唤醒协程，没有接收线程和轮询延迟
+    """
+    
+    # 在事件循环内发布(订阅者可直接用事件唤醒)
+    async_delivery = True
+    
+    def __init__(self, handler: FrameHandler = dispatch_frame):
+        self.handler = handler
+        self.transport = None
+        self.socket = None
+        self.running = False
+        self.current_port = None
+        self.deframer = StreamDeframer()
+    
+    async def start(self, local_ip: str, port: int):
+        """启动UDP接收(需在事件循环中调用)"""
+        if self.running:
+            self.stop()
+        
+        sock = None
+        try:
+            sock = create_udp_socket(local_ip, port)
+            sock.setblocking(False)
+            
+            loop = asyncio.get_running_loop()
+            self.transport, _ = await loop.create_datagram_endpoint(
+                lambda: UDPReceiverProtocol(self),
+                sock=sock
+            )
+            
+            self.socket = sock
+            self.running = True
+            self.current_port = port
+            
+            logger.info(f"UDP接收器(asyncio)已启动，监听端口: {port}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"启动UDP接收器失败: {e}")
+            self.running = False
+            if sock and not self.transport:
+                sock.close()
+            return False
+    
+    def stop(self):
+        """停止UDP接收"""
+        if self.running:
+            self.running = False
+            
+            if self.transport:
+                self.transport.close()
+                self.transport = None
+                self.socket = None
+            
+            logger.info(f"UDP接收器(asyncio)已停止 (端口: {self.current_port})")
+            self.current_port = None
+    
+    def get_socket(self) -> Optional[socket.socket]:
+        """获取接收socket(供发送器复用同一本地端口), 未运行时返回None"""
+        return self.socket if self.running else None
+    
+    def _socket_option(self, option: int) -> Optional[int]:
+        return self.socket.getsockopt(socket.SOL_SOCKET, option) if self.socket else None
+    
+    def _kernel_stats(self) -> Optional[dict]:
+        return read_kernel_socket_stats(self.socket) if self.socket else None
+    
+    def _on_datagram(self, data: bytes, addr: tuple):
+        """处理一个数据报(事件循环内调用)"""
+        try:
+            frames = self.deframer.feed_datagram(data)
+            
+            if not frames:
+                logger.error("消息解析失败")
+                return
+            
+            for frame in frames:
+                self.handler(frame, addr)
+        
+        except Exception as e:
+            logger.error(f"UDP接收错误: {e}")
+    
+    def get_status(self):
+        """获取接收器状态"""
+        return {
+            "mode": "asyncio",
+            "running": self.running,
+            "port": self.current_port,
+            "rcvbuf": self._socket_option(socket.SO_RCVBUF),
+            "kernel": self._kernel_stats(),
+            "parse_stats": get_parse_stats(),
+            "deframer": self.deframer.get_stats()
+        }
 
-def get_queue_lock():
-    """获取队列锁"""
-    return queue_lock
\ No newline at end of file
+def create_receiver(mode: str = "thread", handler: FrameHandler = dispatch_frame):
+    """按配置创建UDP接收器: thread(接收线程) / asyncio(事件循环)"""
+    if mode == "asyncio":
+        return AsyncUDPReceiver(handler)
+    return UDPReceiver(handler=handler)
@@ -1,212 +1,268 @@
+import errno
 import socket
 import struct
+import select
+import ctypes
+import ctypes.util
 import logging
-from typing import Tuple, Optional, List
-from config import (
-    CONFIG, get_frame_type_name,
-    FRAME_TYPE_FPGA, FRAME_TYPE_LORA
-)
-from frame_parser import build_message
+import threading
+import ipaddress
+from typing import Iterable, Tuple, Optional, List
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
+# 发送socket绑定的本地端口 (与接收端口一致, ARM的应答才能回到接收器)
+LOCAL_PORT = CONFIG.get("udp_receive_port", 8002)
+
+# 发送缓冲区满时等待可写的最长时间(秒)
+SEND_TIMEOUT = 1.0
+
+# 单次 sendmmsg 最多发送的数据报数 (内核 UIO_MAXIOV)
+SENDMMSG_MAX = 1024
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int)
+    ]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8)
+    ]
+
+def _mmsg_struct() -> struct.Struct:
+    """按 mmsghdr 的实际内存布局生成打包格式(msg_name, msg_namelen, msg_iov, msg_iovlen)"""
+    fields = [
+        (_MsgHdr.msg_name.offset, "P"),
+        (_MsgHdr.msg_namelen.offset, "I"),
+        (_MsgHdr.msg_iov.offset, "P"),
+        (_MsgHdr.msg_iovlen.offset, "N")
+    ]
+    fmt, pos = "@", 0
+    for offset, code in fields:
+        fmt += f"{offset - pos}x{code}"
+        pos = offset + struct.calcsize("@" + code)
+    return struct.Struct(fmt)
+
+_IOVEC_STRUCT = struct.Struct("@PN")
+_IOVEC_SIZE = ctypes.sizeof(_IOVec)
+_MMSG_STRUCT = _mmsg_struct()
+_MMSG_SIZE = ctypes.sizeof(_MMsgHdr)
+
+def _load_sendmmsg():
+    """加载 libc 的 sendmmsg (仅Linux), 不可用时返回None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+_sendmmsg = _load_sendmmsg()
+
+def _is_loopback(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_loopback
+    except ValueError:
+        return ip == "localhost"
+
+def _can_reach(sock: socket.socket, target_ip: Optional[str]) -> bool:
+    """绑定在回环地址上的socket只能发往回环地址"""
+    try:
+        bound_ip = sock.getsockname()[0]
+    except OSError:
+        return False
+    return target_ip is None or not _is_loopback(bound_ip) or _is_loopback(target_ip)
+
 class UDPSender:
-    """UDP发送器类"""
-
-    @staticmethod
-    def send_fpga_operation(
-        operation_type: int,
-        address: Optional[int] = None,
-        data: Optional[int] = None,
-        target_ip: str = "127.0.0.1",
-        target_port: int = 9100,
-        batch_operations: Optional[List[Tuple[int, int]]] = None
-    ) ->bool:
-        """
-        发送FPGA操作消息
+    """
+    UDP发送器类
+
+    - 持有一个长期使用的socket, 不再每次发送都创建/绑定/关闭
+    - 接收器运行时直接复用接收socket (同一本地端口), ARM的应答回到接收器
+    - 接收器未运行(或绑定在回环地址而目标不是)时使用自有socket, 尽量绑定到接收端口
+    - send_batch 一次调用发送多帧, Linux下使用 sendmmsg
+    """
+
+    def __init__(self, receiver=None, local_port: int = LOCAL_PORT):
+        self.receiver = receiver
+        self.local_port = local_port
+        self._socket: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self.send_stats = {"frames": 0, "bytes": 0, "errors": 0, "batches": 0, "sendmmsg_calls": 0}
+
+    def attach_receiver(self, receiver):
+        """关联接收器, 接收器运行时复用其socket"""
+        self.receiver = receiver
+
+    def _create_socket(self) -> socket.socket:
+        """创建自有socket, 绑定接收端口失败时使用临时端口"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(('0.0.0.0', self.local_port))
+        except OSError as e:
+            logger.warning(f"⚠️ 发送socket无法绑定端口 {self.local_port} ({e}), 使用临时端口")
+        return sock
+
+    def _get_socket(self, target_ip: Optional[str] = None) -> socket.socket:
+        """获取发送socket: 优先复用接收socket"""
+        shared = self.receiver.get_socket() if self.receiver is not None else None
+        if shared is not None and _can_reach(shared, target_ip):
+            return shared
+
+        with self._lock:
+            if self._socket is None:
+                self._socket = self._create_socket()
+            return self._socket
+
+    def close(self):
+        """关闭自有socket"""
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def _sendto(self, data, target: Tuple[str, int]):
+        """发送一个数据报; 共享的非阻塞socket发送缓冲区满时等待可写"""
+        sock = self._get_socket(target[0])
+        while True:
+            try:
+                sock.sendto(data, target)
+                break
+            except BlockingIOError:
+                _, writable, _ = select.select([], [sock], [], SEND_TIMEOUT)
+                if not writable:
+                    raise TimeoutError("UDP发送缓冲区已满")
         
-        Args:
-            operation_type: 操作类型 (0=读, 1=写)
-            address: 单个操作的地址 (单次读写时使用)
-            data: 单个操作的数据 (写操作时使用)
-            target_ip: 目标IP
-            target_port: 目标端口
-            batch_operations: 批量操作列表 [(address, data), ...]
+        stats = self.send_stats
+        stats["frames"] += 1
+        stats["bytes"] += len(data)
+
+    def send_batch(self, frames: Iterable[bytes], target_ip: str, target_port: int) -> int:
         """
+        批量发送多帧 (每帧一个数据报)
+
+        Linux下使用 sendmmsg 一次系统调用发送多个数据报, 否则逐帧 sendto
+
+        Returns:
+            成功发送的帧数; 中途出错时为出错前已发出的帧数(调用方只需重发其后的帧)
+        """
+        frames = list(frames)
+        if not frames:
+            return 0
+
+        self.send_stats["batches"] += 1
+        target = (target_ip, target_port)
+        progress = [0]   # 已发出的帧数, 出错时据此返回
         try:
-            if batch_operations:
-                # 批量写入模式
-                operation_count = len(batch_operations)
-                
-                # 消息内容: operation_type(1) + operation_count(1) + [address(4) + data(4)] * N
-                message_content = struct.pack('BB', operation_type, operation_count)
-                
-                for addr, val in batch_operations:
-                    # 大端序: 高位字节在前,低位字节在后
-                    message_content += struct.pack('>I', addr)  # 地址(4字节)
-                    message_content += struct.pack('>I', val)   # 数据(4字节)
-                
-            else:
-                # 单次读写模式
-                if address is None:
-                    raise ValueError("单次操作需要提供address参数")
-                
-                if operation_type == 0:
-                    # 读操作: operation_type(1) + operation_count(1) + address(4)
-                    message_content = struct.pack('BB', operation_type, 1)  # 读, 1个地址
-                    message_content += struct.pack('>I', address)
-                    
-                elif operation_type == 1:
-                    # 写操作: operation_type(1) + operation_count(1) + address(4) + data(4)
-                    if data is None:
-                        raise ValueError("写操作需要提供data参数")
-                    else:
-                        data =0
-                    
-                    message_content = struct.pack('BB', operation_type, 1)  # 写, 1个操作
-                    message_content += struct.pack('>I', address)
-                    message_content += struct.pack('>I', data)
-                    
-            
-            # 构建完整消息
-            full_message = build_message(FRAME_TYPE_FPGA, message_content)
-            
-            # 发送UDP
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-                sock.bind(('0.0.0.0', 8002))
-                sock.sendto(full_message, (target_ip, target_port))
-            
-            return True
-            
+            sock = self._get_socket(target_ip)
+            if _sendmmsg is not None and sock.family == socket.AF_INET:
+                return self._send_mmsg(sock, frames, target, progress)
+
+            for data in frames:
+                self._sendto(data, target)
+                progress[0] += 1
+            return progress[0]
+
         except Exception as e:
-            logger.error(f"FPGA操作发送失败: {e}")
-            return False
+            self.send_stats["errors"] += 1
+            logger.error(f"批量发送失败 (已发送 {progress[0]}/{len(frames)} 帧): {e}")
+            return progress[0]
+
+    def _send_mmsg(self, sock: socket.socket, frames: List[bytes], target: Tuple[str, int], progress: List[int]) -> int:
+        """sendmmsg 批量发送, 返回发送的帧数; 每次调用后把已发出的帧数写入 progress[0]"""
+        ip, port = target
+        addr = _SockAddrIn(
+            socket.AF_INET,
+            socket.htons(port),
+            (ctypes.c_uint8 * 4)(*socket.inet_aton(socket.gethostbyname(ip)))
+        )
+
+        # 所有帧拼接到一块连续内存, 每个数据报一个iovec
+        count = len(frames)
+        payload = bytearray().join(frames)
+        iovecs = bytearray(count * _IOVEC_SIZE)
+        msgs = bytearray(count * _MMSG_SIZE)
+        payload_buf = (ctypes.c_char * max(len(payload), 1)).from_buffer(payload)
+        iovec_buf = (ctypes.c_char * len(iovecs)).from_buffer(iovecs)
+        msgs_buf = (ctypes.c_char * len(msgs)).from_buffer(msgs)
+
+        # 直接打包二进制结构, 避免逐个创建ctypes对象
+        base = ctypes.addressof(payload_buf)
+        iovec_base = ctypes.addressof(iovec_buf)
+        name = ctypes.addressof(addr)
+        namelen = ctypes.sizeof(addr)
+        pack_iovec = _IOVEC_STRUCT.pack_into
+        pack_msg = _MMSG_STRUCT.pack_into
+        offset = 0
+        for i, data in enumerate(frames):
+            size = len(data)
+            pack_iovec(iovecs, i * _IOVEC_SIZE, base + offset, size)
+            pack_msg(msgs, i * _MMSG_SIZE, name, namelen, iovec_base + i * _IOVEC_SIZE, 1)
+            offset += size
 
-    @staticmethod
-    def send_lora_message(
-        timing_enable: int,
-        timing_time: int,
-        data_content: str,
-        frame_count: int = 0,
-        target_ip: str = "127.0.0.1",
-        target_port: int = 9100
-    ) -> bool:
-        """发送LoRa消息帧"""
+        msgs_base = ctypes.addressof(msgs_buf)
+        sent = 0
+        fd = sock.fileno()
+        stats = self.send_stats
         try:
-            # 解析实际数据
-            actual_data_bytes = bytes.fromhex(data_content)
-        
-            # 构建 data = frame_count(1) + 实际数据
-            data_with_count = struct.pack('B', frame_count) + actual_data_bytes
-
-            # timing_enable(1) + timing_time(4) + data_length(2) + data
-            message_content = struct.pack('B', timing_enable)       # 定时使能(1字节)
-            message_content += struct.pack('>I', timing_time)       # 定时时间(4字节,大端序)
-            message_content += data_with_count                      # data = frame_count + 实际数据
-
-            # 构建完整消息
-            full_message = build_message(FRAME_TYPE_LORA, message_content)
-            
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-                sock.bind(('0.0.0.0', 8002))
-                sock.sendto(full_message, (target_ip, target_port))
-                
-            return True
-                
-        except Exception as e:
-            logger.error(f"发送LoRa消息失败: {e}")
-            return False
+            while sent < count:
+                chunk = min(count - sent, SENDMMSG_MAX)
+                n = _sendmmsg(fd, msgs_base + sent * _MMSG_SIZE, chunk, 0)
+                stats["sendmmsg_calls"] += 1
+                if n < 0:
+                    err = ctypes.get_errno()
+                    if err == errno.EINTR:
+                        continue
+                    if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                        # 发送缓冲区满: 等待可写
+                        _, writable, _ = select.select([], [sock], [], SEND_TIMEOUT)
+                        if writable:
+                            continue
+                        raise TimeoutError("UDP发送缓冲区已满")
+                    raise OSError(err, f"sendmmsg失败: {errno.errorcode.get(err, err)}")
+                sent += n
+                progress[0] = sent
+        finally:
+            stats["frames"] += sent
+            stats["bytes"] += len(payload) if sent == count else sum(len(data) for data in frames[:sent])
+        return sent
 
-    @staticmethod
-    def send_raw_data(data: bytes, target_ip: str, target_port: int) -> bool:
-        """
-        🔧 新增：发送原始字节数据（用于透传）
-        """
+    def send_raw_data(self, data: bytes, target_ip: str, target_port: int) -> bool:
+        """发送一帧原始字节数据"""
         try:
-            socket.sendto(data, (target_ip, target_port))
+            self._sendto(data, (target_ip, target_port))
             return True
         except Exception as e:
+            self.send_stats["errors"] += 1
             logger.error(f"❌ 发送原始数据失败: {e}")
             return False
 
-    @staticmethod
-    def send_node_operation(
-        node_settings: dict,
-        target_ip: str = "127.0.0.1",
-        target_port: int = 9100
-    ) -> bool:
-        """
-        发送节点配置消息 (0x08)
-    
-        消息格式:
-        - 帧同步头: 0x1ACFFC1D (4字节)
-        - 消息类型: 0x08 (1字节)
-        - 消息长度: (1字节)
-        - 节点ID: (1字节)
-        - 节点模式: (1字节) 0=单机, 1=组网, 2=虚实融合
-        - 组网总节点数: (1字节)
-        - 节点属性: (1字节) 0=普通, 1=母星
-        - 工作频率: (4字节, 大端序, kHz)
-        - 通道衰减: (1字节, dB)
-        - 前向链路带宽: (4字节, 大端序, kHz)
-        - 前向扩频因子: (1字节)
-        - 前向编码: (1字节) 1=4/5, 2=4/6, 3=4/7, 4=4/8
-        - 反向链路带宽: (4字节, 大端序, kHz)
-        - 反向扩频因子: (1字节)
-        - 反向编码: (1字节) 1=4/5, 2=4/6, 3=4/7, 4=4/8
-        - 反向扩频因子2: (1字节)
-        - CRC: (2字节)
-        """
-        try:
-            # 节点模式映射
-            mode_map = {'standalone': 0, 'network': 1, 'virtual': 2}
-            node_mode = mode_map.get(node_settings.get('nodeMode', 'virtual'), 2)
-        
-            # 节点属性映射
-            type_map = {'normal': 0, 'mother': 1}
-            node_type = type_map.get(node_settings.get('nodeType', 'normal'), 0)
-        
-            # 编码映射
-            coding_map = {'4/5': 1, '4/6': 2, '4/7': 3, '4/8': 4}
-        
-            # 构建消息内容
-            message_content = struct.pack('B', node_settings.get('nodeId', 1))  # 节点ID
-            message_content += struct.pack('B', node_mode)  # 节点模式
-            message_content += struct.pack('B', node_settings.get('totalNodes', 1))  # 组网总节点数
-            message_content += struct.pack('B', node_type)  # 节点属性
-            message_content += struct.pack('>I', node_settings.get('frequency', 900000))  # 工作频率 (4字节大端序)
-            message_content += struct.pack('B', node_settings.get('attenuation', 10))  # 通道衰减
-        
-            # 前向链路参数
-            forward = node_settings.get('forward', {})
-            message_content += struct.pack('>I', forward.get('bandwidth', 125))  # 带宽
-            message_content += struct.pack('B', forward.get('spreadingFactor', 7))  # 扩频因子
-            forward_coding = coding_map.get(forward.get('coding', '4/5'), 1)
-            message_content += struct.pack('B', forward_coding)  # 编码
-        
-            # 反向链路参数
-            backward = node_settings.get('backward', {})
-            message_content += struct.pack('>I', backward.get('bandwidth', 125))  # 带宽
-            message_content += struct.pack('B', backward.get('spreadingFactor', 7))  # 扩频因子
-            backward_coding = coding_map.get(backward.get('coding', '4/5'), 1)
-            message_content += struct.pack('B', backward_coding)  # 编码
-            message_content += struct.pack('B', backward.get('spreadingFactor2', 7))  # 扩频因子2
-        
-            # 构建完整消息 (消息类型 0x08)
-            full_message = build_message(0x08, message_content)
-        
-            # 获取目标配置
-            target = node_settings.get('target', {})
-            target_ip = target.get('ip', target_ip)
-            target_port = target.get('port', target_port)
-        
-            # 发送UDP
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-                sock.sendto(full_message, (target_ip, target_port))
-        
-            logger.info(f"✅ 节点配置已发送到 {target_ip}:{target_port}")
-            return True
-        
-        except Exception as e:
-            logger.error(f"❌ 发送节点配置失败: {e}")
-            return False
\ No newline at end of file
+    def get_status(self) -> dict:
+        """获取发送器状态"""
+        shared = self.receiver.get_socket() if self.receiver is not None else None
+        return {
+            "receiver_socket": shared.getsockname() if shared is not None else None,
+            "own_socket": self._socket.getsockname() if self._socket is not None else None,
+            "sendmmsg": _sendmmsg is not None,
+            "send_stats": dict(self.send_stats)
+        }
@@ -2,47 +2,115 @@
 # virtual_monitor.py - 虚实融合模式寄存器监控
 import threading
 import time
-import struct
 import logging
-from typing import Optional
 from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 
 from config import (
-    CONFIG, 
     SystemMode, 
     current_mode,
-    FRAME_TYPE_VIRTUAL_TIMESTAMP,
-    FRAME_TYPE_VIRTUAL_LINK
+    CONFIG
 )
-from frame_parser import build_message
-from udp_receiver import get_message_queue, get_queue_lock
+from frame_schema import VIRTUAL_TIMESTAMP, VIRTUAL_LINK
+from message_bus import MessageBus, message_bus
+from register_watch import RegisterWatch, WatchRule, WATCH_EVENT_TOPIC, MAX_WATCH_REGISTERS
+from clock_sync import ClockSync, WALL_OFFSET, UNSYNCED_COUNTER
+from register_history import RegisterHistory
 
 logger = logging.getLogger(__name__)
 
+# 轮询频率上限(Hz)
+MAX_POLL_RATE = 100
+
+# 目标轮询频率(Hz, 取值 (0, MAX_POLL_RATE], 0或负数按最高频率)与等待读响应的超时
+DEFAULT_POLL_RATE = CONFIG.get("virtual_monitor_rate", 10)
+DEFAULT_RESPONSE_TIMEOUT = CONFIG.get("virtual_monitor_timeout_ms", 200) / 1000
+
+# 非虚实融合模式下检查模式的间隔(秒)
+IDLE_INTERVAL = 0.2
+
+class CycleStats:
+    """最近 window 个样本(毫秒)的统计: 均值 / p99 / 最大值"""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+
+    def add(self, value_ms: float):
+        self.samples.append(value_ms)
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+            "max": round(ordered[-1], 3)
+        }
+
 class VirtualMonitor:
     """
     虚实融合模式监控器
     
-    定时读取寄存器状态：
+    按目标频率读取寄存器状态, 由监视规则(register_watch)决定动作, 默认规则：
     - 0x26[11:8] 数据处理状态 > 0 → 发送虚实节点信号发送时间戳回传帧
     - 0x46[19:16] 接收状态 > 1 → 发送虚实节点链路状态帧
+    
+    所有规则用到的寄存器合并为一次批量读请求, 经设备的FPGA事务层(transactions)发出:
+    与API的请求共用发送队列和在途表, 按地址集合匹配读响应, 超时由事务层判定(不重发, 下一周期重新读取);
+    响应一到立即唤醒监控线程, 评估规则并执行动作, 不再固定等待;
+    周期按 1/rate 的固定时刻排列, 超时或处理超过一个周期记为错过截止时间
+    
+    配置了时钟同步寄存器时该寄存器并入同一次批量读取, 每次读响应作为一个时钟同步样本;
+    同步锁定后 0x02/0x03 帧的时间字段为当前时刻对应的FPGA计数器值, 与链路时间戳同一时基
+    
+    每次读响应的全部寄存器值记入寄存器历史(history), 可按时间范围降采样查询
     """
     
-    def __init__(self, udp_sender=None):
-        self.udp_sender = udp_sender
+    def __init__(
+        self,
+        sender=None,
+        bus: MessageBus = message_bus,
+        name: str = "virtual-monitor",
+        rate: float = DEFAULT_POLL_RATE,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+        watch: Optional[RegisterWatch] = None,
+        clock: Optional[ClockSync] = None,
+        history: Optional[RegisterHistory] = None,
+        transactions=None
+    ):
+        self.sender = sender
+        self.transactions = transactions  # 设备的FPGA事务层(FpgaTransactions), 读寄存器请求经由它发出
+        self.bus = bus  # 设备的消息总线
+        self.name = name
         self.running = False
         self.thread: Optional[threading.Thread] = None
-        self.poll_interval = 1  
+        self.rate = MAX_POLL_RATE if rate <= 0 else min(rate, MAX_POLL_RATE)
+        if self.rate != rate:
+            logger.warning(f"⚠️ 轮询频率 {rate}Hz 超出范围 (0, {MAX_POLL_RATE}], 使用 {self.rate}Hz")
+        self.response_timeout = response_timeout
+        self._response_ready = threading.Event()   # 读请求结束(收到响应/超时/发送失败)时置位
+        self._stop_event = threading.Event()
+        
+        # 周期统计
+        self.cycles = 0
+        self.timeouts = 0            # 读响应超时次数
+        self.missed_deadlines = 0    # 未在本周期内完成的轮询次数
+        self.response_latency = CycleStats()   # 读请求 → 对应响应到达(毫秒)
+        self.start_jitter = CycleStats()       # 实际开始时刻 - 计划时刻(毫秒)
+        self._cycle_starts = deque(maxlen=1000)
         
-        # 状态跟踪（防止重复发送）
-        self.last_0x26_status = 0
-        self.last_0x46_status = 0
+        # 监视规则(整体替换, 监控线程每周期取一次引用)
+        self.watch = watch if watch is not None else RegisterWatch.from_config()
 
-        # 寄存器值缓存
-        self.reg_0x25 = 0  # 链路时间戳（发送）
-        self.reg_0x26 = 0  # 数据处理状态
-        self.reg_0x45 = 0  # 链路时间戳（接收）
-        self.reg_0x46 = 0  # 接收状态
+        # 主机/FPGA时钟同步
+        self.clock = clock if clock is not None else ClockSync()
+        
+        # 寄存器值缓存(最新值)与历史
+        self.registers: Dict[int, int] = {}
+        self.history = history if history is not None else RegisterHistory()
         
         logger.info("✅ VirtualMonitor 初始化完成")
     
@@ -53,10 +121,11 @@ class VirtualMonitor:
             return False
         
         self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._monitor_loop, name=self.name, daemon=True)
         self.thread.start()
         
-        logger.info(f"✅ VirtualMonitor 已启动 (轮询间隔: {self.poll_interval}s)")
+        logger.info(f"✅ VirtualMonitor 已启动 (目标频率: {self.rate}Hz, 响应超时: {self.response_timeout * 1000:.0f}ms)")
         return True
     
     def stop(self):
@@ -65,264 +134,310 @@ class VirtualMonitor:
             return
         
         self.running = False
+        self._stop_event.set()
+        self._response_ready.set()
         
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=2)
         
         logger.info("⏹️ VirtualMonitor 已停止")
     
+    def _read_addresses(self, watch: RegisterWatch) -> Tuple[int, ...]:
+        """本周期批量读取的寄存器: 监视规则的寄存器 + 时钟同步寄存器(批量读取已满时不加)"""
+        register = self.clock.register
+        if register is None or register in watch.addresses or len(watch.addresses) >= MAX_WATCH_REGISTERS:
+            return watch.addresses
+        return tuple(sorted(watch.addresses + (register,)))
+    
     def _monitor_loop(self):
         """监控循环"""
         logger.info("🔄 VirtualMonitor 监控循环开始")
+        next_deadline = time.perf_counter()
         
         while self.running:
             try:
                 # 只在虚实融合模式下监控
                 if current_mode["mode"] != SystemMode.VIRTUAL:
-                    time.sleep(self.poll_interval)
+                    self._stop_event.wait(IDLE_INTERVAL)
+                    next_deadline = time.perf_counter()
                     continue
                 
-                # 🔧 步骤1: 发送读寄存器请求
-                self._send_read_registers_request()
+                # 🔧 步骤1: 等到本周期的计划时刻
+                now = time.perf_counter()
+                if now < next_deadline:
+                    if self._stop_event.wait(next_deadline - now):
+                        break
+                    now = time.perf_counter()
+                scheduled = next_deadline
+                self.start_jitter.add((now - scheduled) * 1000)
+                self._cycle_starts.append(now)
+                self.cycles += 1
                 
-                # 🔧 步骤2: 短暂等待响应
-                time.sleep(0.5)  # 等待100ms让响应到达
+                # 🔧 步骤2: 发送读寄存器请求并等待对应的响应
+                watch = self.watch
+                response = self._poll_registers(self._read_addresses(watch))
                 
-                # 🔧 步骤3: 从消息队列读取响应
-                self._process_register_responses()
+                # 🔧 步骤3: 响应到达即处理, 评估监视规则并执行动作
+                if response is not None:
+                    self._process_register_responses(response)
+                    self._check_and_send_frames(watch)
                 
-                # 🔧 步骤4: 检查条件并发送帧
-                self._check_and_send_frames()
-                
-                time.sleep(self.poll_interval)
+                # 🔧 步骤4: 计算下一周期的计划时刻(未在本周期内完成时跳到下一个未过期的时刻)
+                finished = time.perf_counter()
+                period = 1.0 / self.rate
+                next_deadline = scheduled + period
+                if finished > next_deadline:
+                    self.missed_deadlines += 1
+                    next_deadline = scheduled + period * (int((finished - scheduled) / period) + 1)
                 
             except Exception as e:
                 logger.error(f"❌ VirtualMonitor 监控循环异常: {e}", exc_info=True)
-                time.sleep(1)  # 出错后等待1秒再继续
+                self._stop_event.wait(1)  # 出错后等待1秒再继续
+                next_deadline = time.perf_counter()
         
         logger.info("⏹️ VirtualMonitor 监控循环结束")
     
-    def _send_read_registers_request(self):
+    def _poll_registers(self, addresses: Tuple[int, ...]) -> Optional[dict]:
         """
-        发送读取寄存器请求
+        批量读取 addresses, 等待事务层匹配到的读响应
         
-        批量读取：0x25, 0x26, 0x45, 0x46
+        Returns:
+            读响应消息, 无需读取、发送失败或超时返回None
         """
-        if not self.udp_sender:
-            logger.error("❌ UDP发送器未初始化")
+        if not addresses:
+            return None
+        
+        self._response_ready.clear()
+        if not self.running:
+            return None
+        sent_at = time.perf_counter()
+        request = self._send_read_registers_request(addresses)
+        if request is None:
+            return None
+        request.add_done_callback(lambda _: self._response_ready.set())
+        
+        # 事务层在 response_timeout 后结束请求; 另留余量, 防止事务层停止后一直等待
+        if not self._response_ready.wait(self.response_timeout * 2 + 0.1) or not request.done():
+            request.cancel()
+            return None
+        if request.cancelled():
+            return None
+        
+        error = request.exception()
+        if error is not None:
+            if self.running:
+                self.timeouts += 1
+                logger.debug(f"⏱️ 读寄存器请求未完成: {error}")
+            return None
+        
+        msg = request.result()
+        received_at = max(msg.get("host_time", 0) - WALL_OFFSET, sent_at)
+        self.response_latency.add((received_at - sent_at) * 1000)
+        self._add_clock_sample(msg["fpga_operation_info"].get("operations", []), sent_at, received_at)
+        return msg
+    
+    def _add_clock_sample(self, operations: list, sent_at: float, received_at: float):
+        """读响应中有时钟同步寄存器时, 加入一个请求/响应样本"""
+        register = self.clock.register
+        if register is None:
             return
+        for op in operations:
+            if op.get("address") == register and op.get("value") is not None:
+                self.clock.add_sample(sent_at, received_at, op["value"])
+                return
+    
+    def _frame_time(self) -> int:
+        """
+        0x02/0x03 帧的时间字段
+        
+        配置了时钟同步时始终为FPGA计数器时间(与链路时间戳同一时基): 锁定后为当前时刻对应的计数器值,
+        锁定前为 UNSYNCED_COUNTER(0xFFFFFFFF, 接收方据此识别尚未同步), 不混用系统时间;
+        未配置时钟同步时为系统时间(秒)
+        """
+        if not self.clock.enabled:
+            return int(time.time())
+        counter = self.clock.to_counter(time.perf_counter())
+        return UNSYNCED_COUNTER if counter is None else counter
+    
+    def _send_read_registers_request(self, addresses: Tuple[int, ...]) -> Optional[Future]:
+        """
+        经FPGA事务层发送读取寄存器请求, 返回请求的 Future(结果为对应的读响应), 无法提交时返回None
+        
+        一次批量读取所有监视规则用到的寄存器(默认 0x25, 0x26, 0x45, 0x46)
+        """
+        if not self.transactions:
+            logger.error("❌ FPGA事务层未初始化")
+            return None
         
         try:
-            # 🔧 批量读操作：[地址, 数据(读时为0)]
-            batch_operations = [
-                (0x25, 0),  # 链路时间戳（发送）
-                (0x26, 0),  # 数据处理状态
-                (0x45, 0),  # 链路时间戳（接收）
-                (0x46, 0),  # 接收状态
-            ]
-            
-            # 使用 send_fpga_operation 发送批量读请求
-            success = self.udp_sender.send_fpga_operation(
-                operation_type=0,  # 0 = 读操作
-                batch_operations=batch_operations,
-                target_ip=CONFIG["arm_ip"],
-                target_port=CONFIG["arm_port"]
-            )
-            
-            if success:
-                logger.debug("📤 已发送读寄存器请求: 0x25, 0x26, 0x45, 0x46")
-            else:
-                logger.error("❌ 发送读寄存器请求失败")
+            # 🔧 批量读操作：[地址, 数据(读时为0)], 超时不重发(下一周期重新读取)
+            batch_operations = [(address, 0) for address in addresses]
+            request = self.transactions.submit(0, batch_operations, timeout=self.response_timeout, retries=0)
+            logger.debug(f"📤 已提交读寄存器请求: {', '.join(f'0x{a:02X}' for a in addresses)}")
+            return request
                 
         except Exception as e:
             logger.error(f"❌ 发送读寄存器请求异常: {e}")
+            return None
     
-def _process_register_responses(self):
-    """
-    从消息队列中处理寄存器读取响应
-    
-    查找所有 FPGA 操作帧 (0x05) 的响应，处理完后从队列移除
-    """
-    try:
-        message_queue = get_message_queue()
-        queue_lock = get_queue_lock()
-    
-        with queue_lock:
-            if not message_queue:
-                return
+    def _process_register_responses(self, last_msg: dict):
+        """
+        处理寄存器读取响应, 更新寄存器缓存并记入历史(时间为响应的接收时刻)
         
-            # 🔧 收集需要移除的消息索引
-            fpga_message_indices = []
-            
-            for idx, msg in enumerate(list(message_queue)):
-                if msg.get("message_type") == 0x05:
-                    fpga_info = msg.get("fpga_operation_info")
-                    if fpga_info and fpga_info.get("operation_type_code") == 0:
-                        fpga_message_indices.append(idx)
-            
-            if not fpga_message_indices:
-                return
-            
-            # 🔧 只处理最后一个 0x05 消息
-            last_fpga_idx = fpga_message_indices[-1]
-            last_msg = message_queue[last_fpga_idx]
+        响应由事务层按地址集合匹配到本次读请求，与转发帧流量无关
+        """
+        try:
+            operations = last_msg["fpga_operation_info"].get("operations", [])
+            values = {}
             
-            fpga_info = last_msg.get("fpga_operation_info")
-            operations = fpga_info.get("operations", [])
-        
             for op in operations:
-                    address = op.get("address")
-                    value = op.get("value")
-            
-                    if address is None or value is None:
-                        continue  
+                address = op.get("address")
+                value = op.get("value")
+                
+                if address is None or value is None:
+                    continue  
+                
+                # 🔧 更新寄存器缓存
+                self.registers[address] = value
+                values[address] = value
             
-                    # 🔧 更新寄存器缓存
-                    if address == 0x25:
-                        self.reg_0x25 = value
-                    elif address == 0x26:
-                        self.reg_0x26 = value
-                    elif address == 0x45:
-                        self.reg_0x45 = value
-                    elif address == 0x46:
-                        self.reg_0x46 = value
-       
-            for idx in reversed(fpga_message_indices):
-                try:
-                    message_queue.pop(idx)
-                except IndexError:
-                    logger.warning(f"⚠️ 无法移除索引 {idx}，队列长度: {len(message_queue)}")
+            if values:
+                self.history.record(last_msg.get("host_time") or time.time(), values)
         
-    except Exception as e:
-        logger.error(f"❌ 处理寄存器响应异常: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"❌ 处理寄存器响应异常: {e}", exc_info=True)
     
-    def _check_and_send_frames(self):
+    def _check_and_send_frames(self, watch: RegisterWatch):
         """
-        检查寄存器条件并发送相应的帧
+        评估监视规则(边沿/电平触发, 去抖), 执行触发规则的动作
         """
-        # 🔧 检查 0x26[11:8] 数据处理状态
-        data_process_status = (self.reg_0x26 >> 8) & 0x0F
-        
-        if data_process_status > 0:
-            # 状态变化才发送（防止重复）
-            if data_process_status != self.last_0x26_status:
-                self._send_timestamp_frame()
-                self.last_0x26_status = 1
-        else:
-            self.last_0x26_status = 0
-        
-        # 🔧 检查 0x46[19:16] 接收状态
-        receive_status = (self.reg_0x46 >> 16) & 0x0F
-        
-        if receive_status > 1:
-            # 状态变化才发送（防止重复）
-            if receive_status != self.last_0x46_status:
-                self._send_link_status_frame()
-                self.last_0x46_status = 1
-        else:
-            self.last_0x46_status = 0
+        for rule in watch.evaluate(self.registers):
+            if rule.action == "send_frame":
+                link_timestamp = self.registers.get(rule.timestamp_register, 0)
+                if rule.frame_type == 0x02:
+                    self._send_timestamp_frame(link_timestamp)
+                elif rule.frame_type == 0x03:
+                    self._send_link_status_frame(link_timestamp)
+            elif rule.action == "event":
+                self._publish_watch_event(rule)
+    
+    def _publish_watch_event(self, rule: WatchRule):
+        """在设备消息总线上发布监视事件(主题 WATCH_EVENT_TOPIC, 可经 /api/frames/stream 订阅)"""
+        self.bus.publish(WATCH_EVENT_TOPIC, {
+            "message_type": WATCH_EVENT_TOPIC,
+            "watch_event_info": {
+                "rule": rule.name,
+                "register": rule.register,
+                "bits": [rule.high, rule.low],
+                "field": rule.field,
+                "active": rule.active,
+                "timestamp": time.time()
+            }
+        })
     
-    def _send_timestamp_frame(self):
+    def set_watch_rules(self, rules: List[dict]) -> RegisterWatch:
+        """替换监视规则(规则无效时抛出 ValueError), 下一周期起按新规则读取"""
+        self.watch = RegisterWatch(rules)
+        logger.info(f"✅ 监视规则已更新: {len(self.watch.rules)} 条, 读取 {len(self.watch.addresses)} 个寄存器")
+        return self.watch
+    
+    def _send_timestamp_frame(self, link_timestamp: int):
         """
         发送虚实节点信号发送时间戳回传帧 (0x02)
         
         帧格式：
         - 帧类型: 0x02 (1字节)
-        - 发送完成时间: 系统时间 (4字节)
-        - 链路时间戳: 0x25寄存器值 (4字节)
+        - 发送完成时间: 同步后的FPGA计数器时间, 锁定前为0xFFFFFFFF, 未配置同步时为系统时间秒 (4字节)
+        - 链路时间戳: 规则指定的寄存器值, 默认0x25 (4字节)
         - 数据包: 8字节全0
         """
-        if not self.udp_sender:
+        if not self.sender:
             return
         
         try:
-            # 🔧 发送完成时间 = 当前系统时间（秒级时间戳）
-            send_complete_time = int(time.time())
+            # 🔧 发送完成时间 = 当前时刻(同步后为FPGA计数器时间)
+            send_complete_time = self._frame_time()
             
-            # 🔧 链路时间戳 = 0x25 寄存器值
-            link_timestamp = self.reg_0x25 & 0xFFFFFFFF
+            # 🔧 链路时间戳 = 规则指定的寄存器值(默认0x25)
+            link_timestamp &= 0xFFFFFFFF
             
             # 🔧 数据包 = 8字节全0
             data_packet = 0
             
-            # 构建帧内容
-            frame_content = struct.pack(
-                '>IIQ',  # 大端序: 4字节 + 4字节 + 8字节
+            # 构建完整消息: 发送完成时间(4) + 链路时间戳(4) + 数据包(8)
+            full_message = VIRTUAL_TIMESTAMP.encode(
                 send_complete_time,  # 发送完成时间
                 link_timestamp,      # 链路时间戳（0x25）
                 data_packet          # 数据包（8字节0）
             )
             
-            # 构建完整消息
-            full_message = build_message(FRAME_TYPE_VIRTUAL_TIMESTAMP, frame_content)
-            
             # 发送到ARM
-            success = self.udp_sender.send_raw_data(
-                full_message,
-                target_ip=CONFIG["arm_ip"],
-                target_port=CONFIG["arm_port"]
-            )
+            success = self.sender.send_raw_data(full_message)
                 
         except Exception as e:
             logger.error(f"❌ 构建时间戳回传帧失败: {e}")
     
-    def _send_link_status_frame(self):
+    def _send_link_status_frame(self, link_timestamp: int):
         """
         发送虚实节点链路状态帧 (0x03)
         
         帧格式：
         - 帧类型: 0x03 (1字节)
-        - 接收起始时间: 系统时间 (4字节)
-        - 链路时间戳: 0x45寄存器值 (4字节)
+        - 接收起始时间: 同步后的FPGA计数器时间, 锁定前为0xFFFFFFFF, 未配置同步时为系统时间秒 (4字节)
+        - 链路时间戳: 规则指定的寄存器值, 默认0x45 (4字节)
         - 备份: 8字节全0
         """
-        if not self.udp_sender:
+        if not self.sender:
             return
         
         try:
-            # 🔧 接收起始时间 = 当前系统时间（秒级时间戳）
-            receive_start_time = int(time.time())
+            # 🔧 接收起始时间 = 当前时刻(同步后为FPGA计数器时间)
+            receive_start_time = self._frame_time()
             
-            # 🔧 链路时间戳 = 0x45 寄存器值
-            link_timestamp = self.reg_0x45 & 0xFFFFFFFF
+            # 🔧 链路时间戳 = 规则指定的寄存器值(默认0x45)
+            link_timestamp &= 0xFFFFFFFF
             
             # 🔧 备份数据 = 8字节全0
             backup_data = 0
             
-            # 构建帧内容
-            frame_content = struct.pack(
-                '>IIQ',  # 大端序: 4字节 + 4字节 + 8字节
+            # 构建完整消息: 接收起始时间(4) + 链路时间戳(4) + 备份(8)
+            full_message = VIRTUAL_LINK.encode(
                 receive_start_time,  # 接收起始时间
                 link_timestamp,      # 链路时间戳（0x45）
                 backup_data          # 备份（8字节0）
             )
             
-            # 构建完整消息
-            full_message = build_message(FRAME_TYPE_VIRTUAL_LINK, frame_content)
-            
             # 发送到ARM
-            success = self.udp_sender.send_raw_data(
-                full_message,
-                target_ip=CONFIG["arm_ip"],
-                target_port=CONFIG["arm_port"]
-            )
+            success = self.sender.send_raw_data(full_message)
                 
         except Exception as e:
             logger.error(f"❌ 构建链路状态帧失败: {e}")
     
+    def get_stats(self) -> dict:
+        """轮询统计: 实际频率、响应延迟、开始时刻抖动、超时与错过截止时间次数"""
+        starts = self._cycle_starts
+        actual_rate = (len(starts) - 1) / (starts[-1] - starts[0]) if len(starts) > 1 and starts[-1] > starts[0] else 0.0
+        return {
+            "cycles": self.cycles,
+            "actual_rate_hz": round(actual_rate, 2),
+            "timeouts": self.timeouts,
+            "missed_deadlines": self.missed_deadlines,
+            "response_latency_ms": self.response_latency.summary(),
+            "start_jitter_ms": self.start_jitter.summary()
+        }
+    
     def get_status(self) -> dict:
         """获取监控器状态"""
         return {
             "running": self.running,
-            "poll_interval": self.poll_interval,
+            "rate_hz": self.rate,
+            "response_timeout_ms": self.response_timeout * 1000,
             "thread_alive": self.thread.is_alive() if self.thread else False,
-            "last_0x26_status": self.last_0x26_status,
-            "last_0x46_status": self.last_0x46_status,
+            "stats": self.get_stats(),
+            "watch": self.watch.get_status(),
+            "clock_sync": self.clock.get_status(),
             "registers": {
-                "0x25": f"0x{self.reg_0x25:08X}",
-                "0x26": f"0x{self.reg_0x26:08X}",
-                "0x45": f"0x{self.reg_0x45:08X}",
-                "0x46": f"0x{self.reg_0x46:08X}"
+                f"0x{address:02X}": f"0x{value:08X}" for address, value in sorted(self.registers.items())
             },
             "current_mode": current_mode["mode"]
         }
\ No newline at end of file
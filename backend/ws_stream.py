@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# ws_stream.py - WebSocket二进制帧流: 接收帧编码为紧凑二进制记录, 同一连接接收发送命令
+#
+# 服务端 → 客户端 (二进制消息, 一条消息包含多条记录, 小端):
+#   记录 = type(1) + frame_count(1) + payload_len(2) + receive_timestamp(4) + complete_timestamp(4) + payload(N)
+#
+# 客户端 → 服务端 (文本消息, JSON):
+#   {"cmd": "lora_send", "id": 1, "timing_enable": 0, "timing_time": 0, "data_content": "A1B2", "frame_count": 0}
+#   {"cmd": "lora_send", "id": 2, "frames": [{...}, {...}]}     # 多帧一次发送
+#   应答: {"type": "ack", "id": 1, "success": true, "sent": 1} / {"type": "error", "id": 1, "message": "..."}
+#
+# 前端 ResultDisplay.vue 经由本接口收发(记录解码见其 decodeRecords); SSE(/api/lora/stream)保留给其他客户端
+import json
+import struct
+import logging
+from typing import AsyncIterator, Iterable, List, Optional
+
+from config import CONFIG
+from message_bus import Subscription
+from transmit_queue import TransmitQueueFull
+
+logger = logging.getLogger(__name__)
+
+# 记录头: type(1) + frame_count(1) + payload_len(2) + receive_timestamp(4) + complete_timestamp(4)
+RECORD_HEADER = struct.Struct("<BBHII")
+
+# 单条WebSocket消息的最大字节数(超过时拆成多条消息)
+WS_MAX_MESSAGE = CONFIG.get("ws_max_message", 65536)
+
+def encode_lora_record(msg: dict) -> Optional[bytes]:
+    """LoRa接收结果编码为二进制记录, 非LoRa消息返回None"""
+    lora_info = msg.get("lora_receive_info")
+    if lora_info is None:
+        return None
+
+    data = lora_info["data"]
+    return RECORD_HEADER.pack(
+        0x07,
+        lora_info.get("frame_count", 0) & 0xFF,
+        len(data),
+        lora_info.get("receive_timestamp", 0),
+        lora_info.get("complete_timestamp", 0)
+    ) + data
+
+def pack_records(records: Iterable[bytes], max_size: int = WS_MAX_MESSAGE) -> List[bytes]:
+    """多条记录拼接为WebSocket消息, 每条消息不超过 max_size(单条记录超长时独占一条消息)"""
+    messages = []
+    current = []
+    size = 0
+    for record in records:
+        if current and size + len(record) > max_size:
+            messages.append(b"".join(current))
+            current = []
+            size = 0
+        current.append(record)
+        size += len(record)
+
+    if current:
+        messages.append(b"".join(current))
+    return messages
+
+def decode_records(message: bytes) -> List[tuple]:
+    """
+    解码一条二进制消息(调试和基准测试用; 前端的对应实现为 ResultDisplay.vue 的 decodeRecords)
+
+    Returns:
+        [(type, frame_count, receive_timestamp, complete_timestamp, payload), ...]
+    """
+    records = []
+    offset = 0
+    view = memoryview(message)
+    while offset + RECORD_HEADER.size <= len(message):
+        frame_type, frame_count, length, receive_ts, complete_ts = RECORD_HEADER.unpack_from(message, offset)
+        offset += RECORD_HEADER.size
+        records.append((frame_type, frame_count, receive_ts, complete_ts, bytes(view[offset:offset + length])))
+        offset += length
+    return records
+
+async def record_stream(
+    subscription: Subscription,
+    threadsafe: bool = True,
+    max_size: int = WS_MAX_MESSAGE
+) -> AsyncIterator[bytes]:
+    """
+    订阅者的二进制记录流
+
+    消息到达即唤醒, 每次唤醒取完全部积压消息, 编码后拼成尽量少的WebSocket消息
+    """
+    wakeup = subscription.async_wakeup(threadsafe)
+
+    while True:
+        messages = subscription.drain()
+        if not messages:
+            await wakeup.wait()
+            continue
+
+        records = [record for record in map(encode_lora_record, messages) if record is not None]
+        for message in pack_records(records, max_size):
+            yield message
+
+async def execute_command(device, text: str) -> dict:
+    """
+    执行一条发送命令, 返回应答
+
+    Args:
+        device: 设备(device_registry.Device), 经由其发送队列发送
+        text: JSON命令
+    """
+    command_id = None
+    try:
+        command = json.loads(text)
+        command_id = command.get("id")
+        cmd = command.get("cmd")
+
+        if cmd != "lora_send":
+            return {"type": "error", "id": command_id, "message": f"未知命令: {cmd}"}
+
+        frames = command.get("frames")
+        if frames is None:
+            frames = [command]
+
+        sent = await device.transmit_queue.submit(device.sender.send_lora_messages, frames)
+        return {"type": "ack", "id": command_id, "success": sent == len(frames), "sent": sent}
+
+    except TransmitQueueFull as e:
+        return {"type": "error", "id": command_id, "message": str(e)}
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return {"type": "error", "id": command_id, "message": f"命令格式错误: {e}"}
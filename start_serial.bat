@@ -7,7 +7,7 @@ echo ========================================
 
 REM  (´)
 echo ˷...
-start "˷ - Python" cmd /k "cd /d %~dp0backend-si && python main.py"
+start "˷ - Python" cmd /k "cd /d %~dp0backend && set "TD_WEB_TRANSPORT=serial" && python main.py"
 
 REM ȴ2
 timeout /t 2 /nobreak >nul